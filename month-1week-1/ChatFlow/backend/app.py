@@ -11,6 +11,9 @@ import os
 
 # Import our user manager
 from user_manager import UserManager
+from password_hasher import PasswordHasher, HasherBusy
+from message_store import MessageStore
+from rooms import RoomRegistry, valid_room_name
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -23,12 +26,41 @@ CORS(app, supports_credentials=True)
 # Initialize Socket.IO with CORS allowed
 socketio = SocketIO(app, cors_allowed_origins="*", manage_session=False)
 
-# Initialize User Manager
-user_manager = UserManager()
+# User manager and chat history (append-only log + the latest messages of
+# each room in memory) are created by init_services(), not at import:
+# the hashing pool's worker processes (spawn/forkserver) re-import this
+# module, and each one must not open the user store and message log again.
+user_manager = None
+message_store = None
+
+# Room every user joins on login
+DEFAULT_ROOM = 'general'
+
+# Messages sent to a client when it joins the chat
+BACKFILL_SIZE = 50
 
 # Store connected users: {session_id: username}
 connected_users = {}
 
+# Who is in which room: events go to room members, not every socket
+rooms = RoomRegistry(socketio.server, connected_users)
+
+def init_services(data_dir='data', hasher=None):
+    """Create the user manager and message store (in the serving process only)"""
+    global user_manager, message_store
+    
+    if hasher is None:
+        # Under eventlet, wait for bcrypt on an OS thread so the hub
+        # keeps serving every other socket during a login
+        offload = None
+        if socketio.async_mode == 'eventlet':
+            from eventlet import tpool
+            offload = tpool.execute
+        hasher = PasswordHasher(offload=offload)
+    
+    user_manager = UserManager(os.path.join(data_dir, 'users.json'), hasher=hasher)
+    message_store = MessageStore(os.path.join(data_dir, 'messages'))
+
 # ========================================
 # HTTP ROUTES (Authentication)
 # ========================================
@@ -40,9 +72,19 @@ def index():
         'status': 'running',
         'app': 'ChatFlow',
         'version': '2.0',
-        'features': ['authentication', 'websocket', 'real-time']
+        'features': ['authentication', 'websocket', 'real-time', 'history', 'rooms']
     }
 
+def hasher_busy_response(error):
+    """503 while the password hashing pool is saturated"""
+    response = jsonify({
+        'success': False,
+        'message': str(error)
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
 @app.route('/api/register', methods=['POST'])
 def register():
     """Register new user"""
@@ -64,6 +106,8 @@ def register():
                 'message': message
             }), 400
             
+    except HasherBusy as e:
+        return hasher_busy_response(e)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -92,6 +136,8 @@ def login():
                 'message': message
             }), 401
             
+    except HasherBusy as e:
+        return hasher_busy_response(e)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -114,6 +160,50 @@ def get_user_profile(username):
             'message': 'User not found'
         }), 404
 
+@app.route('/api/messages', methods=['GET'])
+def get_messages():
+    """
+    Chat history, newest page first: ?room=general&sid=<socket id>&before=<id>&limit=50
+    Pass next_before from the response as before to get older messages.
+    HTTP has no login session, so the caller names its Socket.IO
+    connection (sid); it must be a member of the room, as for get_history.
+    """
+    room = request.args.get('room', DEFAULT_ROOM)
+    before = request.args.get('before', type=int)
+    limit = request.args.get('limit', BACKFILL_SIZE, type=int)
+    if not valid_room_name(room):
+        return jsonify({
+            'success': False,
+            'message': 'Room names are 1-32 letters, digits, - or _.'
+        }), 400
+    if limit < 1 or (before is not None and before < 1):
+        return jsonify({
+            'success': False,
+            'message': 'before and limit must be positive integers'
+        }), 400
+    if not rooms.is_member(request.args.get('sid'), room):
+        return jsonify({
+            'success': False,
+            'message': f'Join {room} before reading its history.'
+        }), 403
+    
+    messages, next_before = message_store.history(room, before=before, limit=limit)
+    
+    return jsonify({
+        'success': True,
+        'room': room,
+        'messages': messages,
+        'next_before': next_before
+    }), 200
+
+@app.route('/api/rooms', methods=['GET'])
+def get_rooms():
+    """Rooms with someone in them, and how many sockets each has"""
+    return jsonify({
+        'success': True,
+        'rooms': rooms.rooms()
+    }), 200
+
 # ========================================
 # WEBSOCKET EVENTS
 # ========================================
@@ -134,16 +224,13 @@ def handle_disconnect():
     """Called when a client disconnects"""
     print(f'🔴 Client disconnected: {request.sid}')
     
-    # If user was logged in, notify others
-    if request.sid in connected_users:
-        username = connected_users[request.sid]
-        del connected_users[request.sid]
-        
-        emit('user_left', {
-            'username': username,
-            'timestamp': datetime.now().isoformat(),
-            'user_count': len(connected_users)
-        }, broadcast=True)
+    # If user was logged in, notify the rooms they were in
+    username = connected_users.pop(request.sid, None)
+    if username is None:
+        return
+    
+    for room in rooms.leave_all(request.sid):
+        announce_leave(room, username)
 
 @socketio.on('user_login')
 def handle_user_login(data):
@@ -153,35 +240,125 @@ def handle_user_login(data):
     # Store this connection
     connected_users[request.sid] = username
     
+    print(f'👤 User logged in to chat: {username}')
+    
+    enter_room(DEFAULT_ROOM, username)
+
+@socketio.on('join_room')
+def handle_join_room(data):
+    """Join another room: {room}"""
+    room = data.get('room') if isinstance(data, dict) else None
+    username = connected_users.get(request.sid)
+    
+    if username is None:
+        return send_system_message('Please login before joining a room.')
+    if not valid_room_name(room):
+        return send_system_message('Room names are 1-32 letters, digits, - or _.')
+    
+    enter_room(room, username)
+
+@socketio.on('leave_room')
+def handle_leave_room(data):
+    """Leave a room: {room}"""
+    room = data.get('room') if isinstance(data, dict) else None
+    username = connected_users.get(request.sid)
+    
+    if username is None or not valid_room_name(room) or not rooms.leave(request.sid, room):
+        return
+    
+    announce_leave(room, username)
+
+def enter_room(room, username):
+    """Add this socket to a room, tell its members, and backfill its history"""
+    if not rooms.join(request.sid, room):
+        return
+    
     # Get user data
     user_data = user_manager.get_user(username)
     
-    print(f'👤 User logged in to chat: {username}')
-    
-    # Broadcast to ALL clients
+    # Only members of this room hear about it
     emit('user_joined', {
         'username': username,
+        'room': room,
         'avatar_color': user_data['avatar_color'],
         'timestamp': datetime.now().isoformat(),
-        'user_count': len(connected_users)
-    }, broadcast=True)
+        'user_count': rooms.count(room)
+    }, to=room)
+    
+    # Backfill recent messages to this client only (served from memory)
+    send_history(room)
+
+def announce_leave(room, username):
+    emit('user_left', {
+        'username': username,
+        'room': room,
+        'timestamp': datetime.now().isoformat(),
+        'user_count': rooms.count(room)
+    }, to=room)
+
+def send_system_message(text):
+    emit('message', {
+        'type': 'system',
+        'text': text,
+        'timestamp': datetime.now().isoformat()
+    })
+
+@socketio.on('get_history')
+def handle_get_history(data):
+    """Older messages for infinite scroll: {room, before, limit}"""
+    data = data if isinstance(data, dict) else {}
+    room = data.get('room', DEFAULT_ROOM)
+    try:
+        before = int(data['before']) if data.get('before') is not None else None
+        limit = int(data.get('limit', BACKFILL_SIZE))
+    except (TypeError, ValueError):
+        return
+    
+    if request.sid not in connected_users:
+        return send_system_message('Please login before reading history.')
+    if not valid_room_name(room):
+        return send_system_message('Room names are 1-32 letters, digits, - or _.')
+    if not rooms.is_member(request.sid, room):
+        return send_system_message(f'Join {room} before reading its history.')
+    
+    send_history(room, before, limit)
+
+def send_history(room, before=None, limit=BACKFILL_SIZE):
+    """Emit one page of a room's history to the requesting client"""
+    messages, next_before = message_store.history(room, before=before, limit=limit)
+    
+    emit('message_history', {
+        'room': room,
+        'before': before,
+        'messages': messages,
+        'next_before': next_before
+    })
 
 @socketio.on('send_message')
 def handle_message(data):
     """Called when user sends a message"""
+    if not isinstance(data, dict):
+        return
+    
     # Get username from connected users
     username = connected_users.get(request.sid, 'Anonymous')
     message_text = data.get('message', '')
+    room = data.get('room', DEFAULT_ROOM)
     
-    if not message_text.strip():
+    if not isinstance(message_text, str) or not message_text.strip():
         return
     
+    if not valid_room_name(room):
+        return send_system_message('Room names are 1-32 letters, digits, - or _.')
+    if not rooms.is_member(request.sid, room):
+        return send_system_message(f'Join {room} before sending messages to it.')
+    
     print(f'💬 Message from {username}: {message_text}')
     
     # Get user data for avatar color
     user_data = user_manager.get_user(username)
     
-    # Increment message count
+    # Increment message count (buffered in memory; never waits for disk)
     user_manager.increment_message_count(username)
     
     # Create message object
@@ -193,15 +370,25 @@ def handle_message(data):
         'timestamp': datetime.now().isoformat()
     }
     
-    # Broadcast to ALL clients
-    emit('new_message', message, broadcast=True)
+    # Persist first: the stored copy carries the id clients page with
+    message = message_store.append(room, message)
+    
+    # Deliver to the room's members only
+    emit('new_message', message, to=room)
 
 @socketio.on('get_online_users')
-def handle_get_online_users():
-    """Get list of currently online users"""
+def handle_get_online_users(data=None):
+    """Get list of users online in a room: {room} (default: general)"""
+    room = data.get('room', DEFAULT_ROOM) if isinstance(data, dict) else DEFAULT_ROOM
+    
+    if not valid_room_name(room):
+        return send_system_message('Room names are 1-32 letters, digits, - or _.')
+    if not rooms.is_member(request.sid, room):
+        return send_system_message(f'Join {room} to see who is online there.')
+    
     online_users = []
     
-    for sid, username in connected_users.items():
+    for username in rooms.usernames(room):
         user_data = user_manager.get_user(username)
         if user_data:
             online_users.append({
@@ -210,6 +397,7 @@ def handle_get_online_users():
             })
     
     emit('online_users_list', {
+        'room': room,
         'users': online_users,
         'count': len(online_users)
     })
@@ -226,4 +414,10 @@ if __name__ == '__main__':
     print('💬 Real-time chat enabled!')
     print('')
     
-    socketio.run(app, debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # debug=True runs this file twice: in the reloader's file watcher and
+    # in the child it starts (WERKZEUG_RUN_MAIN). Only the child serves.
+    debug = True
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        init_services()
+    
+    socketio.run(app, debug=debug, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Fan-out Benchmark
+Per-message delivery cost for 1k-10k clients: global broadcast vs room-scoped emit
+
+Run: python bench_fanout.py [messages per level] [clients per room]
+
+Messages go through app.py's own SocketIO object, down the same path a
+chat message takes: socketio.emit -> socketio.Server -> its manager ->
+one Engine.IO packet queued on every recipient's socket. The clients
+are real Engine.IO sockets registered with the server and joined to
+rooms through app.rooms, as user_login/join_room would; only the
+network is left out, since thousands of real websocket clients would
+measure the client machine instead. Broadcast reaches every connected
+socket; room mode only the room's members.
+"""
+
+import sys
+import time
+from datetime import datetime
+
+from engineio.socket import Socket
+
+import app
+
+CLIENTS = (1000, 2000, 5000, 10000)
+
+
+def connect(clients, room_size):
+    """Connect `clients` sockets spread over rooms of `room_size` members"""
+    server = app.socketio.server
+    sockets = {}
+    for i in range(clients):
+        eio_sid = server.eio.generate_id()
+        sockets[eio_sid] = server.eio.sockets[eio_sid] = Socket(server.eio, eio_sid)
+        sid = server.manager.connect(eio_sid, '/')
+        app.connected_users[sid] = f'user{i}'
+        app.rooms.join(sid, f'room{i // room_size}')
+    return sockets
+
+
+def disconnect(sockets):
+    """Remove every socket connect() added, as the server does on disconnect"""
+    server = app.socketio.server
+    for eio_sid in sockets:
+        sid = server.manager.sid_from_eio_sid(eio_sid, '/')
+        app.rooms.leave_all(sid)
+        app.connected_users.pop(sid, None)
+        server.manager.disconnect(sid, '/')
+        del server.eio.sockets[eio_sid]
+
+
+def run(clients, room_size, messages, scoped):
+    """(p50 µs, p99 µs, max µs, deliveries per message, messages/s)"""
+    sockets = connect(clients, room_size)
+    rooms = list(app.rooms.rooms())
+    latencies = []
+
+    try:
+        start = time.perf_counter()
+        for i in range(messages):
+            room = rooms[i % len(rooms)]
+            message = {
+                'type': 'user',
+                'username': f'user{i}',
+                'text': f'message {i}',
+                'room': room,
+                'timestamp': datetime.now().isoformat()
+            }
+            began = time.perf_counter()
+            app.socketio.emit('new_message', message, to=room if scoped else None)
+            latencies.append(time.perf_counter() - began)
+        wall = time.perf_counter() - start
+
+        # Count what actually reached the sockets' send queues
+        delivered = sum(socket.queue.qsize() for socket in sockets.values())
+    finally:
+        disconnect(sockets)
+
+    latencies.sort()
+    return (
+        latencies[len(latencies) // 2] * 1e6,
+        latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6,
+        latencies[-1] * 1e6,
+        delivered / messages,
+        messages / wall
+    )
+
+
+def main(messages, room_size):
+    print(f"{messages} messages per level, {room_size} clients per room\n")
+    print(f"{'clients':>7} {'mode':>9} {'recipients':>10} {'p50 µs':>9} {'p99 µs':>9} "
+          f"{'max µs':>9} {'msgs/s':>9}")
+    for clients in CLIENTS:
+        for scoped in (False, True):
+            p50, p99, worst, recipients, rate = run(clients, room_size, messages, scoped)
+            mode = 'room' if scoped else 'broadcast'
+            print(f"{clients:7d} {mode:>9} {recipients:10.0f} {p50:9.1f} {p99:9.1f} "
+                  f"{worst:9.1f} {rate:9.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 50)
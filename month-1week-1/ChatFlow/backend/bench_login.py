@@ -0,0 +1,170 @@
+"""
+Login Throughput Benchmark
+Logins per second and websocket stalls, measured through the real Socket.IO server
+
+Run: python bench_login.py [rounds] [logins per level]
+
+Each setup starts app.py's server (eventlet, as in production) in its
+own process and drives it from outside: HTTP logins at increasing
+concurrency, while a logged-in websocket client pings the server every
+20 ms. If bcrypt blocks the eventlet hub, the ping round trip grows to
+the length of a hash; if it doesn't, pings stay fast during logins.
+
+Needs the client extras: pip install requests websocket-client
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+CONCURRENCY = (1, 4, 16)
+PASSWORD = 'password123'
+
+SETUPS = [
+    # name, BCRYPT_WORKERS, wait via eventlet.tpool
+    ('inline, blocking wait', 0, False),
+    ('pool, blocking wait', None, False),
+    ('pool, tpool wait', None, True),
+]
+
+
+def serve(port, data_dir, workers, offload):
+    """Server process: app.py on eventlet with the given hasher"""
+    import app
+    from password_hasher import PasswordHasher
+
+    hasher_offload = None
+    if offload:
+        from eventlet import tpool
+        hasher_offload = tpool.execute
+    workers = int(workers) if workers != 'None' else None
+    hasher = PasswordHasher(workers=workers, offload=hasher_offload,
+                            max_pending=max(CONCURRENCY) * 2)
+    app.init_services(data_dir, hasher=hasher)
+    app.socketio.run(app.app, host='127.0.0.1', port=port, debug=False, log_output=False)
+
+
+def start_server(port, workers, offload):
+    data_dir = tempfile.mkdtemp()
+    process = subprocess.Popen(
+        [sys.executable, __file__, '--serve', str(port), data_dir, str(workers), str(int(offload))],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    import requests
+    for _ in range(100):
+        try:
+            requests.get(f'http://127.0.0.1:{port}/', timeout=1)
+            return process
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Server did not start")
+
+
+def run_level(url, concurrency, logins):
+    """(logins/s, p50 ms, p99 ms, rejected) for one concurrency level"""
+    import requests
+    latencies = []
+    rejected = [0]
+    lock = threading.Lock()
+
+    def login(i):
+        start = time.perf_counter()
+        response = requests.post(f'{url}/api/login', timeout=30,
+                                 json={'username': f'user{i % concurrency}', 'password': PASSWORD})
+        elapsed = time.perf_counter() - start
+        with lock:
+            if response.status_code == 200:
+                latencies.append(elapsed)
+            else:
+                rejected[0] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(login, range(logins)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    if not latencies:
+        return 0.0, 0.0, 0.0, rejected[0]
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    return len(latencies) / wall, p50, p99, rejected[0]
+
+
+class Pinger:
+    """Logged-in websocket client timing a request/ack round trip every 20 ms"""
+
+    def __init__(self, url):
+        import socketio
+        self.client = socketio.Client()
+        self.client.connect(url, transports=['websocket'])
+        self.client.emit('user_login', {'username': 'user0'})
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.samples = []
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """(p50 ms, worst ms) of the round trips since start()"""
+        self._stop.set()
+        self._thread.join()
+        samples = sorted(self.samples) or [0.0]
+        return samples[len(samples) // 2] * 1000, samples[-1] * 1000
+
+    def close(self):
+        self.client.disconnect()
+
+    def _run(self):
+        while not self._stop.wait(0.02):
+            start = time.perf_counter()
+            self.client.call('get_online_users', timeout=30)
+            self.samples.append(time.perf_counter() - start)
+
+
+def main(rounds, logins):
+    import requests
+
+    os.environ['BCRYPT_ROUNDS'] = str(rounds)
+    print(f"bcrypt cost {rounds}, {logins} logins per level, {os.cpu_count()} CPUs\n")
+
+    for port, (name, workers, offload) in enumerate(SETUPS, start=5601):
+        url = f'http://127.0.0.1:{port}'
+        server = start_server(port, workers, offload)
+        try:
+            for i in range(max(CONCURRENCY)):
+                requests.post(f'{url}/api/register', timeout=30,
+                              json={'username': f'user{i}', 'password': PASSWORD})
+            pinger = Pinger(url)
+
+            print(name)
+            print(f"  {'clients':>7} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'rejected':>8} "
+                  f"{'ws p50 ms':>9} {'ws max ms':>9}")
+            for concurrency in CONCURRENCY:
+                pinger.start()
+                rate, p50, p99, rejected = run_level(url, concurrency, logins)
+                ws_p50, ws_max = pinger.stop()
+                print(f"  {concurrency:7d} {rate:9.1f} {p50:8.1f} {p99:8.1f} {rejected:8d} "
+                      f"{ws_p50:9.1f} {ws_max:9.1f}")
+            print()
+            pinger.close()
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        serve(int(sys.argv[2]), sys.argv[3], sys.argv[4], sys.argv[5] == '1')
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 12,
+             int(sys.argv[2]) if len(sys.argv) > 2 else 32)
@@ -0,0 +1,161 @@
+"""
+Password Hashing Pool
+Runs bcrypt in worker processes so logins don't stall the chat server
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+
+class HasherBusy(Exception):
+    """Too many hash/verify jobs queued; the caller should retry later"""
+
+
+# Worker functions (module level so the process pool can pickle them)
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _verify(password, hashed_password):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+def _pool_context():
+    """
+    Start method for the worker processes.
+
+    The pool is started lazily, inside a server that already runs
+    threads and an eventlet hub; fork would copy their locks and
+    sockets mid-use. forkserver starts workers from a clean process
+    (Linux, macOS); Windows only has spawn.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def hash_cost(hashed_password):
+    """Cost factor stored in a bcrypt hash ('$2b$12$...' -> 12), None if unreadable"""
+    try:
+        return int(hashed_password.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    bcrypt on a process pool with a bounded queue.
+
+    bcrypt is CPU-bound for ~250 ms at cost 12; run in a request handler
+    it ties up that worker, and under eventlet it blocks every green
+    thread at once. Here each job runs in one of `workers` processes,
+    so hashing uses every core.
+
+    WAITING: a plain wait for the result (or for a queue slot) is still
+    a blocking call. Under eventlet pass offload=eventlet.tpool.execute:
+    the wait then happens on a real OS thread while the green thread
+    yields, so the hub keeps serving websocket traffic during a login.
+    Without offload the caller's thread simply blocks, which is right
+    for threaded servers and scripts.
+
+    BACK-PRESSURE: at most `max_pending` jobs may be queued or running.
+    Beyond that a caller waits up to `queue_timeout` seconds for a slot
+    and then gets HasherBusy (the API answers 503 + Retry-After)
+    instead of piling up unbounded work.
+
+    COST: new hashes use `rounds` (env BCRYPT_ROUNDS). needs_rehash()
+    spots hashes made with another cost so login can upgrade them.
+    """
+
+    def __init__(self, rounds=None, workers=None, max_pending=None, queue_timeout=2.0,
+                 offload=None):
+        self.rounds = rounds or int(os.environ.get('BCRYPT_ROUNDS', '12'))
+        if not 4 <= self.rounds <= 31:
+            raise ValueError(f"bcrypt cost must be between 4 and 31, got {self.rounds}")
+        self.workers = workers if workers is not None else int(
+            os.environ.get('BCRYPT_WORKERS', os.cpu_count() or 2)
+        )
+        self.max_pending = max_pending or max(1, self.workers) * 4
+        self.queue_timeout = queue_timeout
+        self.offload = offload
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self.rejected = 0
+
+    def hash(self, password):
+        """bcrypt hash of a password (blocks the caller, not the server)"""
+        return self._run(_hash, password, self.rounds)
+
+    def verify(self, password, hashed_password):
+        return self._run(_verify, password, hashed_password)
+
+    def needs_rehash(self, hashed_password):
+        return hash_cost(hashed_password) != self.rounds
+
+    def rehash_later(self, password, callback):
+        """
+        Hash in the background and call callback(new_hash) when done.
+
+        Used for rehash-on-login, so upgrading a hash adds nothing to
+        the login response time. Skipped silently when the pool is busy.
+        """
+        if self.workers == 0:
+            callback(self._run(_hash, password, self.rounds))
+            return True
+        if not self._slots.acquire(blocking=False):
+            return False
+        try:
+            future = self._submit(_hash, password, self.rounds)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        def done(future):
+            self._slots.release()
+            if future.exception() is None:
+                callback(future.result())
+        future.add_done_callback(done)
+        return True
+
+    def stats(self):
+        return {
+            'rounds': self.rounds,
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'rejected': self.rejected
+        }
+
+    def close(self):
+        """Stop the workers (queued jobs are cancelled)"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _run(self, func, *args):
+        if self.offload is not None:
+            return self.offload(self._wait, func, *args)
+        return self._wait(func, *args)
+
+    def _wait(self, func, *args):
+        if self.workers == 0:
+            return func(*args)  # inline mode (debugging, single-core hosts)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self.rejected += 1
+            raise HasherBusy("Server busy, please try again")
+        try:
+            return self._submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def _submit(self, func, *args):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=_pool_context())
+        return self._pool.submit(func, *args)
@@ -0,0 +1,120 @@
+"""
+Chat Rooms
+Who is in which room, so events only go to the sockets that joined it
+"""
+
+import re
+import threading
+
+ROOM_NAME = re.compile(r'^[A-Za-z0-9_-]{1,32}$')
+
+
+def valid_room_name(room):
+    return isinstance(room, str) and ROOM_NAME.match(room) is not None
+
+
+class RoomRegistry:
+    """
+    Rooms on top of the Socket.IO server's own membership.
+
+    The server's manager is the only record of who is in a room
+    (room -> sids), so fan-out, member counts and the online list can't
+    disagree with it; usernames are read from the app's
+    {sid: username} map at the time they are asked for, so a second
+    login on the same socket is seen everywhere at once.
+
+    The one index kept here is sid -> {room}, for cleanup on disconnect
+    in O(rooms joined): the manager can only find a socket's rooms by
+    scanning all of them, including the private room of every socket.
+    Only rooms joined through this registry are tracked; join() and
+    leave() update it and the manager together.
+    """
+
+    def __init__(self, server, usernames, namespace='/'):
+        self._server = server
+        self._usernames = usernames     # sid -> username, owned by the app
+        self._namespace = namespace
+        self._lock = threading.Lock()
+        self._rooms_of = {}             # sid -> set of rooms
+
+    def join(self, sid, room):
+        """Add a socket to a room; False if it was already a member"""
+        with self._lock:
+            if self.is_member(sid, room):
+                return False
+            self._server.enter_room(sid, room, namespace=self._namespace)
+            self._rooms_of.setdefault(sid, set()).add(room)
+            return True
+
+    def leave(self, sid, room):
+        """Remove a socket from a room; False if it wasn't a member"""
+        with self._lock:
+            return self._remove(sid, room)
+
+    def leave_all(self, sid):
+        """Remove a socket from every room (disconnect); returns the rooms it was in"""
+        with self._lock:
+            rooms = self._rooms_of.get(sid, set()).copy()
+            for room in rooms:
+                self._remove(sid, room)
+            return rooms
+
+    def is_member(self, sid, room):
+        return sid in self._sids(room)
+
+    def rooms_of(self, sid):
+        with self._lock:
+            return set(self._rooms_of.get(sid, ()))
+
+    def members(self, room):
+        """{sid: username} for a room (a copy)"""
+        return {sid: self._usernames.get(sid) for sid in list(self._sids(room))}
+
+    def count(self, room):
+        return len(self._sids(room))
+
+    def usernames(self, room):
+        """Distinct usernames in a room (one user may have several tabs open)"""
+        names = (self._usernames.get(sid) for sid in list(self._sids(room)))
+        return sorted({name for name in names if name is not None})
+
+    def rooms(self):
+        """{room: member count} for every room with someone in it"""
+        namespace = self._server.manager.rooms.get(self._namespace, {})
+        connected = namespace.get(None, {})
+        # Skip the manager's own entries: None (everyone) and one room per socket
+        return {room: len(sids) for room, sids in list(namespace.items())
+                if room is not None and room not in connected}
+
+    def _sids(self, room):
+        return self._server.manager.rooms.get(self._namespace, {}).get(room, {})
+
+    def _remove(self, sid, room):
+        rooms = self._rooms_of.get(sid)
+        if rooms is None or room not in rooms:
+            return False
+        self._server.leave_room(sid, room, namespace=self._namespace)
+        rooms.discard(room)
+        if not rooms:
+            del self._rooms_of[sid]
+        return True
+
+
+if __name__ == "__main__":
+    import socketio
+
+    server = socketio.Server()
+    usernames = {}
+    registry = RoomRegistry(server, usernames)
+    alice, bob = (server.manager.connect(eio_sid, '/') for eio_sid in ('eio1', 'eio2'))
+    usernames.update({alice: 'alice', bob: 'bob'})
+
+    registry.join(alice, 'general')
+    registry.join(bob, 'general')
+    registry.join(bob, 'python')
+    print(f"Rooms: {registry.rooms()}")
+    print(f"general: {registry.usernames('general')}, bob in python: {registry.is_member(bob, 'python')}")
+    usernames[bob] = 'robert'
+    print(f"bob logs in again as robert: general {registry.usernames('general')}, joined again: {registry.join(bob, 'general')}")
+    print(f"robert disconnects, leaves {sorted(registry.leave_all(bob))}; rooms now {registry.rooms()}")
+    print(f"Valid names: {[name for name in ('general', 'off topic', 'a' * 40, 'dev-ops') if valid_room_name(name)]}")
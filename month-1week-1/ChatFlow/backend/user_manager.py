@@ -5,14 +5,33 @@ Handles user registration, login, and session management
 
 import json
 import os
-import bcrypt
 from datetime import datetime
 
+from user_store import UserStore
+from message_counters import CounterAggregator
+from password_hasher import PasswordHasher
+
 class UserManager:
-    def __init__(self, users_file='data/users.json'):
-        """Initialize user manager with file storage"""
+    def __init__(self, users_file='data/users.json', flush_interval=1.0,
+                 count_flush_ms=500, count_flush_messages=1000, hasher=None):
+        """
+        Initialize user manager with file storage.
+
+        Users are loaded into memory once (see user_store.py); changes
+        are written back to users_file in the background every
+        flush_interval seconds. Message counts are buffered further
+        (see message_counters.py) and merged into the store every
+        count_flush_ms, or after count_flush_messages messages.
+        Password hashing runs on a process pool (see password_hasher.py).
+        """
         self.users_file = users_file
         self.ensure_users_file()
+        self.store = UserStore(users_file, flush_interval=flush_interval)
+        self.message_counts = CounterAggregator(
+            lambda counts: self.store.increment_many('total_messages', counts),
+            flush_ms=count_flush_ms, flush_count=count_flush_messages
+        )
+        self.hasher = hasher or PasswordHasher()
 
     def ensure_users_file(self):
         """Create users file if it doesn't exist"""
@@ -22,38 +41,31 @@ class UserManager:
                 json.dump({}, f)
 
     def load_users(self):
-        """Load all users from file"""
-        try:
-            with open(self.users_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+        """All users (a copy of the in-memory store)"""
+        return self.store.all()
         
     def save_users(self, users):
-        """Save users to file"""
-        with open(self.users_file, 'w') as f:
-            json.dump(users, f, indent=2)
+        """Replace all users and write them to file now"""
+        self.store.replace_all(users)
+        self.store.flush()
 
     def hash_password(self, password):
-        """Hash password using bcrypt"""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed.decode('utf-8')
+        """
+        Hash password using bcrypt (on the hashing pool).
+
+        Raises HasherBusy when too many hashes are already queued.
+        """
+        return self.hasher.hash(password)
     
     def verify_password(self, password, hashed_password):
-        """Verify password against hash"""
-        return bcrypt.checkpw(
-            password.encode('utf-8'), 
-            hashed_password.encode('utf-8')
-        )
+        """Verify password against hash (on the hashing pool)"""
+        return self.hasher.verify(password, hashed_password)
     
     def register_user(self, username, password):
         """
         Register a new user
         Returns: (success: bool, message: str)
         """
-        users = self.load_users()
-        
         # Validation
         if len(username) < 3:
             return False, "Username must be at least 3 characters"
@@ -61,19 +73,21 @@ class UserManager:
         if len(password) < 6:
             return False, "Password must be at least 6 characters"
         
-        if username in users:
+        if self.store.exists(username):
             return False, "Username already exists"
         
         # Create user
-        users[username] = {
+        added = self.store.add(username, {
             'username': username,
             'password_hash': self.hash_password(password),
             'created_at': datetime.now().isoformat(),
             'avatar_color': self.generate_avatar_color(username),
             'total_messages': 0
-        }
+        })
+        if not added:
+            return False, "Username already exists"  # registered while we were hashing
         
-        self.save_users(users)
+        self.store.flush()  # new accounts are written before we confirm them
         return True, "Registration successful!"
     
     def login_user(self, username, password):
@@ -81,48 +95,48 @@ class UserManager:
         Authenticate user login
         Returns: (success: bool, message: str, user_data: dict)
         """
-        users = self.load_users()
+        user, pending = self.message_counts.read(username, lambda: self.store.get(username))
         
-        if username not in users:
+        if user is None:
             return False, "Invalid username or password", None
         
-        user = users[username]
-        
         if not self.verify_password(password, user['password_hash']):
             return False, "Invalid username or password", None
         
+        # Hash made with an older cost factor: upgrade it in the background
+        if self.hasher.needs_rehash(user['password_hash']):
+            self.hasher.rehash_later(
+                password, lambda new_hash: self.store.update(username, password_hash=new_hash)
+            )
+        
         # Don't send password hash to client
         safe_user_data = {
             'username': user['username'],
             'created_at': user['created_at'],
             'avatar_color': user['avatar_color'],
-            'total_messages': user['total_messages']
+            'total_messages': user['total_messages'] + pending
         }
         
         return True, "Login successful!", safe_user_data
     
     def get_user(self, username):
         """Get user data (without password hash)"""
-        users = self.load_users()
+        # Include counts not merged yet, so users see their own messages
+        user, pending = self.message_counts.read(username, lambda: self.store.get(username))
         
-        if username not in users:
+        if user is None:
             return None
         
-        user = users[username]
         return {
             'username': user['username'],
             'created_at': user['created_at'],
             'avatar_color': user['avatar_color'],
-            'total_messages': user['total_messages']
+            'total_messages': user['total_messages'] + pending
         }
     
     def increment_message_count(self, username):
-        """Increment user's message count"""
-        users = self.load_users()
-        
-        if username in users:
-            users[username]['total_messages'] += 1
-            self.save_users(users)
+        """Increment user's message count (buffered; merged and saved in the background)"""
+        self.message_counts.add(username)
     
     def generate_avatar_color(self, username):
         """Generate consistent color for user avatar"""
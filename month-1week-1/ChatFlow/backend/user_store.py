@@ -0,0 +1,182 @@
+"""
+In-Memory User Store
+Loads users.json once and writes changes back in the background
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+
+
+class UserStore:
+    """
+    All users live in a dict; the JSON file is only the durable copy.
+
+    - The file is read once, at startup.
+    - Reads and updates are dictionary operations under a lock.
+    - Updates mark the store dirty; a background thread writes the
+      whole dict every `flush_interval` seconds if anything changed,
+      so a burst of changes costs one write instead of one each.
+    - Writes are atomic (temp file + fsync + rename): a crash leaves
+      the old file or the new one, never half of each.
+    - flush() writes immediately (used for registrations, which must
+      not be lost) and runs at exit.
+    """
+
+    def __init__(self, users_file, flush_interval=1.0):
+        self.users_file = users_file
+        self.flush_interval = flush_interval
+        self._users = self._read()
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()     # one writer at a time
+        self._version = 0                       # bumped on every change
+        self._flushed_version = 0
+        self._stop = threading.Event()
+
+        self._flusher = threading.Thread(target=self._flush_loop,
+                                         name='user-store-flush', daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    # Reads
+
+    def get(self, username):
+        """A copy of the user's record, or None"""
+        with self._lock:
+            user = self._users.get(username)
+            return dict(user) if user is not None else None
+
+    def exists(self, username):
+        return username in self._users
+
+    def all(self):
+        """Copy of every record, {username: record}"""
+        with self._lock:
+            return {name: dict(user) for name, user in self._users.items()}
+
+    def __len__(self):
+        return len(self._users)
+
+    # Writes (in memory now, on disk at the next flush)
+
+    def add(self, username, record):
+        """Insert a new user; False if the name is taken"""
+        with self._lock:
+            if username in self._users:
+                return False
+            self._users[username] = dict(record)
+            self._version += 1
+            return True
+
+    def update(self, username, **fields):
+        with self._lock:
+            user = self._users.get(username)
+            if user is None:
+                return False
+            user.update(fields)
+            self._version += 1
+            return True
+
+    def increment(self, username, field, amount=1):
+        """O(1) counter bump; returns the new value (None for unknown users)"""
+        with self._lock:
+            user = self._users.get(username)
+            if user is None:
+                return None
+            user[field] = user.get(field, 0) + amount
+            self._version += 1
+            return user[field]
+
+    def increment_many(self, field, amounts):
+        """Apply {username: amount} in one step (unknown users are skipped)"""
+        with self._lock:
+            for username, amount in amounts.items():
+                user = self._users.get(username)
+                if user is not None:
+                    user[field] = user.get(field, 0) + amount
+            self._version += 1
+
+    def replace_all(self, users):
+        """Swap in a whole new set of users (kept for save_users callers)"""
+        with self._lock:
+            self._users = {name: dict(user) for name, user in users.items()}
+            self._version += 1
+
+    @property
+    def dirty(self):
+        return self._version != self._flushed_version
+
+    # Persistence
+
+    def flush(self):
+        """Write the current state to disk if it changed since the last write"""
+        with self._write_lock:
+            with self._lock:
+                version = self._version
+                if version == self._flushed_version:
+                    return False
+                text = json.dumps(self._users, indent=2)
+            _atomic_write(self.users_file, text)
+            self._flushed_version = version
+            return True
+
+    def close(self):
+        self._stop.set()
+        try:
+            self.flush()
+        except OSError as e:
+            print(f"⚠️ Could not save users: {e}")
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"⚠️ Could not save users: {e}")  # stays dirty: retried next round
+
+    def _read(self):
+        try:
+            with open(self.users_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+
+def _atomic_write(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.users-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+if __name__ == "__main__":
+    # Many increments, one write
+    import time
+
+    path = os.path.join(tempfile.mkdtemp(), 'users.json')
+    store = UserStore(path, flush_interval=0.2)
+    store.add('alice', {'username': 'alice', 'total_messages': 0})
+    store.flush()
+
+    start = time.perf_counter()
+    for _ in range(100000):
+        store.increment('alice', 'total_messages')
+    elapsed = time.perf_counter() - start
+    print(f"100000 increments in {elapsed * 1000:.1f}ms (dirty={store.dirty})")
+
+    time.sleep(0.3)
+    with open(path) as f:
+        print(f"On disk after flush: {json.load(f)['alice']['total_messages']}")
+    store.close()
@@ -20,6 +20,10 @@ const AppState = {
     isAuthenticated: false,
     isConnected: false,
     messages: [],
+    messageIds: new Set(),
+    lastMessageId: 0,
+    historyCursor: null,
+    loadingHistory: false,
     onlineUsers: []
 };
 
@@ -344,6 +348,10 @@ function handleLogout() {
     AppState.isAuthenticated = false;
     AppState.isConnected = false;
     AppState.messages = [];
+    AppState.messageIds = new Set();
+    AppState.lastMessageId = 0;
+    AppState.historyCursor = null;
+    AppState.loadingHistory = false;
     AppState.onlineUsers = [];
     
     localStorage.removeItem('chatflow_username');
@@ -433,6 +441,10 @@ function setupSocketHandlers() {
     socket.on('new_message', (data) => {
         console.log('💬 New message:', data);
         
+        if (!rememberMessage(data)) {
+            return;
+        }
+        
         const isOwnMessage = data.username === AppState.username;
         
         AppState.messages.push(data);
@@ -440,6 +452,38 @@ function setupSocketHandlers() {
         addChatMessage(data, isOwnMessage);
     });
     
+    socket.on('message_history', (data) => {
+        console.log(`📜 History: ${data.messages.length} messages`);
+        
+        AppState.loadingHistory = false;
+        
+        // The first page sets the cursor; on reconnect keep the one we have
+        if (data.before !== null || AppState.historyCursor === null) {
+            AppState.historyCursor = data.next_before;
+        }
+        
+        const lastSeen = AppState.lastMessageId;
+        const older = [];
+        
+        data.messages.forEach(message => {
+            const isNewer = message.id > lastSeen;
+            
+            if (!rememberMessage(message)) {
+                return;
+            }
+            
+            if (isNewer && lastSeen > 0) {
+                // Sent while we were disconnected
+                AppState.messages.push(message);
+                addChatMessage(message, message.username === AppState.username);
+            } else {
+                older.push(message);
+            }
+        });
+        
+        prependChatMessages(older, data.before === null);
+    });
+    
     socket.on('online_users_list', (data) => {
         console.log('👥 Online users:', data);
         AppState.onlineUsers = data.users;
@@ -494,10 +538,76 @@ function addSystemMessage(text) {
     scrollToBottom();
 }
 
+/**
+ * Track a message id; false if it is already shown
+ */
+function rememberMessage(data) {
+    if (data.id === undefined) {
+        return true;
+    }
+    
+    if (AppState.messageIds.has(data.id)) {
+        return false;
+    }
+    
+    AppState.messageIds.add(data.id);
+    AppState.lastMessageId = Math.max(AppState.lastMessageId, data.id);
+    return true;
+}
+
+/**
+ * Ask the server for the page of messages before the oldest one shown
+ */
+function loadOlderMessages() {
+    if (!socket || !AppState.isConnected || AppState.loadingHistory || AppState.historyCursor === null) {
+        return;
+    }
+    
+    AppState.loadingHistory = true;
+    
+    socket.emit('get_history', {
+        before: AppState.historyCursor
+    });
+}
+
+/**
+ * Insert older messages (oldest first) above the ones already shown
+ */
+function prependChatMessages(messages, isBackfill) {
+    if (messages.length === 0) {
+        return;
+    }
+    
+    const previousHeight = messagesContainer.scrollHeight;
+    const fragment = document.createDocumentFragment();
+    
+    messages.forEach(message => {
+        fragment.appendChild(createChatMessage(message, message.username === AppState.username));
+    });
+    
+    messagesContainer.insertBefore(fragment, messagesContainer.firstChild);
+    AppState.messages = messages.concat(AppState.messages);
+    
+    if (isBackfill) {
+        scrollToBottom();
+    } else {
+        // Keep the message the user was looking at in place
+        messagesContainer.scrollTop += messagesContainer.scrollHeight - previousHeight;
+    }
+}
+
 /**
  * Add chat message to display
  */
 function addChatMessage(data, isOwnMessage) {
+    messagesContainer.appendChild(createChatMessage(data, isOwnMessage));
+    scrollToBottom();
+}
+
+/**
+ * Build the element for one chat message
+ */
+function createChatMessage(data, isOwnMessage) {
     const messageDiv = document.createElement('div');
     messageDiv.className = `message ${isOwnMessage ? 'user' : 'other'}`;
     
@@ -518,8 +628,7 @@ function addChatMessage(data, isOwnMessage) {
         </div>
     `;
     
-    messagesContainer.appendChild(messageDiv);
-    scrollToBottom();
+    return messageDiv;
 }
 
 /**
@@ -637,6 +746,13 @@ messageInput.addEventListener('keypress', (e) => {
     }
 });
 
+// Scrolling to the top of the chat loads older messages
+messagesContainer.addEventListener('scroll', () => {
+    if (messagesContainer.scrollTop < 50) {
+        loadOlderMessages();
+    }
+});
+
 // Close emoji picker when clicking outside
 document.addEventListener('click', (e) => {
     const emojiPicker = document.getElementById('emojiPicker');
@@ -33,11 +33,21 @@ const AppState = {
  */
 async function fetchTasks() {
     try {
-        const response = await fetch(`${API_BASE_URL}/tasks`);
-        if (!response.ok) throw new Error('Failed to fetch tasks');
-        const data = await response.json();
-        AppState.tasks = data.tasks || [];
-        return data.tasks || [];
+        // The API returns tasks a page at a time; follow next_cursor to the end
+        let tasks = [];
+        let cursor = null;
+        do {
+            const url = cursor
+                ? `${API_BASE_URL}/tasks?cursor=${encodeURIComponent(cursor)}`
+                : `${API_BASE_URL}/tasks`;
+            const response = await fetch(url);
+            if (!response.ok) throw new Error('Failed to fetch tasks');
+            const data = await response.json();
+            tasks = tasks.concat(data.tasks || []);
+            cursor = data.next_cursor;
+        } while (cursor);
+        AppState.tasks = tasks;
+        return tasks;
     } catch (error) {
         console.error('Error fetching tasks:', error);
         showNotification('Failed to load tasks', 'error');
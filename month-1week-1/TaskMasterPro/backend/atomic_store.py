@@ -0,0 +1,323 @@
+"""
+Atomic Store Module
+Crash-safe, lock-protected JSON persistence with optimistic concurrency
+"""
+
+import json
+import os
+import tempfile
+import threading
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+class VersionConflict(Exception):
+    """Raised when an update was based on an out-of-date version"""
+
+    def __init__(self, expected, actual):
+        super().__init__(f"Version conflict: expected {expected}, current is {actual}")
+        self.expected = expected
+        self.actual = actual
+
+
+def atomic_write_json(path, data, indent=2):
+    """Write JSON so readers only ever see the old or the new file"""
+    atomic_write_text(path, json.dumps(data, indent=indent))
+
+
+def atomic_write_text(path, text):
+    """
+    Replace a file's contents atomically.
+
+    Text goes to a temp file in the same directory, is fsynced, then
+    renamed over the target (os.replace is atomic on POSIX and Windows).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp',
+                                    dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Persist the rename itself (directories can't be fsynced on Windows)
+    if os.name != 'nt':
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def read_version_file(path):
+    """
+    (version, signature) stored in a .version file, or (None, None)
+    if there is none (or it can't be read).
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    signature = meta.get('signature')
+    return meta.get('version', 0), tuple(signature) if signature else None
+
+
+def write_version_file(path, version, signature=None):
+    """Atomically record a version (and the data file signature it belongs to)"""
+    atomic_write_json(path, {'version': version, 'signature': signature}, indent=None)
+
+
+class FileLock:
+    """
+    Exclusive lock shared by threads and processes.
+
+    Uses <path>.lock with fcntl.flock (POSIX) or msvcrt.locking
+    (Windows), plus a thread lock so threads in one process queue
+    cheaply instead of contending on the OS lock.
+    """
+
+    _thread_locks = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, path):
+        self.lock_path = os.path.abspath(path) + '.lock'
+        with FileLock._registry_lock:
+            self._thread_lock = FileLock._thread_locks.setdefault(
+                self.lock_path, threading.RLock()
+            )
+        self._fd = None
+        self._depth = 0
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        self._depth += 1
+        if self._depth > 1:
+            return
+        self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT)
+        if os.name == 'nt':
+            while True:
+                try:
+                    msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s; keep waiting
+        else:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            if os.name == 'nt':
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class _PendingUpdate:
+    """One queued update waiting for a group commit"""
+
+    def __init__(self, fn, expected_version):
+        self.fn = fn
+        self.expected_version = expected_version
+        self.done = False
+        self.data = None
+        self.version = None
+        self.error = None
+
+
+class JsonStore:
+    """
+    Versioned JSON document on disk.
+
+    - Reads are served from memory while the file's signature
+      (inode, mtime, size) is unchanged, so other processes' writes
+      are still seen.
+    - Writes are atomic (temp file + fsync + rename) and serialized
+      by a FileLock.
+    - Every applied update bumps an integer version. Callers can pass
+      expected_version to get a VersionConflict instead of silently
+      overwriting someone else's change.
+    - Concurrent update() calls are group-committed: whichever thread
+      holds the commit lock applies every queued update and writes the
+      file once, so parallel writers share one fsync.
+
+    The version lives in <path>.version together with the signature of
+    the data file it belongs to. If the two disagree (e.g. a crash
+    between the two renames, or an external edit) the data is treated
+    as one version newer.
+    """
+
+    def __init__(self, path, default=None):
+        self.path = path
+        self.version_path = path + '.version'
+        self.default = default if default is not None else []
+        self.lock = FileLock(path)
+
+        self._cache_lock = threading.Lock()
+        self._cache = {'signature': None, 'data': self.default, 'version': 0}
+
+        self._queue = []
+        self._queue_lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def read(self):
+        """
+        Return (data, version).
+
+        The data object is shared with the cache: treat it as
+        read-only and return new objects from update functions.
+        """
+        signature = self._signature()
+        with self._cache_lock:
+            if signature == self._cache['signature']:
+                return self._cache['data'], self._cache['version']
+
+        data = self._read_file(signature)
+        version = self._read_version(signature)
+        with self._cache_lock:
+            self._cache = {'signature': signature, 'data': data, 'version': version}
+        return data, version
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _read_file(self, signature):
+        if signature is None:
+            return self.default
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading {self.path}: {e}")
+            return self.default
+
+    def _read_version(self, signature):
+        version, stored = read_version_file(self.version_path)
+        if version is None:
+            return 0 if signature is None else 1
+        if signature is not None and stored != signature:
+            version += 1
+        return version
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def update(self, fn, expected_version=None):
+        """
+        Apply fn(data) -> new_data and persist it atomically.
+
+        Args:
+            fn: builds and returns the new document; must not mutate
+                its argument (it may be the shared cached object)
+            expected_version: fail with VersionConflict unless the
+                current version matches
+
+        Returns:
+            (new_data, new_version)
+        """
+        op = _PendingUpdate(fn, expected_version)
+        with self._queue_lock:
+            self._queue.append(op)
+
+        with self._commit_lock:
+            if not op.done:
+                with self._queue_lock:
+                    batch, self._queue = self._queue, []
+                self._commit(batch)
+
+        if op.error is not None:
+            raise op.error
+        return op.data, op.version
+
+    def write(self, data, expected_version=None):
+        """Replace the whole document"""
+        return self.update(lambda _: data, expected_version)
+
+    def _commit(self, batch):
+        """Apply a batch of queued updates with a single file write"""
+        applied = []
+        try:
+            with self.lock:
+                # Re-check under the file lock: another process may have written
+                data, version = self.read()
+                for op in batch:
+                    if op.expected_version is not None and op.expected_version != version:
+                        op.error = VersionConflict(op.expected_version, version)
+                        continue
+                    try:
+                        data = op.fn(data)
+                    except Exception as e:
+                        op.error = e
+                        continue
+                    version += 1
+                    op.data, op.version = data, version
+                    applied.append(op)
+
+                if applied:
+                    atomic_write_json(self.path, data)
+                    signature = self._signature()
+                    write_version_file(self.version_path, version, signature)
+                    with self._cache_lock:
+                        self._cache = {'signature': signature, 'data': data,
+                                       'version': version}
+        except Exception as e:
+            for op in applied:
+                op.error = e
+            for op in batch:
+                if op.error is None and op not in applied:
+                    op.error = e
+        finally:
+            for op in batch:
+                op.done = True
+
+
+if __name__ == "__main__":
+    # Test concurrent updates
+    from concurrent.futures import ThreadPoolExecutor
+
+    path = os.path.join(tempfile.mkdtemp(), 'store_test.json')
+    store = JsonStore(path, default=[])
+
+    print("Testing Atomic Store...")
+    print("="*60)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda i: store.update(lambda items: items + [i]), range(200)))
+
+    data, version = store.read()
+    print(f"✓ {len(data)} items written, version {version}")
+
+    try:
+        store.write([], expected_version=version - 1)
+    except VersionConflict as e:
+        print(f"✓ Stale write rejected: {e}")
@@ -3,18 +3,27 @@ Flask API for TaskMasterPro
 RESTful endpoints for web frontend
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import io
+import json
 import sys
 import os
 
 # Add backend directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+from atomic_store import VersionConflict
 from task_manager import TaskManager
-from task_types import WorkTask, PersonalTask, ShoppingTask
-from decorators import AppDecorators, get_activity_log, get_performance_stats
+from task_registry import registry, task_from_dict
+from decorators import AppDecorators, get_activity_page, get_performance_stats
 from weather_service import WeatherService
+from task_query import TaskQuery
+import resilience
+import tracing
+from tracing import span
+from rate_limiter import RateLimiter, RateLimitExceeded, SharedMemoryStore, parse_limit
 
 #Initialize Flask app
 app = Flask(__name__)
@@ -22,8 +31,185 @@ CORS(app)  # enable CORS for frontend
 
 
 # Initialize services
-task_manager = TaskManager()
+# TASKMASTER_BACKEND=sqlite switches storage to a local SQLite file
+TASK_BACKEND = os.environ.get('TASKMASTER_BACKEND', 'json')
+# debug=True runs this file twice: in the reloader's file watcher and in
+# the child it starts (WERKZEUG_RUN_MAIN). The watcher never serves, so
+# it doesn't open the task journal (its compactor would race the child's).
+RELOADER_WATCHER = __name__ == '__main__' and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+# WEATHER_BASE_URL points the weather client elsewhere (e.g. stub_weather_server.py)
 weather_service = WeatherService()
+# One weather service for the routes and the task manager: one session, one cache
+task_manager = None if RELOADER_WATCHER else TaskManager(journaled=True, backend=TASK_BACKEND,
+                                                         weather_service=weather_service)
+
+# ===========================================================================================================
+# TRACING
+# ===========================================================================================================
+
+# TRACE_SAMPLE_RATE (0..1) traces that fraction of requests; a request
+# with an 'X-Trace: 1' header is always traced. Traces are served as
+# Chrome trace-event JSON at /api/traces and written to TRACE_FILE on exit.
+TRACE_FILE = os.environ.get('TRACE_FILE', os.path.join(AppDecorators.LOG_DIR, 'traces.json'))
+tracing.export_at_exit(TRACE_FILE)
+
+
+class TracedJSONProvider(DefaultJSONProvider):
+    """Shows response serialization (jsonify) as its own span"""
+
+    def dumps(self, obj, **kwargs):
+        with span('jsonify', 'serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+app.json = TracedJSONProvider(app)
+
+
+@app.before_request
+def start_request_trace():
+    """Open the root span first, so every later hook is inside it"""
+    trace = tracing.start_trace(f'{request.method} {request.path}',
+                                force=request.headers.get('X-Trace') == '1',
+                                endpoint=request.endpoint)
+    if trace is not None:
+        g.trace = trace
+
+
+@app.after_request
+def add_trace_header(response):
+    trace = g.get('trace')
+    if trace is not None:
+        response.headers['X-Trace-Id'] = trace.trace_id
+    return response
+
+
+@app.teardown_request
+def finish_request_trace(error=None):
+    trace = g.pop('trace', None)
+    if trace is not None:
+        tracing.finish_trace(trace, error=type(error).__name__ if error else None)
+
+# ===========================================================================================================
+# RATE LIMITING
+# ===========================================================================================================
+
+# RATE_LIMIT ('120/minute') and RATE_LIMIT_BURST set the per-client limit.
+# RATE_LIMIT_SHM names a file shared by all worker processes, so a
+# multi-process server enforces one limit instead of one per worker.
+rate_store = SharedMemoryStore(os.environ['RATE_LIMIT_SHM']) if os.environ.get('RATE_LIMIT_SHM') else None
+rate_limiter = RateLimiter(*parse_limit(os.environ.get('RATE_LIMIT', '120/minute')),
+                           burst=int(os.environ.get('RATE_LIMIT_BURST', 0)) or None,
+                           store=rate_store)
+
+# Stricter limits for expensive endpoints, counted per client and endpoint
+ROUTE_LIMITS = {
+    'bulk_create_tasks': RateLimiter(10, 60, store=rate_store),
+    'bulk_complete_tasks': RateLimiter(10, 60, store=rate_store),
+    'bulk_delete_tasks': RateLimiter(10, 60, store=rate_store),
+    'export_tasks': RateLimiter(10, 60, store=rate_store),
+    'get_weather_batch': RateLimiter(20, 60, store=rate_store)
+}
+RATE_LIMIT_EXEMPT = {'health_check'}
+
+
+def client_key():
+    """Client identity for rate limiting (first X-Forwarded-For hop behind a proxy)"""
+    if os.environ.get('TRUST_PROXY'):
+        forwarded = request.headers.get('X-Forwarded-For', '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.remote_addr or 'unknown'
+
+
+def rate_limited_response(result):
+    response = jsonify({
+        'success': False,
+        'message': 'Too many requests',
+        'retry_after': round(result.retry_after, 2)
+    })
+    response.status_code = 429
+    response.headers.update(result.headers())
+    return response
+
+
+@app.before_request
+def enforce_rate_limit():
+    """Reject over-limit clients before any work is done"""
+    endpoint = request.endpoint
+    if endpoint is None or endpoint in RATE_LIMIT_EXEMPT or request.method == 'OPTIONS':
+        return None
+
+    client = client_key()
+    result = rate_limiter.hit(f'ip:{client}')
+    if result.allowed and endpoint in ROUTE_LIMITS:
+        route_result = ROUTE_LIMITS[endpoint].hit(f'route:{endpoint}:{client}')
+        if not route_result.allowed or route_result.remaining < result.remaining:
+            result = route_result
+
+    g.rate_limit = result
+    if not result.allowed:
+        return rate_limited_response(result)
+    return None
+
+
+@app.after_request
+def add_rate_limit_headers(response):
+    result = g.pop('rate_limit', None)
+    if result is not None and result.allowed:
+        response.headers.update(result.headers())
+    return response
+
+# ===========================================================================================================
+# HELPERS
+# ===========================================================================================================
+
+def read_bulk_records():
+    """
+    Yield (line_number, record) from a bulk request body.
+
+    NDJSON bodies (application/x-ndjson) are read line by line from
+    the request stream; anything else is parsed as a JSON array.
+    Malformed lines are yielded as (line_number, None).
+    """
+    if request.mimetype == 'application/x-ndjson':
+        # request.stream is unbuffered; line iteration would read byte by byte
+        body = io.BufferedReader(request.stream, buffer_size=64 * 1024)
+        for number, line in enumerate(body, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError:
+                yield number, None
+    else:
+        records = request.get_json(silent=True)
+        if not isinstance(records, list):
+            records = []
+        yield from enumerate(records, 1)
+
+def read_ids():
+    """
+    The "ids" list from a bulk request body.
+
+    Returns None unless the body is a JSON object whose "ids" is a
+    list of task ID strings.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None
+    ids = data.get('ids', [])
+    if not isinstance(ids, list) or not all(isinstance(task_id, str) for task_id in ids):
+        return None
+    return ids
+
+def ndjson_response(lines, status=200):
+    """Stream an iterable of JSON strings as application/x-ndjson"""
+    def generate():
+        for line in lines:
+            yield line + '\n'
+    return Response(stream_with_context(generate()), status=status,
+                    mimetype='application/x-ndjson')
 
 # ===========================================================================================================
 # TASK ENDPOINTS
@@ -32,20 +218,30 @@ weather_service = WeatherService()
 @app.route('/api/tasks', methods=['GET'])
 @AppDecorators.timer
 def get_tasks():
-    """Get all tasks"""
-    tasks_data = []
-    for task in task_manager.tasks:
-        tasks_data.append({
-            'title': task.title,
-            'description': task.description,
-            'priority': task.priority,
-            'completed': task.completed
-        })
+    """
+    Get one page of tasks.
+
+    Query parameters:
+        priority, category, completed   - filters
+        created_after, created_before   - created-at range
+        sort       - created (default), created_at, priority, title; '-' = descending
+        limit      - page size (default 50, max 500)
+        cursor     - next_cursor from the previous page
+        fields     - comma-separated projection, e.g. fields=id,title
+    """
+    try:
+        query = TaskQuery.from_args(request.args)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    tasks, next_cursor = task_manager.get_tasks_page(query)
+    tasks_data = [query.project(task) for task in tasks]
 
     return jsonify({
         'success': True,
         'tasks': tasks_data,
-        'count': len(tasks_data)
+        'count': len(tasks_data),
+        'next_cursor': next_cursor
     })
 
 @app.route('/api/tasks', methods=['POST'])
@@ -60,49 +256,104 @@ def create_task():
     if not data.get('title'):
         return jsonify({'success': False, 'message': 'Title is required'}), 400
     
-    #Determine task type and create
-    category = data.get('category', 'General')
-
-    if category == 'Work':
-        task = WorkTask(
-            title=data['title'],
-            description=data.get('description', ''),
-            priority=data.get('priority', 'Medium'),
-            project=data.get('project', 'General')
-        )
-    elif category == 'Personal':
-        task = PersonalTask(
-            title=data['title'],
-            description=data.get('description', ''),
-            priority=data.get('priority', 'Medium'),
-            location=data.get('location', 'Home')
-        )
-    elif category == 'Shopping':
-        task = ShoppingTask(
-            title=data['title'],
-            description=data.get('description', ''),
-            priority=data.get('priority', 'Medium'),
-            store=data.get('store', 'General')
-        )
-    else:
-        # Generic task
-        from task import Task
-        task = Task(
-            title=data['title'],
-            description=data.get('description', ''),
-            priority=data.get('priority', 'Medium')
-        )
-        task.category = category
+    task = registry.from_payload(data)
 
     # Add to manager
     task_manager.add_task(task)
 
     return jsonify({
         'success': True,
-        'message': 'task created successfully'
+        'message': 'task created successfully',
+        'id': task.id
     }), 201
 
-@app.route('/api/tasks/<int:index>/complete', methods=['PUT'])
+@app.route('/api/tasks/bulk', methods=['POST'])
+@AppDecorators.timer
+def bulk_create_tasks():
+    """
+    Create many tasks in one request.
+
+    Body: a JSON array or NDJSON (one task per line). Records with a
+    'type' field (e.g. from /api/tasks/export) are restored as-is,
+    including ID and completion state; others are built like
+    POST /api/tasks. All tasks are saved in a single commit.
+
+    Response: NDJSON, one {"line", "id"} or {"line", "error"} per record
+    """
+    # (line, task, error) per record; lines are only written after the commit
+    tasks, outcomes = [], []
+    seen_ids = set()
+
+    for number, data in read_bulk_records():
+        if not isinstance(data, dict):
+            outcomes.append((number, None, 'Invalid JSON record'))
+            continue
+        if not data.get('title'):
+            outcomes.append((number, None, 'Title is required'))
+            continue
+        try:
+            task = task_from_dict(data) if 'type' in data else registry.from_payload(data)
+        except (KeyError, TypeError, ValueError) as e:
+            outcomes.append((number, None, f'Invalid task: {e}'))
+            continue
+        if task.id in seen_ids or task_manager.get_task(task.id) is not None:
+            outcomes.append((number, None, 'Duplicate task id'))
+            continue
+
+        seen_ids.add(task.id)
+        tasks.append(task)
+        outcomes.append((number, task, None))
+
+    task_manager.add_tasks(tasks)
+
+    def results():
+        for number, task, error in outcomes:
+            if task is None:
+                yield json.dumps({'line': number, 'error': error})
+            else:
+                yield json.dumps({'line': number, 'id': task.id})
+
+    return ndjson_response(results(), status=201)
+
+@app.route('/api/tasks/bulk/complete', methods=['POST'])
+@AppDecorators.timer
+def bulk_complete_tasks():
+    """Mark many tasks complete. Body: {"ids": [...]}"""
+    ids = read_ids()
+    if ids is None:
+        return jsonify({'success': False, 'message': 'ids must be a list of task ID strings'}), 400
+    completed = task_manager.complete_tasks(ids)
+    found = set(completed)
+
+    return jsonify({
+        'success': True,
+        'completed': len(completed),
+        'not_found': [task_id for task_id in ids if task_id not in found]
+    })
+
+@app.route('/api/tasks/bulk/delete', methods=['POST'])
+@AppDecorators.timer
+def bulk_delete_tasks():
+    """Delete many tasks. Body: {"ids": [...]}"""
+    ids = read_ids()
+    if ids is None:
+        return jsonify({'success': False, 'message': 'ids must be a list of task ID strings'}), 400
+    deleted = task_manager.delete_tasks(ids)
+    found = set(deleted)
+
+    return jsonify({
+        'success': True,
+        'deleted': len(deleted),
+        'not_found': [task_id for task_id in ids if task_id not in found]
+    })
+
+@app.route('/api/tasks/export', methods=['GET'])
+@AppDecorators.timer
+def export_tasks():
+    """Stream every task as NDJSON (re-importable via /api/tasks/bulk)"""
+    return ndjson_response(task_manager.export_tasks())
+
+@app.route('/api/tasks/<task_id>/complete', methods=['PUT'])
 @AppDecorators.timer
 @AppDecorators.audit_log('API_COMPLETE_TASK')
 def complete_task(task_id):
@@ -117,10 +368,10 @@ def complete_task(task_id):
     else:
         return jsonify({
             'success': False,
-            'message': 'Invalid task index'
+            'message': 'Task not found'
         }), 404
     
-@app.route('/api/tasks/<int:task_id>', methods=['DELETE'])
+@app.route('/api/tasks/<task_id>', methods=['DELETE'])
 @AppDecorators.timer
 @AppDecorators.audit_log('API_DELETE_TASK')
 def delete_task(task_id):
@@ -135,7 +386,7 @@ def delete_task(task_id):
     else:
         return jsonify({
             'success': False,
-            'message': 'Invalid task index'
+            'message': 'Task not found'
         }), 404
     
 # ===========================================================================================================
@@ -156,39 +407,68 @@ def get_stats():
 @AppDecorators.timer
 def get_priority_breakdown():
     """Get tasks by priority"""
-    breakdown = {
-        'low': len(task_manager.get_tasks_by_priority('Low')),
-        'medium': len(task_manager.get_tasks_by_priority('Medium')),
-        'high': len(task_manager.get_tasks_by_priority('High'))
-    }
+    breakdown = {'low': 0, 'medium': 0, 'high': 0}
 
-    for task in task_manager.tasks:
-        breakdown[task.priority] = breakdown.get(task.priority, 0) + 1
+    # Priorities arrive as 'high' or 'High'; fold them into one bucket
+    for priority, count in task_manager.get_statistics()['by_priority'].items():
+        key = priority.lower() if isinstance(priority, str) else priority
+        breakdown[key] = breakdown.get(key, 0) + count
 
-        return jsonify({
-            'success': True,
-            'breakdown': breakdown 
-        })
+    return jsonify({
+        'success': True,
+        'breakdown': breakdown
+    })
     
 @app.route('/api/stats/category', methods=['GET'])
 @AppDecorators.timer
 def get_category_breakdown():
     """Get tasks by category"""
-    breakdown = {}
-
-    for task in task_manager.tasks:
-        category = task.category
-        breakdown[category] = breakdown.get(category, 0) + 1
+    breakdown = task_manager.get_statistics()['by_category']
 
     return jsonify({
         'success': True,
         'breakdown': breakdown
     })
 
+@app.route('/api/stats/verify', methods=['GET'])
+@AppDecorators.timer
+def verify_stats():
+    """Check the statistics counters against a full task scan"""
+    mismatches = task_manager.verify_statistics()
+
+    return jsonify({
+        'success': not mismatches,
+        'consistent': not mismatches,
+        'mismatches': mismatches
+    })
+
 # ===========================================================================================================
 # Weather Endpoints
 # ===========================================================================================================
 
+@app.route('/api/weather', methods=['GET'])
+@AppDecorators.timer
+def get_weather_batch():
+    """Get weather for many cities at once (?cities=Paris,Tokyo,...)"""
+    cities = [c.strip() for c in request.args.get('cities', '').split(',') if c.strip()]
+    if not cities:
+        return jsonify({
+            'success': False,
+            'message': 'cities is required'
+        }), 400
+    if len(cities) > 100:
+        return jsonify({
+            'success': False,
+            'message': 'At most 100 cities per request'
+        }), 400
+
+    weather = weather_service.get_weather_many(cities)
+
+    return jsonify({
+        'success': True,
+        'weather': weather
+    })
+
 @app.route('/api/weather/<city>', methods=['GET'])
 @AppDecorators.timer
 def get_weather(city):
@@ -224,12 +504,34 @@ def get_weather_advice(city):
 @app.route('/api/logs/activity', methods=['GET'])
 @AppDecorators.timer
 def get_logs():
-    """Get activity logs"""
-    logs = get_activity_log()
+    """
+    Get activity logs, newest page first.
+
+    Query parameters (all optional):
+        limit   - entries per page (default 50, max 500)
+        action  - only this action type, e.g. CREATE_TASK
+        since   - ISO timestamp, inclusive
+        until   - ISO timestamp, exclusive
+        before  - next_cursor from the previous page (older entries)
+    """
+    try:
+        limit = int(request.args.get('limit', 50))
+        if not 1 <= limit <= 500:
+            raise ValueError("limit must be between 1 and 500")
+        logs, next_cursor = get_activity_page(
+            limit,
+            action=request.args.get('action'),
+            since=request.args.get('since'),
+            until=request.args.get('until'),
+            before=request.args.get('before')
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
 
     return jsonify({
         'success': True,
-        'logs': logs
+        'logs': logs,
+        'next_cursor': next_cursor
     })
 
 @app.route('/api/stats/performance', methods=['GET'])
@@ -243,6 +545,24 @@ def get_performance():
         'performance': stats
     })
 
+@app.route('/api/resilience', methods=['GET'])
+def get_resilience():
+    """Get circuit breaker states and retry counters"""
+    return jsonify({
+        'success': True,
+        'resilience': resilience.stats()
+    })
+
+@app.route('/api/traces', methods=['GET'])
+def get_traces():
+    """
+    Recent request traces as Chrome trace-event JSON.
+
+    Save the response and open it in chrome://tracing or
+    https://ui.perfetto.dev for a flamegraph per request.
+    """
+    return jsonify(tracing.chrome_trace())
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -263,6 +583,28 @@ def not_found(error):
         'message': 'Resource not found'
     }), 404
 
+@app.errorhandler(RateLimitExceeded)
+def rate_limit_exceeded(error):
+    """Handle limits raised by @AppDecorators.rate_limit"""
+    response = jsonify({
+        'success': False,
+        'message': str(error),
+        'retry_after': round(error.retry_after, 2)
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, int(-(-error.retry_after // 1))))
+    return response
+
+@app.errorhandler(VersionConflict)
+def version_conflict(error):
+    """Another process (e.g. the CLI) changed the task file first; tasks were reloaded"""
+    return jsonify({
+        'success': False,
+        'message': 'Tasks were changed by another process; reloaded, please retry',
+        'expected_version': error.expected,
+        'current_version': error.actual
+    }), 409
+
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
@@ -283,15 +625,28 @@ if __name__ == '__main__':
     print("📍 API running at: http://localhost:5000")
     print("📚 API endpoints:")
     print("   GET    /api/health          - Health check")
-    print("   GET    /api/tasks           - Get all tasks")
+    print("   GET    /api/tasks           - Get tasks (paginated, filterable)")
     print("   POST   /api/tasks           - Create task")
+    print("   POST   /api/tasks/bulk      - Create many tasks (JSON array or NDJSON)")
+    print("   POST   /api/tasks/bulk/complete - Complete many tasks")
+    print("   POST   /api/tasks/bulk/delete   - Delete many tasks")
+    print("   GET    /api/tasks/export    - Export all tasks as NDJSON")
     print("   PUT    /api/tasks/:id/complete - Complete task")
     print("   DELETE /api/tasks/:id       - Delete task")
     print("   GET    /api/stats           - Get statistics")
+    print("   GET    /api/stats/verify    - Check statistics counters")
+    print("   GET    /api/weather?cities=a,b - Get weather for many cities")
     print("   GET    /api/weather/:city   - Get weather")
     print("   GET    /api/logs/activity   - Get activity logs")
     print("   GET    /api/logs/performance - Get performance stats")
+    print("   GET    /api/resilience      - Circuit breakers and retries")
+    print("   GET    /api/traces          - Request traces (Chrome trace JSON)")
     print("\n✅ Server ready! Open http://localhost:5000/api/health to test")
     print("="*60 + "\n")
+
+    # Warm popular cities and keep frequently requested ones fresh
+    if not RELOADER_WATCHER:
+        weather_service.prewarm()
+        weather_service.start_refresher()
     
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -6,8 +6,16 @@ Flask REST API for task management
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from datetime import datetime
+import base64
+import bisect
 import json
 import os
+import sys
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from atomic_store import JsonStore, VersionConflict
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS so frontend can talk to backend
@@ -19,24 +27,182 @@ TASKS_FILE = os.path.join(DATA_DIR, 'tasks.json')
 # Ensure data directory exists
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# Pagination settings for GET /tasks
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+SORT_KEYS = {
+    'created_at': lambda t: t.get('created_at', ''),
+    'priority': lambda t: PRIORITY_RANK.get(str(t.get('priority', '')).lower(), 3),
+    'title': lambda t: t.get('title', ''),
+}
+# Type of each sort key's values, as stored in cursors
+SORT_VALUE_TYPES = {'created_at': str, 'priority': int, 'title': str}
+
 # ========================================
 # HELPER FUNCTIONS
 # ========================================
 
+# Versioned, crash-safe task file. Reads are cached while the file's
+# signature is unchanged; writes are atomic, file-locked and
+# group-committed (see atomic_store.py).
+task_store = JsonStore(TASKS_FILE, default=[])
+
 def load_tasks():
-    """Load tasks from JSON file"""
-    if os.path.exists(TASKS_FILE):
-        try:
-            with open(TASKS_FILE, 'r') as f:
-                return json.load(f)
-        except:
-            return []
-    return []
+    """
+    Load tasks from JSON file (served from cache while unchanged).
+
+    The returned list is shared with the cache: treat it as read-only
+    and build a new list / new task dicts in update functions.
+    """
+    return task_store.read()[0]
 
 def save_tasks(tasks):
     """Save tasks to JSON file"""
-    with open(TASKS_FILE, 'w') as f:
-        json.dump(tasks, f, indent=2)
+    return task_store.write(tasks)
+
+def expected_version():
+    """
+    Version the client based its change on, if it sent one.
+
+    Taken from the If-Match header (the ETag of a previous response)
+    or a 'version' field in the JSON body.
+    """
+    value = request.headers.get('If-Match')
+    if value is None and request.is_json:
+        value = (request.get_json(silent=True) or {}).get('version')
+    if value is None:
+        return None
+    try:
+        return int(str(value).strip('"W/'))
+    except ValueError:
+        return None
+
+def versioned(response, version, status=200):
+    """Attach the task file version as an ETag"""
+    response = jsonify(response) if isinstance(response, dict) else response
+    response.headers['ETag'] = f'"{version}"'
+    return response, status
+
+class TaskNotFound(Exception):
+    """Raised inside a store update when no task has the requested ID"""
+
+def not_found_response(task_id):
+    return jsonify({'error': f'Task {task_id} not found'}), 404
+
+def conflict_response(error):
+    return jsonify({
+        'error': 'Tasks were changed by another request',
+        'expected_version': error.expected,
+        'current_version': error.actual
+    }), 409
+
+def encode_cursor(sort, sort_value, task_id):
+    raw = json.dumps([sort, sort_value, task_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor, sort):
+    """(sort_value, id) of a cursor made for `sort`; ValueError otherwise"""
+    try:
+        cursor_sort, sort_value, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if (cursor_sort != sort or isinstance(sort_value, bool)
+            or not isinstance(sort_value, SORT_VALUE_TYPES[sort]) or not isinstance(task_id, str)):
+        raise ValueError(f'Cursor does not belong to sort={sort}')
+    return sort_value, task_id
+
+# Sorted views of the cached task list: sort -> (tasks, ordered, keys).
+# The store hands out the same list object until the file changes, so
+# a view is rebuilt once per change and reused by every page request.
+_sorted_views = {}
+
+def sorted_view(tasks, sort):
+    """(ordered tasks, (sort value, id) keys) for a task list, cached"""
+    view = _sorted_views.get(sort)
+    if view is None or view[0] is not tasks:
+        sort_key = SORT_KEYS[sort]
+        # Tasks are appended in created_at order: no sort needed
+        ordered = tasks if sort == 'created_at' else sorted(tasks, key=sort_key)
+        view = (tasks, ordered, [(sort_key(t), t.get('id', '')) for t in ordered])
+        _sorted_views[sort] = view
+    return view[1], view[2]
+
+def query_tasks(tasks, args):
+    """
+    Filter, sort and paginate a task list.
+
+    Keyset pagination: the cursor holds the sort and the (sort value,
+    id) of the last task returned, and the next page starts by
+    bisecting to it in a cached sorted view (see sorted_view), so a
+    request only walks its page.
+
+    Returns:
+        (page, next_cursor)
+    Raises:
+        ValueError: on malformed parameters
+    """
+    sort = args.get('sort', 'created_at')
+    descending = sort.startswith('-')
+    sort = sort.lstrip('-')
+    if sort not in SORT_KEYS:
+        raise ValueError(f'Unknown sort key: {sort}')
+    sort_key = SORT_KEYS[sort]
+
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+
+    priority = args.get('priority')
+    category = args.get('category')
+    completed = args.get('completed')
+    if completed is not None:
+        completed = completed.lower() in ('true', '1')
+    created_after = args.get('created_after')
+    created_before = args.get('created_before')
+
+    def matches(task):
+        if priority is not None and task.get('priority') != priority:
+            return False
+        if category is not None and task.get('category') != category:
+            return False
+        if completed is not None and task.get('completed', False) != completed:
+            return False
+        if created_after is not None and task.get('created_at', '') < created_after:
+            return False
+        if created_before is not None and task.get('created_at', '') >= created_before:
+            return False
+        return True
+
+    ordered, keys = sorted_view(tasks, sort)
+
+    cursor = args.get('cursor')
+    if cursor is None:
+        i = len(ordered) - 1 if descending else 0
+    elif descending:
+        i = bisect.bisect_left(keys, decode_cursor(cursor, sort)) - 1
+    else:
+        i = bisect.bisect_right(keys, decode_cursor(cursor, sort))
+    step = -1 if descending else 1
+
+    page = []
+    while 0 <= i < len(ordered):
+        if matches(ordered[i]):
+            if len(page) == limit:
+                last = page[-1]
+                return page, encode_cursor(sort, sort_key(last), last.get('id', ''))
+            page.append(ordered[i])
+        i += step
+    return page, None
+
+def project_fields(task, fields):
+    """Keep only the requested fields of a task"""
+    if not fields:
+        return task
+    return {field: task.get(field) for field in fields}
 
 def calculate_stats(tasks):
     """Calculate task statistics"""
@@ -67,16 +233,31 @@ def home():
 
 @app.route('/tasks', methods=['GET'])
 def get_tasks():
-    """Get all tasks"""
-    tasks = load_tasks()
-    return jsonify({'tasks': tasks})
+    """
+    Get one page of tasks.
+
+    Query parameters: priority, category, completed, created_after,
+    created_before, sort (created_at|priority|title, '-' = descending),
+    limit, cursor, fields (comma-separated)
+    """
+    tasks, version = task_store.read()
+    try:
+        page, next_cursor = query_tasks(tasks, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    fields = [f for f in request.args.get('fields', '').split(',') if f]
+    return versioned({
+        'tasks': [project_fields(t, fields) for t in page],
+        'next_cursor': next_cursor,
+        'version': version
+    }, version)
 
 @app.route('/tasks', methods=['POST'])
 def add_task():
     """Add new task"""
     try:
         data = request.json
-        tasks = load_tasks()
         
         # Create new task
         new_task = {
@@ -88,47 +269,69 @@ def add_task():
             'created_at': datetime.now().isoformat()
         }
         
-        # Add to list and save
-        tasks.append(new_task)
-        save_tasks(tasks)
+        # Append under the store's lock so parallel POSTs never lose a task
+        _, version = task_store.update(lambda tasks: tasks + [new_task],
+                                       expected_version())
         
-        return jsonify({
+        return versioned({
             'message': 'Task added successfully',
-            'task': new_task
-        }), 201
+            'task': new_task,
+            'version': version
+        }, version, 201)
         
+    except VersionConflict as e:
+        return conflict_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
 @app.route('/tasks/<task_id>/complete', methods=['PUT'])
 def complete_task(task_id):
     """Mark task as complete"""
-    try:
-        tasks = load_tasks()
-        
-        # Find and update task
+    completed_at = datetime.now().isoformat()
+
+    def mark_complete(tasks):
+        # Build new dicts: the current list is shared with the cache
+        found = False
+        updated = []
         for task in tasks:
             if task['id'] == task_id:
-                task['completed'] = True
-                task['completed_at'] = datetime.now().isoformat()
-                break
-        
-        save_tasks(tasks)
-        return jsonify({'message': 'Task completed'})
+                task = dict(task, completed=True, completed_at=completed_at)
+                found = True
+            updated.append(task)
+        if not found:
+            # Unknown ID: raising skips the write and the version bump
+            raise TaskNotFound(task_id)
+        return updated
+
+    try:
+        _, version = task_store.update(mark_complete, expected_version())
+        return versioned({'message': 'Task completed', 'version': version}, version)
         
+    except TaskNotFound:
+        return not_found_response(task_id)
+    except VersionConflict as e:
+        return conflict_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
 @app.route('/tasks/<task_id>', methods=['DELETE'])
 def delete_task(task_id):
     """Delete a task"""
+    def remove(tasks):
+        remaining = [t for t in tasks if t['id'] != task_id]
+        if len(remaining) == len(tasks):
+            raise TaskNotFound(task_id)
+        return remaining
+
     try:
-        tasks = load_tasks()
-        tasks = [t for t in tasks if t['id'] != task_id]
-        save_tasks(tasks)
+        _, version = task_store.update(remove, expected_version())
         
-        return jsonify({'message': 'Task deleted'})
+        return versioned({'message': 'Task deleted', 'version': version}, version)
         
+    except TaskNotFound:
+        return not_found_response(task_id)
+    except VersionConflict as e:
+        return conflict_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
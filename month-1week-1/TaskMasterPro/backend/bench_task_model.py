@@ -0,0 +1,156 @@
+"""
+Task Model Benchmark
+Memory and serialization cost of the slotted task model vs the old one
+
+Run: python bench_task_model.py [count]
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from task import Task
+from task_types import WorkTask, PersonalTask, ShoppingTask
+from task_serializer import serializer
+from task_registry import tasks_from_dicts
+
+
+# The model as it was before slots and epoch timestamps: copies of the
+# original Task / WorkTask / PersonalTask / ShoppingTask (docstrings and
+# __str__ left out; attributes and to_dict unchanged)
+
+class LegacyTask:
+    def __init__(self, title, description="", priority='medium'):
+        self.title = title
+        self.description = description
+        self.priority = priority
+        self.completed = False
+        self.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.completed_at = None
+
+    def to_dict(self):
+        return {
+            'type': self.__class__.__name__,
+            'title': self.title,
+            'description': self.description,
+            'priority': self.priority,
+            'completed': self.completed,
+            'created_at': self.created_at,
+            'completed_at': self.completed_at
+        }
+
+
+class LegacyWorkTask(LegacyTask):
+    def __init__(self, title, description='', priority='medium', project='General'):
+        super().__init__(title, description, priority)
+        self.project = project
+        self.category = 'Work'
+
+
+class LegacyPersonalTask(LegacyTask):
+    def __init__(self, title, description='', priority='medium', location='home'):
+        super().__init__(title, description, priority)
+        self.location = location
+        self.category = 'Personal'
+
+    def to_dict(self):
+        data = super().to_dict()
+        data['location'] = self.location
+        data['category'] = self.category
+        return data
+
+
+class LegacyShoppingTask(LegacyTask):
+    def __init__(self, title, description='', priority='medium'):
+        super().__init__(title, description, priority)
+        self.items = []
+        self.category = 'Shopping'
+
+    def to_dict(self):
+        data = super().to_dict()
+        data['items'] = self.items
+        data['category'] = self.category
+        return data
+
+
+def mixed(task_cls, work_cls, personal_cls, shopping_cls):
+    """Factory cycling through the four task types, same data for both models"""
+    def make(i):
+        kind = i % 4
+        title = f"Task {i}"
+        if kind == 0:
+            return task_cls(title, "benchmark task", "high")
+        if kind == 1:
+            return work_cls(title, "benchmark task", "high", project="Q4")
+        if kind == 2:
+            return personal_cls(title, "benchmark task", "low", location="Gym")
+        task = shopping_cls(title, "benchmark task")
+        task.items.extend(["milk", "bread"])
+        return task
+    return make
+
+
+def measure_memory(factory, count):
+    """Bytes allocated to hold `count` tasks"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return tasks, after - before
+
+
+def measure(fn, repeat=3):
+    """Best wall time of `repeat` runs"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(count=100_000):
+    print(f"Task model benchmark ({count:,} tasks)")
+    print("="*60)
+
+    legacy, legacy_bytes = measure_memory(
+        mixed(LegacyTask, LegacyWorkTask, LegacyPersonalTask, LegacyShoppingTask), count
+    )
+    slotted, slotted_bytes = measure_memory(
+        mixed(Task, WorkTask, PersonalTask, ShoppingTask), count
+    )
+    print(f"Memory  legacy : {legacy_bytes / count:7.1f} bytes/task")
+    change = slotted_bytes / legacy_bytes - 1
+    print(f"Memory  slotted: {slotted_bytes / count:7.1f} bytes/task "
+          f"({abs(change):.0%} {'larger' if change > 0 else 'smaller'}; "
+          f"the legacy model has no id and drops WorkTask.project on save)")
+
+    # Every save row below writes compact JSON, so the ratios compare the
+    # encoders; the indent=2 row only shows what the old file format cost
+    indent_time, indent_text = measure(
+        lambda: json.dumps([t.to_dict() for t in legacy], indent=2)
+    )
+    old_time, old_text = measure(lambda: json.dumps([t.to_dict() for t in legacy]))
+    dict_time, dict_text = measure(lambda: json.dumps([t.to_dict() for t in slotted]))
+    new_time, new_text = measure(lambda: serializer.dumps(slotted))
+    print(f"Save    legacy (to_dict, indent=2) : {indent_time * 1000:8.1f} ms, "
+          f"{len(indent_text) / 1024:8.0f} KB (old file format, for reference)")
+    print(f"Save    legacy (to_dict, compact)  : {old_time * 1000:8.1f} ms, "
+          f"{len(old_text) / 1024:8.0f} KB")
+    print(f"Save    slotted (to_dict, compact) : {dict_time * 1000:8.1f} ms, "
+          f"{len(dict_text) / 1024:8.0f} KB")
+    print(f"Save    slotted (serializer)       : {new_time * 1000:8.1f} ms, "
+          f"{len(new_text) / 1024:8.0f} KB ({dict_time / new_time:.2f}x vs to_dict, "
+          f"{old_time / new_time:.2f}x vs legacy)")
+
+    records = json.loads(new_text)
+    load_time, _ = measure(lambda: tasks_from_dicts(records))
+    print(f"Load    slotted (registry batch)   : {load_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -5,10 +5,20 @@ Day 15 concepts applied to production application
 
 import time
 import functools
+import inspect
 from datetime import datetime
-import json
 import os
 
+from log_writer import get_writer
+from log_reader import LogReader
+from latency_histogram import LatencyRecorder
+from lru_cache import cached
+from resilience import CircuitOpenError, retry
+from rate_limiter import RateLimiter, RateLimitExceeded
+from instrumentation import instrument
+from tracing import span, traced
+import instrumentation
+
 
 class AppDecorators:
     """Reusable decorators for task management"""
@@ -17,6 +27,22 @@ class AppDecorators:
     LOG_DIR = os.path.join(os.path.dirname(__file__), 'data')
     ACTIVITY_LOG = os.path.join(LOG_DIR, 'activity.log')
     PERFORMANCE_LOG = os.path.join(LOG_DIR, 'performance.log')
+    PERFORMANCE_STATS = os.path.join(LOG_DIR, 'performance_stats.json')
+
+    # Rotation: keep each log under LOG_MAX_BYTES plus LOG_BACKUPS old segments
+    LOG_MAX_BYTES = 5 * 1024 * 1024
+    LOG_BACKUPS = 5
+
+    # Entries are queued and written in batches by a background thread
+    activity_writer = get_writer(ACTIVITY_LOG, max_bytes=LOG_MAX_BYTES,
+                                 backup_count=LOG_BACKUPS)
+    activity_reader = LogReader(ACTIVITY_LOG)
+
+    # In-memory latency histograms per function, snapshotted to disk
+    # (performance.log is no longer written; an old one seeds them once)
+    latency = LatencyRecorder(PERFORMANCE_STATS)
+    if not os.path.exists(PERFORMANCE_STATS):
+        latency.backfill(PERFORMANCE_LOG)
 
     @staticmethod
     def ensure_log_dir():
@@ -25,34 +51,29 @@ class AppDecorators:
 
     @staticmethod
     def timer(func):
-        """Measure and log execution time"""
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            start = time.time()
-            result = func(*args, **kwargs)
-            end = time.time()
-            duration = end - start
-
-            # Log to performance file
-            AppDecorators.ensure_log_dir()
-            perf_entry = {
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'function': func.__name__,
-                'duration_seconds': duration
-            }
-
-            try:
-                with open(AppDecorators.PERFORMANCE_LOG, 'a') as f:
-                    f.write(json.dumps(perf_entry) + '\n')
-            except:
-                pass
-
-            # Print if slow
-            if duration > 0.1:
-                print(f'⚠️ Function "{func.__name__}" took {duration:.4f} seconds')
-
-            return result
-        return wrapper
+        """
+        Measure execution time into the latency histograms.
+
+        Built on instrumentation.instrument: timing uses perf_counter_ns,
+        INSTRUMENTATION_SAMPLE_RATE limits the histograms to a sample of
+        calls, and INSTRUMENTATION=off returns the function itself,
+        without the tracing wrapper either. Every sampled call is also
+        aggregated per call site, and inside a traced request every call
+        is recorded as a span.
+
+        A sampled call only updates in-memory counters: slow calls show
+        up in the histogram's max and p99 (get_performance_stats) rather
+        than as a log entry and a print per call.
+        """
+        if not instrumentation.ENABLED_AT_IMPORT:
+            return func
+        name = func.__name__
+
+        def record(site, elapsed_ns):
+            AppDecorators.latency.record(name, elapsed_ns / 1e9)
+
+        # Calls inside a traced request also become spans (see tracing.py)
+        return instrument(traced(func), on_sample=record)
     
     @staticmethod
     def audit_log(action_type, include_result=False):
@@ -76,94 +97,75 @@ class AppDecorators:
                     if include_result and result:
                         log_entry['result'] = str(result)[:100] # truncate long results 
 
-                    # Append to log file
-                    AppDecorators.ensure_log_dir()
-                    try:
-                        with open(AppDecorators.ACTIVITY_LOG, 'a') as f:
-                            f.write(json.dumps(log_entry) + '\n')
-                    except Exception as e:
-                        print(f'Logging error: {e}')
+                    # Append to log file (queued, written in the background)
+                    with span('audit_log', 'log', action=action_type):
+                        AppDecorators.activity_writer.write(log_entry)
 
                     return result
                 return wrapper
             return decorator
         
+    # Caches for get_performance_stats, by '<module>.<qualname>' like the
+    # instrumentation call sites (bare names clash across classes)
+    caches = {}
+
     @staticmethod
-    def cache_with_ttl(ttl_minutes=30):
-        """Cache results with time-to-live"""
-        cache = {}
+    def cache_with_ttl(ttl_minutes=30, maxsize=256):
+        """
+        Cache results with time-to-live.
 
+        Backed by a size-bounded LRU (lru_cache.TTLCache): entries expire
+        after ttl_minutes, the least recently used go first when full,
+        `self` is not part of the key, and concurrent misses for the
+        same arguments share one call. None results are not cached.
+        """
         def decorator(func):
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                # Create cache key from arguments
-                cache_key = f'{func.__name__}: {str(args)}:{str(kwargs)}'
-                now = time.time()
-
-                # Check cache
-                if cache_key in cache:
-                    cached_time, cached_data = cache[cache_key]
-                    age_minutes = (now - cached_time) / 60
-
-                    if age_minutes < ttl_minutes:
-                        print(f'🔄 Using cached result for "{func.__name__}"')
-                        return cached_data
-                    else:
-                        # Expired
-                        del cache[cache_key]
-
-                # Fetch fresh data
-                print(f'🔄 Cache miss for {func.__name__}, fetching fresh data')
-                result = func(*args, **kwargs)
-
-                # Cache it
-                if result is not None:
-                    cache[cache_key] = (now, result)
-
-                return result
-            
-            # Add cache management methods
-            wrapper.clear_cache = lambda: cache.clear()
-            wrapper.get_cache_info = lambda: {
-                 "size": len(cache),
-                "keys": list(cache.keys())
-            }
-            
+            wrapper = cached(maxsize=maxsize, ttl=ttl_minutes * 60)(func)
+            AppDecorators.caches[f'{func.__module__}.{func.__qualname__}'] = wrapper.cache
             return wrapper
         return decorator
     
     @staticmethod
-    def retry_on_failure(max_attempts=3, delay=1, backoff=2):
-        """Retry failed operations with exponential backoff"""
+    def retry_on_failure(max_attempts=3, delay=1, backoff=2, max_delay=10, deadline=10,
+                         breaker=None):
+        """
+        Retry failed operations with full-jitter exponential backoff.
+
+        Exceptions and None results are retried; once the attempts or
+        the `deadline` budget (seconds for the whole call, 10 by
+        default) run out the wrapper returns None. `breaker` names a resilience circuit
+        breaker: while it is open, calls return None at once instead of
+        tying up a worker. Coroutine functions are awaited and wait with
+        asyncio.sleep.
+        """
         def decorator(func):
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                current_delay = delay
-                
-                for attempt in range(1, max_attempts + 1):
+            retrying = retry(max_attempts=max_attempts, base_delay=delay, max_delay=max_delay,
+                             multiplier=backoff, deadline=deadline,
+                             retry_if=lambda result: result is None, breaker=breaker)(func)
+
+            def give_up(e):
+                if isinstance(e, CircuitOpenError):
+                    print(f"⛔ {e}")
+                else:
+                    print(f"❌ All attempts of {func.__name__} failed: {e}")
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
                     try:
-                        result = func(*args, **kwargs)
-                        
-                        if result is not None:
-                            if attempt > 1:
-                                print(f"✓ Succeeded on attempt {attempt}/{max_attempts}")
-                            return result
-                        
-                        # None result, but no exception - might be valid
-                        if attempt == max_attempts:
-                            return result
-                            
+                        return await retrying(*args, **kwargs)
                     except Exception as e:
-                        if attempt < max_attempts:
-                            print(f"🔄 Attempt {attempt}/{max_attempts} failed: {e}")
-                            print(f"   Retrying in {current_delay}s...")
-                            time.sleep(current_delay)
-                            current_delay *= backoff  # Exponential backoff
-                        else:
-                            print(f"❌ All {max_attempts} attempts failed: {e}")
-                            return None
-                
-                return None
+                        give_up(e)
+                        return None
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                try:
+                    return retrying(*args, **kwargs)
+                except Exception as e:
+                    give_up(e)
+                    return None
             return wrapper
         return decorator
     
@@ -195,85 +197,84 @@ class AppDecorators:
         return decorator
     
     @staticmethod
-    def rate_limit(max_calls=10, time_window=60):
-        """Rate limit function calls"""
-        calls = []
-        
+    def rate_limit(max_calls=10, time_window=60, key=None):
+        """
+        Rate limit function calls.
+
+        O(1) GCRA limiter (rate_limiter.RateLimiter): up to max_calls per
+        time_window, as a burst or spread out. `key` maps the call
+        arguments to a bucket (e.g. lambda user_id, **kw: user_id); by
+        default all callers share one. Over the limit the call raises
+        RateLimitExceeded, which carries retry_after.
+        """
+        limiter = RateLimiter(max_calls, time_window)
+
         def decorator(func):
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
-                now = time.time()
-                
-                # Remove old calls outside time window
-                nonlocal calls
-                calls = [call_time for call_time in calls if now - call_time < time_window]
-                
-                # Check if rate limit exceeded
-                if len(calls) >= max_calls:
-                    wait_time = time_window - (now - calls[0])
-                    print(f"⏸️  Rate limit reached. Try again in {wait_time:.1f}s")
-                    return None
-                
-                # Record this call
-                calls.append(now)
-                
+                bucket = str(key(*args, **kwargs)) if key else func.__name__
+                result = limiter.hit(bucket)
+                if not result.allowed:
+                    print(f"⏸️  Rate limit reached. Try again in {result.retry_after:.1f}s")
+                    raise RateLimitExceeded(bucket, result.retry_after)
                 return func(*args, **kwargs)
+            wrapper.limiter = limiter
             return wrapper
         return decorator
 
 
-def get_activity_log(limit=50):
+def get_activity_log(limit=50, **filters):
     """Retrieve recent activity log entries"""
-    AppDecorators.ensure_log_dir()
-    
+    return get_activity_page(limit, **filters)[0]
+
+
+def get_activity_page(limit=50, action=None, since=None, until=None, before=None):
+    """
+    Read one page of the activity log, newest records first.
+
+    The log is read backwards from its end (and back through rotated
+    segments), so only the requested records are parsed.
+
+    Returns:
+        (entries oldest first, cursor for the next older page or None)
+
+    Raises:
+        ValueError: on a malformed cursor
+    """
+    AppDecorators.activity_writer.flush()
+
     try:
-        with open(AppDecorators.ACTIVITY_LOG, 'r') as f:
-            logs = [json.loads(line) for line in f.readlines()]
-        return logs[-limit:]  # Return last N entries
-    except FileNotFoundError:
-        return []
+        return AppDecorators.activity_reader.page(
+            limit, action=action, since=since, until=until, before=before
+        )
+    except ValueError:
+        raise
     except Exception as e:
         print(f"Error reading log: {e}")
-        return []
+        return [], None
 
 
 def get_performance_stats():
-    """Get performance statistics"""
-    AppDecorators.ensure_log_dir()
-    
-    try:
-        with open(AppDecorators.PERFORMANCE_LOG, 'r') as f:
-            logs = [json.loads(line) for line in f.readlines()]
-        
-        if not logs:
-            return {"message": "No performance data yet"}
-        
-        # Calculate stats
-        by_function = {}
-        for log in logs:
-            func = log['function']
-            duration = log['duration_ms']
-            
-            if func not in by_function:
-                by_function[func] = []
-            by_function[func].append(duration)
-        
-        # Aggregate
-        stats = {}
-        for func, durations in by_function.items():
-            stats[func] = {
-                "calls": len(durations),
-                "avg_ms": round(sum(durations) / len(durations), 2),
-                "min_ms": round(min(durations), 2),
-                "max_ms": round(max(durations), 2)
-            }
-        
-        return stats
-        
-    except FileNotFoundError:
+    """
+    Get performance statistics per function.
+
+    Served from the in-memory latency histograms that timer feeds,
+    so the cost does not grow with the size of performance.log.
+    'caches' holds the counters of every registered cache (functions
+    decorated with cache_with_ttl, the weather cache), and 'call_sites'
+    holds exact call counts per instrumented function (histograms only
+    see sampled calls).
+    """
+    stats = AppDecorators.latency.summary()
+    caches = {name: cache.stats() for name, cache in list(AppDecorators.caches.items())}
+    if caches:
+        stats['caches'] = caches
+    call_sites = instrumentation.report()
+    if call_sites:
+        stats['call_sites'] = call_sites
+    if not stats:
         return {"message": "No performance data yet"}
-    except Exception as e:
-        return {"error": str(e)}
+    return stats
 
 
 if __name__ == "__main__":
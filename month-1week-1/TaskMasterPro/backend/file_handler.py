@@ -6,6 +6,12 @@ Day 14 Capstone: Demonstrates JSON persistence
 import json
 import os
 
+from atomic_store import (FileLock, VersionConflict, atomic_write_text,
+                          read_version_file, write_version_file)
+from journal import TaskJournal
+from task_serializer import serializer
+from tracing import traced
+
 
 class FileHandler:
     """
@@ -15,33 +21,72 @@ class FileHandler:
     - JSON serialization/deserialization
     - File operations
     - Error handling
+
+    STORAGE MODES:
+    - plain: every change rewrites the whole file
+    - journaled: changes are appended to a log that a background
+      compactor folds into the snapshot (see journal.py)
+
+    Both modes can share one file (the CLI is plain, the API
+    journaled): plain loads replay any journal on top of the snapshot,
+    and plain saves empty it again, under the journal's FileLock.
+
+    VERSIONS: every write bumps a counter in <filename>.version (the
+    same file format as atomic_store.JsonStore). The handler remembers
+    the version it loaded or last wrote; if another process (the CLI
+    next to the API, say) has written since, the write raises
+    VersionConflict instead of overwriting that change. The check and
+    the write happen under <filename>.version.lock. The counter counts
+    commits rather than tracking the snapshot's signature, because in
+    journaled mode the data is snapshot + journal and compaction
+    rewrites the snapshot without changing any task.
     """
     
-    def __init__(self, filename="tasks.json"):
+    def __init__(self, filename="tasks.json", journaled=False,
+                 compact_threshold=1000, compact_interval=30.0):
         self.filename = filename
+        self.lock = FileLock(filename)
+        self.version_path = filename + '.version'
+        self.version_lock = FileLock(self.version_path)
+        self.version = None     # last version loaded or written here
+        self.journal_lock = FileLock(filename + '.journal')     # as TaskJournal's
+        self.journal = None
+        if journaled:
+            self.journal = TaskJournal(filename, compact_threshold, compact_interval)
     
+    @traced(category='file')
     def save_tasks(self, tasks):
         """
         Save task list to JSON file.
         
         CONCEPTS:
-        - Converting objects to dictionaries
-        - JSON serialization
+        - JSON serialization (precompiled, see task_serializer.py)
         - File writing
         """
         try:
-            # Convert all tasks to dictionaries
-            task_dicts = [task.to_dict() for task in tasks]
-            
-            # Write to file
-            with open(self.filename, 'w') as f:
-                json.dump(task_dicts, f, indent=2)
+            # Encode straight to JSON text, no intermediate dictionaries
+            data = serializer.dumps(tasks)
+
+            with self.version_lock:
+                current = self._check_version()
+                if self.journal:
+                    self.journal.checkpoint(data)
+                else:
+                    # Write atomically (temp file + fsync + rename) under the file
+                    # lock, so a crash or a concurrent writer never leaves a torn file
+                    with self.journal_lock, self.lock:
+                        atomic_write_text(self.filename, data)
+                        self._clear_foreign_journal()
+                self._bump_version(current)
             
             return True
+        except VersionConflict:
+            raise
         except Exception as e:
             print(f"Error saving tasks: {e}")
             return False
     
+    @traced(category='file')
     def load_tasks(self):
         """
         Load tasks from JSON file.
@@ -50,21 +95,117 @@ class FileHandler:
             List of task dictionaries (not Task objects)
             This allows TaskManager to recreate appropriate Task types
         """
-        if not os.path.exists(self.filename):
-            return []
-        
         try:
-            with open(self.filename, 'r') as f:
-                return json.load(f)
+            with self.version_lock:
+                self.version = read_version_file(self.version_path)[0] or 0
+
+                if self.journal:
+                    return self.journal.load()
+
+                with self.journal_lock:
+                    if not os.path.exists(self.filename):
+                        tasks = []
+                    else:
+                        with open(self.filename, 'r') as f:
+                            tasks = json.load(f)
+                    # Changes a journaled process (the API) hasn't folded in yet
+                    for path in (self.filename + '.compacting', self.filename + '.journal'):
+                        TaskJournal._replay(tasks, TaskJournal._read_records(path))
+                    return tasks
         except Exception as e:
             print(f"Error loading tasks: {e}")
             return []
     
+    def task_added(self, tasks, task):
+        """Persist a task that was just added to `tasks`"""
+        return self._record(tasks, _add_record(task))
+
+    def task_updated(self, tasks, task):
+        """Persist a change to an existing task"""
+        return self._record(tasks, _update_record(task))
+
+    def task_deleted(self, tasks, task):
+        """Persist the removal of a task that is no longer in `tasks`"""
+        return self._record(tasks, {'op': 'delete', 'id': task.id})
+
+    def tasks_changed(self, tasks, added=(), updated=(), deleted=()):
+        """
+        Persist a batch of changes as one commit.
+
+        Journaled mode writes every record in a single append; plain
+        mode rewrites the file once for the whole batch.
+        """
+        records = (
+            [_add_record(task) for task in added]
+            + [_update_record(task) for task in updated]
+            + [{'op': 'delete', 'id': task.id} for task in deleted]
+        )
+        if not records:
+            return True
+        return self._record(tasks, *records)
+
+    @traced(category='file')
+    def _record(self, tasks, *records):
+        """Append journal records, or rewrite the file in plain mode"""
+        if not self.journal:
+            return self.save_tasks(tasks)
+
+        try:
+            with self.version_lock:
+                current = self._check_version()
+                self.journal.append(*records)
+                self._bump_version(current)
+            return True
+        except VersionConflict:
+            raise
+        except Exception as e:
+            print(f"Error journaling task change: {e}")
+            return False
+
+    def _check_version(self):
+        """Current version; VersionConflict if someone else wrote since we read (call under version_lock)"""
+        current = read_version_file(self.version_path)[0] or 0
+        if self.version is not None and current != self.version:
+            raise VersionConflict(self.version, current)
+        return current
+
+    def _clear_foreign_journal(self):
+        """
+        Plain mode: after a save the snapshot holds everything another
+        process journaled (it was loaded with it), so the log is emptied.
+        The journal is truncated rather than removed, so a process that
+        still has it open for appending keeps writing to the live file.
+        """
+        journal_file = self.filename + '.journal'
+        if os.path.exists(journal_file):
+            os.truncate(journal_file, 0)
+        if os.path.exists(self.filename + '.compacting'):
+            os.remove(self.filename + '.compacting')
+
+    def _bump_version(self, current):
+        self.version = current + 1
+        write_version_file(self.version_path, self.version)
+
+    def close(self):
+        """Flush the journal into the snapshot and stop the compactor"""
+        if self.journal:
+            self.journal.close()
+
     def file_exists(self):
         """Check if data file exists"""
         return os.path.exists(self.filename)
 
 
+def _add_record(task):
+    """Journal record for a new task, pre-encoded as JSON text"""
+    return '{"op":"add","task":' + serializer.dump(task) + '}'
+
+
+def _update_record(task):
+    """Journal record for a changed task, pre-encoded as JSON text"""
+    return '{"op":"update","id":' + json.dumps(task.id) + ',"task":' + serializer.dump(task) + '}'
+
+
 if __name__ == "__main__":
     # Test file handler
     from task import Task
@@ -93,7 +234,18 @@ if __name__ == "__main__":
     for task_data in loaded:
         print(f"  - {task_data['title']} [{task_data['priority']}]")
     
+    # A second handler (another process) writes in between
+    other = FileHandler("test_tasks.json")
+    other.load_tasks()
+    other.save_tasks(tasks[:1])
+    try:
+        handler.save_tasks(tasks)
+    except VersionConflict as e:
+        print(f"\n✓ Stale save refused: {e}")
+    
     # Cleanup
-    if os.path.exists("test_tasks.json"):
-        os.remove("test_tasks.json")
-        print("\n✓ Test file cleaned up")
\ No newline at end of file
+    for path in ("test_tasks.json", "test_tasks.json.lock", "test_tasks.json.journal.lock",
+                 "test_tasks.json.version", "test_tasks.json.version.lock"):
+        if os.path.exists(path):
+            os.remove(path)
+    print("\n✓ Test files cleaned up")
\ No newline at end of file
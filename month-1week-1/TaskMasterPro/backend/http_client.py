@@ -0,0 +1,137 @@
+"""
+HTTP Client Module
+Shared keep-alive connection pool with sync and asyncio batch requests
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpClient:
+    """
+    One requests.Session with a sized connection pool.
+
+    Reusing the session keeps TCP/TLS connections alive between calls,
+    so only the first request to a host pays for the handshake.
+
+    get_many() runs requests concurrently from asyncio. aiohttp is not
+    a dependency here, so each request runs on a worker thread of a
+    pool as large as the connection pool; every request gets its own
+    pooled connection and a batch costs about one round trip.
+    """
+
+    def __init__(self, pool_size=50, timeout=(3.05, 5.0), headers=None):
+        """
+        Args:
+            pool_size: keep-alive connections per host (also the batch
+                concurrency)
+            timeout: seconds, or (connect, read) tuple, used when a call
+                doesn't pass its own
+            headers: sent with every request
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def get_json(self, url, **kwargs):
+        """GET and decode JSON; None on any error or non-200 status"""
+        try:
+            response = self.get(url, **kwargs)
+            if response.status_code == 200:
+                return response.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"HTTP error for {url}: {e}")
+        return None
+
+    async def get_many(self, urls, fetch=None):
+        """
+        Fetch many URLs concurrently.
+
+        Args:
+            urls: iterable of URLs (or any items when `fetch` is given)
+            fetch: blocking function applied to each item; defaults to
+                get_json
+
+        Returns:
+            list of results in the same order as `urls`
+        """
+        fetch = fetch or self.get_json
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        return await asyncio.gather(
+            *(loop.run_in_executor(executor, fetch, url) for url in urls)
+        )
+
+    def close(self):
+        self.session.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size,
+                                                    thread_name_prefix='http-client')
+            return self._executor
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Process-wide client shared by the services.
+
+    HTTP_POOL_SIZE and HTTP_TIMEOUT (seconds) override the defaults.
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            options = {}
+            if os.environ.get('HTTP_POOL_SIZE'):
+                options['pool_size'] = int(os.environ['HTTP_POOL_SIZE'])
+            if os.environ.get('HTTP_TIMEOUT'):
+                options['timeout'] = float(os.environ['HTTP_TIMEOUT'])
+            _default_client = HttpClient(**options)
+        return _default_client
+
+
+if __name__ == "__main__":
+    # Compare sequential and batched fetches against the stub server
+    import time
+    from stub_weather_server import start_stub_server
+
+    server, url = start_stub_server(delay=0.05)
+    client = HttpClient()
+    urls = [f"{url}/City{i}?format=j1" for i in range(50)]
+
+    print("Testing HTTP Client...")
+    print("="*60)
+
+    start = time.perf_counter()
+    for each in urls:
+        client.get_json(each)
+    print(f"✓ Sequential: {time.perf_counter() - start:.2f}s for {len(urls)} requests")
+
+    start = time.perf_counter()
+    results = asyncio.run(client.get_many(urls))
+    print(f"✓ Batched:    {time.perf_counter() - start:.2f}s for {len(results)} requests")
+    server.shutdown()
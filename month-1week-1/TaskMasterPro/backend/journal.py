@@ -0,0 +1,287 @@
+"""
+Task Journal Module
+Append-only mutation log with background compaction
+"""
+
+import json
+import os
+import threading
+
+from atomic_store import FileLock, atomic_write_json, atomic_write_text
+
+
+class TaskJournal:
+    """
+    Append-only journal of task mutations on top of a JSON snapshot.
+
+    Every mutation is written as one small JSON line instead of
+    re-serializing the whole task list. A background compactor folds
+    the journal into the snapshot once it grows past a threshold, so
+    startup only has to replay a short log tail.
+
+    FILES:
+    - <filename>             snapshot (same format as plain tasks.json)
+    - <filename>.journal     active log, one record per line
+    - <filename>.compacting  log being folded by the compactor
+
+    A crash in the middle of an append leaves a torn last line; it is
+    cut off before the log is appended to again, so later records are
+    never glued onto it. Compaction and checkpoints hold a FileLock
+    (<filename>.journal.lock), so processes sharing the files never
+    fold or replace them at the same time.
+    """
+
+    def __init__(self, filename, compact_threshold=1000, compact_interval=30.0):
+        self.filename = filename
+        self.journal_file = filename + '.journal'
+        self.compacting_file = filename + '.compacting'
+        self.compact_threshold = compact_threshold
+        self.compact_interval = compact_interval
+
+        self._lock = threading.Lock()            # guards the active journal
+        self._compact_lock = threading.Lock()    # one compaction at a time
+        self._file_lock = FileLock(self.journal_file)   # ... across processes too
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._journal = None
+        self._pending = self._count_records(self.journal_file)
+
+        self._worker = threading.Thread(
+            target=self._compact_loop, name='task-journal-compactor', daemon=True
+        )
+        self._worker.start()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, *records):
+        """
+        Append one or more mutation records with a single write.
+
+        Records are dicts, or strings that are already JSON encoded.
+        """
+        data = ''.join(
+            (record if isinstance(record, str) else json.dumps(record)) + '\n'
+            for record in records
+        )
+
+        with self._lock:
+            if self._journal is None:
+                _truncate_torn_tail(self.journal_file)
+                self._journal = open(self.journal_file, 'a', encoding='utf-8')
+            self._journal.write(data)
+            self._journal.flush()
+            self._pending += len(records)
+            should_compact = self._pending >= self.compact_threshold
+
+        if should_compact:
+            self._wakeup.set()
+
+    def checkpoint(self, task_dicts):
+        """
+        Replace snapshot and journal with a full copy of the task list.
+
+        Accepts a list of task dicts or an already-encoded JSON string.
+        """
+        with self._compact_lock, self._file_lock, self._lock:
+            self._write_snapshot(task_dicts)
+            self._close_journal()
+            for path in (self.journal_file, self.compacting_file):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._pending = 0
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Return the snapshot with every journaled mutation replayed"""
+        with self._compact_lock, self._lock:
+            tasks = self._read_snapshot()
+            for path in (self.compacting_file, self.journal_file):
+                self._replay(tasks, self._read_records(path))
+            return tasks
+
+    @staticmethod
+    def _replay(tasks, records):
+        """
+        Apply mutation records to a list of task dictionaries.
+
+        Records address tasks by ID, so replay works on an ID index
+        and rebuilds the list order once at the end.
+        """
+        if not records:
+            return
+
+        by_id = {}
+        for position, task in enumerate(tasks):
+            by_id[task.get('id') or f'#{position}'] = task
+
+        for record in records:
+            op = record.get('op')
+            if op == 'add':
+                task = record['task']
+                by_id[task.get('id') or f'#{len(by_id)}'] = task
+            elif op == 'update':
+                by_id[record['id']] = record['task']
+            elif op == 'delete':
+                by_id.pop(record['id'], None)
+
+        tasks[:] = by_id.values()
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.filename):
+            return []
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _read_records(path):
+        """
+        Read journal records, stopping at a torn trailing line.
+
+        A crash in the middle of an append can leave a partial last
+        line; everything before it is still valid.
+        """
+        if not os.path.exists(path):
+            return []
+
+        records = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return records
+
+    @staticmethod
+    def _count_records(path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact(self):
+        """
+        Fold the journal into the snapshot.
+
+        The active journal is swapped out under the write lock, so
+        appends only wait for a rename, not for the fold itself.
+        """
+        with self._compact_lock, self._file_lock:
+            with self._lock:
+                if self._pending == 0 and not os.path.exists(self.compacting_file):
+                    return False
+                self._close_journal()
+                if os.path.exists(self.journal_file):
+                    if os.path.exists(self.compacting_file):
+                        # Leftover from an interrupted compaction: keep order
+                        _truncate_torn_tail(self.compacting_file)
+                        _truncate_torn_tail(self.journal_file)
+                        with open(self.compacting_file, 'a', encoding='utf-8') as dst, \
+                                open(self.journal_file, 'r', encoding='utf-8') as src:
+                            dst.write(src.read())
+                        os.remove(self.journal_file)
+                    else:
+                        os.replace(self.journal_file, self.compacting_file)
+                self._pending = 0
+                if not os.path.exists(self.compacting_file):
+                    return False
+
+            tasks = self._read_snapshot()
+            self._replay(tasks, self._read_records(self.compacting_file))
+            self._write_snapshot(tasks)
+            os.remove(self.compacting_file)
+            return True
+
+    def _compact_loop(self):
+        """Background worker: compact on threshold or on a timer"""
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.compact_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Journal compaction error: {e}")
+
+    def _write_snapshot(self, task_dicts):
+        """Write the snapshot via temp file + rename so it is never torn"""
+        with FileLock(self.filename):
+            if isinstance(task_dicts, str):
+                atomic_write_text(self.filename, task_dicts)
+            else:
+                atomic_write_json(self.filename, task_dicts, indent=None)
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def close(self):
+        """Stop the compactor and fold any outstanding records"""
+        self._stopped.set()
+        self._wakeup.set()
+        self._worker.join(timeout=5)
+        self.compact()
+        with self._lock:
+            self._close_journal()
+
+
+def _truncate_torn_tail(path, chunk_size=4096):
+    """Cut a file back to its last newline (drops a line torn by a crash)"""
+    try:
+        f = open(path, 'rb+')
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b'\n')
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            f.truncate(position)
+
+
+if __name__ == "__main__":
+    # Test journal replay and compaction
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), 'tasks.json')
+    journal = TaskJournal(path, compact_threshold=3)
+
+    print("Testing Task Journal...")
+    print("="*60)
+
+    journal.append({'op': 'add', 'task': {'id': 'a', 'title': 'A'}})
+    journal.append({'op': 'add', 'task': {'id': 'b', 'title': 'B'}})
+    journal.append({'op': 'update', 'id': 'a', 'task': {'id': 'a', 'title': 'A2'}})
+    journal.append({'op': 'delete', 'id': 'b'})
+    print(f"✓ Replayed: {journal.load()}")
+
+    journal.compact()
+    print(f"✓ After compaction: {journal.load()}")
+
+    # Simulate a crash mid-append, then keep writing
+    with open(journal.journal_file, 'a', encoding='utf-8') as f:
+        f.write('{"op": "add", "task": {"id": "c", "ti')
+    journal._close_journal()
+    journal.append({'op': 'add', 'task': {'id': 'd', 'title': 'D'}})
+    print(f"✓ Torn line dropped, later records kept: {journal.load()}")
+    journal.close()
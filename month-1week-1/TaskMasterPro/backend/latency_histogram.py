@@ -0,0 +1,266 @@
+"""
+Latency Histogram Module
+Streaming per-function latency histograms with periodic snapshots
+"""
+
+import atexit
+import json
+import os
+import threading
+
+from atomic_store import atomic_write_json
+
+# Bucket layout (HDR histogram style): values are recorded in whole
+# microseconds. Values below 2 * SUB_BUCKETS get their own bucket; above
+# that every power of two is split into SUB_BUCKETS linear buckets, so a
+# bucket is never wider than ~3% of its value.
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+BUCKET_COUNT = SUB_BUCKETS * (32 - SUB_BUCKET_BITS - 1) + 2 * SUB_BUCKETS  # up to ~71 min
+
+PERCENTILES = (('p50', 50.0), ('p90', 90.0), ('p99', 99.0), ('p999', 99.9))
+
+
+def bucket_index(micros):
+    """Bucket for a value in microseconds"""
+    if micros < 2 * SUB_BUCKETS:
+        return micros
+    shift = micros.bit_length() - SUB_BUCKET_BITS - 1
+    index = SUB_BUCKETS * shift + (micros >> shift)
+    return index if index < BUCKET_COUNT else BUCKET_COUNT - 1
+
+
+def bucket_bounds(index):
+    """(lowest, highest) microsecond value that lands in a bucket"""
+    if index < 2 * SUB_BUCKETS:
+        return index, index
+    shift = index // SUB_BUCKETS - 1
+    low = (index - SUB_BUCKETS * shift) << shift
+    return low, low + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Fixed-size latency histogram for one function.
+
+    Recording is an integer bucket increment under an uncontended lock,
+    and every statistic is computed from the BUCKET_COUNT counters, so
+    memory and query time stay constant no matter how many calls have
+    been recorded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0          # microseconds
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        micros = int(seconds * 1_000_000)
+        if micros < 0:
+            micros = 0
+        index = bucket_index(micros)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += micros
+            if self.min is None or micros < self.min:
+                self.min = micros
+            if self.max is None or micros > self.max:
+                self.max = micros
+
+    def percentile(self, percent):
+        """Approximate value (microseconds) at a percentile"""
+        with self._lock:
+            return self._percentiles([percent])[0]
+
+    def _percentiles(self, percents):
+        """Walk the buckets once for several percentiles (caller holds the lock)"""
+        if not self.count:
+            return [0 for _ in percents]
+        targets = [max(1, -(-self.count * p // 100)) for p in percents]
+        results = [None] * len(percents)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            seen += bucket_count
+            for i, target in enumerate(targets):
+                if results[i] is None and seen >= target:
+                    low, high = bucket_bounds(index)
+                    # Report the bucket midpoint, clamped to what was observed
+                    results[i] = min(max((low + high) // 2, self.min), self.max)
+            if results[-1] is not None:
+                break
+        return results
+
+    def summary(self):
+        """Stats dictionary in milliseconds"""
+        with self._lock:
+            if not self.count:
+                return {'calls': 0}
+            values = self._percentiles([p for _, p in PERCENTILES])
+            stats = {
+                'calls': self.count,
+                'avg_ms': round(self.total / self.count / 1000, 3),
+                'min_ms': round(self.min / 1000, 3),
+                'max_ms': round(self.max / 1000, 3),
+            }
+        for (name, _), value in zip(PERCENTILES, values):
+            stats[f'{name}_ms'] = round(value / 1000, 3)
+        return stats
+
+    def to_dict(self):
+        """Serializable state (sparse bucket counts)"""
+        with self._lock:
+            return {
+                'count': self.count,
+                'total': self.total,
+                'min': self.min,
+                'max': self.max,
+                'buckets': {str(i): c for i, c in enumerate(self.counts) if c}
+            }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.count = data.get('count', 0)
+        histogram.total = data.get('total', 0)
+        histogram.min = data.get('min')
+        histogram.max = data.get('max')
+        for index, count in data.get('buckets', {}).items():
+            histogram.counts[int(index)] = count
+        return histogram
+
+
+class LatencyRecorder:
+    """
+    Per-function histograms, snapshotted to disk.
+
+    A daemon thread writes every histogram to `snapshot_file` every
+    `snapshot_interval` seconds (and once at exit), and a new recorder
+    starts from the last snapshot, so statistics survive restarts.
+    """
+
+    def __init__(self, snapshot_file=None, snapshot_interval=60.0):
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = snapshot_interval
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._worker = None
+
+        if snapshot_file:
+            self._restore()
+
+    def record(self, name, seconds):
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, LatencyHistogram())
+        histogram.record(seconds)
+        if not self._dirty:
+            self._dirty = True
+            if self._worker is None and self.snapshot_file:
+                self._start()
+
+    def histogram(self, name):
+        return self._histograms.get(name)
+
+    def summary(self):
+        """{function: stats} for every recorded function"""
+        with self._lock:
+            histograms = list(self._histograms.items())
+        return {name: histogram.summary() for name, histogram in histograms}
+
+    def snapshot(self):
+        """Write all histograms to the snapshot file now"""
+        if not self.snapshot_file:
+            return
+        self._dirty = False
+        with self._lock:
+            histograms = list(self._histograms.items())
+        atomic_write_json(self.snapshot_file,
+                          {name: h.to_dict() for name, h in histograms}, indent=None)
+
+    def backfill(self, log_file):
+        """
+        Seed histograms from a JSON-lines performance log.
+
+        Accepts both 'duration_seconds' (written by timer) and the
+        older 'duration_ms'.
+        """
+        try:
+            with open(log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if 'duration_seconds' in entry:
+                        seconds = entry['duration_seconds']
+                    elif 'duration_ms' in entry:
+                        seconds = entry['duration_ms'] / 1000
+                    else:
+                        continue
+                    self.record(entry.get('function', 'unknown'), seconds)
+        except FileNotFoundError:
+            pass
+
+    def _restore(self):
+        try:
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._histograms = {
+            name: LatencyHistogram.from_dict(state) for name, state in data.items()
+        }
+
+    def _start(self):
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(
+                target=self._snapshot_loop, name='latency-snapshot', daemon=True
+            )
+            self._worker.start()
+        atexit.register(self._snapshot_if_dirty)
+
+    def _snapshot_loop(self):
+        stopped = threading.Event()
+        while not stopped.wait(self.snapshot_interval):
+            self._snapshot_if_dirty()
+
+    def _snapshot_if_dirty(self):
+        if self._dirty:
+            try:
+                self.snapshot()
+            except Exception as e:
+                print(f"Latency snapshot error: {e}")
+
+
+if __name__ == "__main__":
+    # Compare histogram percentiles with exact ones
+    import random
+    import tempfile
+
+    values = [random.lognormvariate(-6, 1.2) for _ in range(100000)]
+    path = os.path.join(tempfile.mkdtemp(), 'latency.json')
+    recorder = LatencyRecorder(path)
+    for value in values:
+        recorder.record('sample', value)
+
+    print("Testing Latency Histogram...")
+    print("="*60)
+    ordered = sorted(values)
+    stats = recorder.summary()['sample']
+    for name, percent in PERCENTILES:
+        exact = ordered[int(len(ordered) * percent / 100) - 1] * 1000
+        print(f"✓ {name}: histogram {stats[name + '_ms']:.3f} ms, exact {exact:.3f} ms")
+
+    recorder.snapshot()
+    restored = LatencyRecorder(path)
+    print(f"✓ Restored from snapshot: {restored.summary()['sample'] == stats}")
@@ -0,0 +1,205 @@
+"""
+Log Reader Module
+Newest-first reads of JSON-lines logs without scanning whole files
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+from log_writer import rotated_segments
+
+
+# Records are appended when a call finishes but stamped when it starts,
+# so neighbouring records can be out of order by up to a call's duration.
+# A since= scan keeps going this far past the bound before it stops.
+OUT_OF_ORDER_SECONDS = 60
+
+
+class LogReader:
+    """
+    Reads a JSON-lines log backwards from the end.
+
+    Blocks are read from the end of the file towards the start, so
+    returning the last N records costs O(N) rather than O(file size).
+    Rotated segments (<path>.<serial>, see LogWriter) are read after
+    the active file, newest first.
+
+    CURSORS: a page's cursor is '<serial>:<offset>' - the segment and
+    byte offset of the oldest record returned. The active file is
+    addressed by the serial it will get when rotated, so a cursor stays
+    valid across a rotation (the rename keeps every offset).
+    """
+
+    def __init__(self, path, block_size=64 * 1024):
+        self.path = path
+        self.block_size = block_size
+
+    def segments(self):
+        """[(serial, path)] newest first, active file included"""
+        segments = rotated_segments(self.path)
+        next_serial = segments[-1][0] + 1 if segments else 1
+        if os.path.exists(self.path):
+            segments.append((next_serial, self.path))
+        return segments[::-1]
+
+    def page(self, limit=50, action=None, since=None, until=None, before=None):
+        """
+        Return (entries, next_cursor).
+
+        Args:
+            limit: maximum number of entries
+            action: only entries with this 'action'
+            since, until: ISO timestamps; keep since <= timestamp < until
+            before: cursor from a previous page
+
+        Entries come back oldest first (like the file); next_cursor is
+        None when there is nothing older.
+        """
+        since = _normalize_time(since)
+        until = _normalize_time(until)
+        stop_before = _shift_time(since, -OUT_OF_ORDER_SECONDS)
+        action_token = json.dumps(action).encode('utf-8') if action is not None else None
+
+        entries = []
+        cursor = None
+        for serial, offset, line in self._reverse_records(before):
+            # Cheap byte check before paying for json.loads
+            if action_token is not None and action_token not in line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if action is not None and entry.get('action') != action:
+                continue
+
+            timestamp = _normalize_time(entry.get('timestamp'))
+            if until is not None and timestamp is not None and timestamp >= until:
+                continue
+            if since is not None and timestamp is not None and timestamp < since:
+                if timestamp < stop_before:
+                    break  # everything further back is older still
+                continue
+
+            entries.append(entry)
+            if len(entries) == limit:
+                cursor = f'{serial}:{offset}'
+                break
+
+        entries.reverse()
+        return entries, cursor
+
+    def tail(self, limit=50, **filters):
+        """The last `limit` entries, oldest first"""
+        return self.page(limit, **filters)[0]
+
+    def _reverse_records(self, before=None):
+        """Yield (serial, offset, line) newest first, starting before a cursor"""
+        start_serial, start_offset = _decode_cursor(before) if before else (None, None)
+
+        for serial, path in self.segments():
+            if start_serial is not None:
+                if serial > start_serial:
+                    continue
+                end = start_offset if serial == start_serial else None
+            else:
+                end = None
+            try:
+                for offset, line in _reverse_lines(path, end, self.block_size):
+                    yield serial, offset, line
+            except FileNotFoundError:
+                continue  # rotated away or pruned while we were reading
+
+
+def _reverse_lines(path, end, block_size):
+    """
+    Yield (offset, line) for complete lines in path[:end], last first.
+
+    Text after the last newline is skipped: it is either nothing or a
+    record the writer has not finished yet.
+    """
+    with open(path, 'rb') as f:
+        if end is None:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+
+        position = end
+        pending = b''           # bytes before the first newline seen so far
+        seen_newline = False
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            data = f.read(size) + pending
+            pieces = data.split(b'\n')
+            pending = pieces[0]
+
+            line_end = position + len(data)
+            if not seen_newline and len(pieces) > 1:
+                seen_newline = True
+                line_end -= len(pieces[-1]) + 1
+                pieces.pop()
+            elif not seen_newline:
+                continue
+
+            for line in reversed(pieces[1:]):
+                start = line_end - len(line)
+                if line.strip():
+                    yield start, line
+                line_end = start - 1
+
+        if seen_newline and pending.strip():
+            yield 0, pending
+
+
+def _decode_cursor(cursor):
+    try:
+        serial, offset = cursor.split(':')
+        return int(serial), int(offset)
+    except (AttributeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def _shift_time(value, seconds):
+    """Move a normalized timestamp by some seconds (None stays None)"""
+    if value is None:
+        return None
+    try:
+        moved = datetime.fromisoformat(value) + timedelta(seconds=seconds)
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {value}")
+    return moved.isoformat()
+
+
+def _normalize_time(value):
+    """Compare ISO ('T') and space separated timestamps as equals"""
+    if value is None:
+        return None
+    return str(value).replace(' ', 'T')
+
+
+if __name__ == "__main__":
+    # Page backwards through a rotated log
+    import tempfile
+    from log_writer import LogWriter
+
+    path = os.path.join(tempfile.mkdtemp(), 'activity.log')
+    writer = LogWriter(path, policy='block', batch_size=50, max_bytes=4096, backup_count=3)
+    for i in range(300):
+        writer.write({'timestamp': f'2025-01-01T00:{i // 60:02d}:{i % 60:02d}',
+                      'action': 'EVEN' if i % 2 == 0 else 'ODD', 'n': i})
+    writer.close()
+
+    reader = LogReader(path)
+    print("Testing Log Reader...")
+    print("="*60)
+    print(f"✓ Segments: {[os.path.basename(p) for _, p in reader.segments()]}")
+    print(f"✓ Last 3: {[e['n'] for e in reader.tail(3)]}")
+
+    entries, cursor = reader.page(5, action='ODD')
+    older, _ = reader.page(5, action='ODD', before=cursor)
+    print(f"✓ ODD page: {[e['n'] for e in entries]}, older: {[e['n'] for e in older]}")
+
+    window = reader.tail(100, since='2025-01-01 00:04:00', until='2025-01-01T00:04:05')
+    print(f"✓ Time window: {[e['n'] for e in window]}")
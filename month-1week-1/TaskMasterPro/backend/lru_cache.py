@@ -0,0 +1,242 @@
+"""
+LRU Cache Module
+Size-bounded, thread-safe LRU cache with per-entry TTL and single-flight loads
+"""
+
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+_KWARGS_MARK = object()
+
+
+class _Flight:
+    """One in-progress load that other callers can wait for"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Least-recently-used cache whose entries also expire.
+
+    - At most `maxsize` entries; the least recently used one is evicted
+      when a new key would exceed that (expired entries go first).
+    - Each entry expires `ttl` seconds after it was stored (per-entry
+      override in set()). Expired entries are dropped when read and
+      by a sweep that runs at most every `ttl` seconds on writes, so
+      they don't linger until the same key is asked for again.
+    - get_or_load() is single-flight: concurrent misses for one key
+      run the loader once and share its result (or exception).
+    - hits / misses / evictions / expirations / coalesced counters for
+      monitoring.
+    """
+
+    def __init__(self, maxsize=256, ttl=1800.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()      # key -> (expires_at, value), LRU first
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._next_sweep = clock() + ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0              # misses that waited for another caller's load
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key, self._clock())
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None):
+        now = self._clock()
+        with self._lock:
+            self._store(key, value, now + (self.ttl if ttl is None else ttl), now)
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_or_load(self, key, loader, cache_none=False, ttl=None):
+        """
+        Return the cached value, or call loader() once to fill it.
+
+        Concurrent callers that miss on the same key wait for the first
+        caller's load instead of starting their own. `ttl` may be a
+        number or a function of the loaded value (e.g. shorter for
+        failures).
+        """
+        with self._lock:
+            value = self._lookup(key, self._clock())
+            if value is not _MISSING:
+                return value
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            if flight.value is not None or cache_none:
+                self.set(key, flight.value, ttl(flight.value) if callable(ttl) else ttl)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            size = len(self._data)
+        lookups = self.hits + self.misses
+        return {
+            'size': size,
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'coalesced': self.coalesced
+        }
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    # Callers hold self._lock for everything below
+
+    def _lookup(self, key, now):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return _MISSING
+        if entry[0] <= now:
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return _MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def _store(self, key, value, expires_at, now):
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = (expires_at, value)
+
+        if now >= self._next_sweep:
+            self._sweep(now)
+        if len(self._data) > self.maxsize:
+            self._sweep(now)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def _sweep(self, now):
+        expired = [key for key, (expires_at, _) in self._data.items() if expires_at <= now]
+        for key in expired:
+            del self._data[key]
+        self.expirations += len(expired)
+        self._next_sweep = now + self.ttl
+
+
+def make_key(args, kwargs):
+    """Hashable cache key from call arguments (keyword order ignored)"""
+    key = args
+    if kwargs:
+        key += (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    try:
+        hash(key)
+    except TypeError:
+        key = repr(key)  # unhashable arguments (lists, dicts): fall back to their repr
+    return key
+
+
+def cached(maxsize=256, ttl=1800.0, cache_none=False):
+    """
+    Decorator: cache a function's results in a TTLCache.
+
+    Arguments are bound to the signature first, so f(1) and f(x=1) share
+    an entry. For methods (first parameter named self or cls) the
+    instance is left out of the key, so every instance shares one cache.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        parameters = list(signature.parameters)
+        skip = 1 if parameters and parameters[0] in ('self', 'cls') else 0
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                return func(*args, **kwargs)  # let the real call raise
+            bound.apply_defaults()
+            key = make_key(tuple(bound.arguments.values())[skip:], None)
+            return cache.get_or_load(key, lambda: func(*args, **kwargs), cache_none)
+
+        wrapper.cache = cache
+        wrapper.clear_cache = cache.clear
+        wrapper.get_cache_info = cache.stats
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    # Test eviction, expiry and single-flight
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("Testing LRU Cache...")
+    print("="*60)
+
+    cache = TTLCache(maxsize=2, ttl=0.2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)                     # evicts b, the least recently used
+    print(f"✓ LRU eviction: a={cache.get('a')} b={cache.get('b')} c={cache.get('c')}")
+    time.sleep(0.25)
+    print(f"✓ Expired: a={cache.get('a')}, stats={cache.stats()}")
+
+    calls = []
+
+    class Service:
+        @cached(ttl=60)
+        def fetch(self, city):
+            calls.append(city)
+            time.sleep(0.1)
+            return city.upper()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda s: s.fetch('paris'), [Service() for _ in range(8)]))
+    print(f"✓ Single flight: {len(calls)} load for {len(results)} concurrent calls")
+    print(f"✓ Stats: {Service.fetch.get_cache_info()}")
@@ -5,6 +5,7 @@ FIXED VERSION: Added screen clearing for better UX
 """
 
 import os
+from atomic_store import VersionConflict
 from task_manager import TaskManager
 
 
@@ -144,8 +145,7 @@ def complete_task(manager):
         
         if 1 <= choice <= len(tasks):
             task = tasks[choice - 1]
-            task.mark_complete()
-            manager.save_tasks()
+            manager.complete_task(task.id)
             print(f"\n✓ Task '{task.title}' marked as complete!")
         else:
             print("\n❌ Invalid task number")
@@ -171,7 +171,7 @@ def delete_task(manager):
         if 1 <= choice <= len(manager.tasks):
             task = manager.tasks[choice - 1]
             title = task.title
-            manager.delete_task(task)
+            manager.delete_task(task.id)
             print(f"\n✓ Task '{title}' deleted!")
         else:
             print("\n❌ Invalid task number")
@@ -274,6 +274,17 @@ def filter_tasks(manager):
             input("\nPress ENTER to continue...")
 
 
+def run_change(action, manager):
+    """Run a menu action that saves; explain a conflict with another program"""
+    try:
+        action(manager)
+    except VersionConflict:
+        # The API (or another CLI) saved first; the manager has reloaded
+        print("\n⚠️ Tasks were changed by another program and have been reloaded.")
+        print("   Nothing was saved - please try again.")
+        input("\nPress ENTER to continue...")
+
+
 def main():
     """Main application loop with improved flow."""
     manager = TaskManager()
@@ -289,11 +300,11 @@ def main():
             view_tasks(manager, manager.get_incomplete_tasks(), "Incomplete Tasks")
             input("\nPress ENTER to continue...")
         elif choice == "3":
-            add_task(manager)
+            run_change(add_task, manager)
         elif choice == "4":
-            complete_task(manager)
+            run_change(complete_task, manager)
         elif choice == "5":
-            delete_task(manager)
+            run_change(delete_task, manager)
         elif choice == "6":
             view_statistics(manager)
         elif choice == "7":
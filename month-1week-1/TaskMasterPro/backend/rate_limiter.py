@@ -0,0 +1,254 @@
+"""
+Rate Limiter Module
+O(1) per-key rate limiting (GCRA) with in-process or shared-memory state
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+
+from atomic_store import FileLock
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a key is over its limit"""
+
+    def __init__(self, key, retry_after):
+        super().__init__(f"Rate limit exceeded; retry in {retry_after:.1f}s")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class RateLimitResult:
+    """Outcome of one RateLimiter.hit()"""
+
+    __slots__ = ('allowed', 'limit', 'remaining', 'retry_after', 'reset_after')
+
+    def __init__(self, allowed, limit, remaining, retry_after, reset_after):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining          # requests still allowed right now
+        self.retry_after = retry_after      # seconds until a rejected request would pass
+        self.reset_after = reset_after      # seconds until the bucket is full again
+
+    def headers(self):
+        """Standard rate limit response headers"""
+        headers = {
+            'X-RateLimit-Limit': str(self.limit),
+            'X-RateLimit-Remaining': str(self.remaining),
+            'X-RateLimit-Reset': str(int(-(-self.reset_after // 1)))
+        }
+        if not self.allowed:
+            headers['Retry-After'] = str(max(1, int(-(-self.retry_after // 1))))
+        return headers
+
+
+class MemoryStore:
+    """
+    Per-process state: key -> theoretical arrival time.
+
+    Keys whose time has passed carry no information (a fresh key
+    behaves the same), so they are swept out every `sweep_every`
+    updates to keep memory bounded by the active clients.
+    """
+
+    def __init__(self, sweep_every=10000):
+        self._tats = {}
+        self._lock = threading.Lock()
+        self._sweep_every = sweep_every
+        self._updates = 0
+
+    def update(self, key, now, step):
+        """Run step(tat) -> (new_tat or None, result) atomically for a key"""
+        with self._lock:
+            new_tat, result = step(self._tats.get(key, 0.0))
+            if new_tat is not None:
+                self._tats[key] = new_tat
+                self._updates += 1
+                if self._updates >= self._sweep_every:
+                    self._sweep(now)
+            return result
+
+    def delete(self, key):
+        with self._lock:
+            self._tats.pop(key, None)
+
+    def __len__(self):
+        return len(self._tats)
+
+    def _sweep(self, now):
+        self._updates = 0
+        expired = [key for key, tat in self._tats.items() if tat <= now]
+        for key in expired:
+            del self._tats[key]
+
+
+class SharedMemoryStore:
+    """
+    State in a memory-mapped file, shared by every process that opens it.
+
+    The file is a fixed open-addressing hash table of `slots` entries
+    (8-byte key hash, 8-byte arrival time). Updates hold the file's
+    FileLock (flock on POSIX, msvcrt.locking on Windows), so gunicorn/
+    waitress workers enforce one limit together. When a key's probe window is full, the entry whose time
+    has passed (or the oldest one) is reused: losing it only forgets a
+    client that was nearly idle.
+    """
+
+    SLOT = struct.Struct('<Qd')
+    PROBES = 8
+
+    def __init__(self, path, slots=65536):
+        self.path = path
+        self.slots = slots
+        size = slots * self.SLOT.size
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = FileLock(path)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o600)
+        with self._lock:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)   # new space reads as zeros: empty slots
+        self._map = mmap.mmap(self._fd, size)
+
+    def update(self, key, now, step):
+        digest = _key_hash(key)
+        with self._lock:
+            offset, tat = self._find(digest, now)
+            new_tat, result = step(tat)
+            if new_tat is not None:
+                self.SLOT.pack_into(self._map, offset, digest, new_tat)
+            return result
+
+    def delete(self, key):
+        digest = _key_hash(key)
+        with self._lock:
+            offset, _ = self._find(digest, time.time())
+            self.SLOT.pack_into(self._map, offset, digest, 0.0)
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+    def _find(self, digest, now):
+        """(offset, tat) of the key's slot, or of the slot to take over"""
+        free = None
+        oldest = None
+        for probe in range(self.PROBES):
+            offset = ((digest + probe) % self.slots) * self.SLOT.size
+            slot_digest, tat = self.SLOT.unpack_from(self._map, offset)
+            if slot_digest == digest:
+                return offset, tat
+            if free is None and (slot_digest == 0 or tat <= now):
+                free = offset
+            if oldest is None or tat < oldest[1]:
+                oldest = (offset, tat)
+        return (free if free is not None else oldest[0]), 0.0
+
+
+def _key_hash(key):
+    digest = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+    return digest or 1  # 0 marks an empty slot
+
+
+class RateLimiter:
+    """
+    Generic Cell Rate Algorithm: `rate` requests per `period` seconds,
+    with bursts of up to `burst` requests.
+
+    Each key stores a single number, its theoretical arrival time (TAT):
+    when the key's bucket would be empty again. A request is allowed if
+    TAT - now leaves room for one more emission interval inside the
+    burst allowance. That is the token bucket without a refill loop or
+    a list of timestamps - every check is O(1) time and memory.
+    """
+
+    def __init__(self, rate, period=60.0, burst=None, store=None, clock=time.time):
+        self.rate = rate
+        self.period = period
+        self.burst = burst or rate
+        self.interval = period / rate                   # seconds per request
+        self.tolerance = self.interval * self.burst     # how far TAT may run ahead
+        self.store = store if store is not None else MemoryStore()
+        self._clock = clock
+
+    def hit(self, key, cost=1):
+        """Try to spend `cost` requests for a key; returns RateLimitResult"""
+        now = self._clock()
+        increment = self.interval * cost
+
+        def step(tat):
+            new_tat = max(tat, now) + increment
+            allow_at = new_tat - self.tolerance
+            if allow_at - now > 1e-9:   # tolerate float drift from summed intervals
+                reset = max(tat, now) - now
+                remaining = int((self.tolerance - reset) / self.interval)
+                return None, RateLimitResult(False, self.burst, max(0, remaining),
+                                             allow_at - now, reset)
+            remaining = int((now - allow_at) / self.interval)
+            return new_tat, RateLimitResult(True, self.burst, remaining, 0.0, new_tat - now)
+
+        return self.store.update(key, now, step)
+
+    def check(self, key, cost=1):
+        """hit(), raising RateLimitExceeded when the request is not allowed"""
+        result = self.hit(key, cost)
+        if not result.allowed:
+            raise RateLimitExceeded(key, result.retry_after)
+        return result
+
+    def reset(self, key):
+        self.store.delete(key)
+
+
+def parse_limit(text):
+    """'120/60' or '120/minute' -> (rate, period seconds)"""
+    units = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+    try:
+        count, per = text.split('/')
+        period = units[per.strip()] if per.strip() in units else float(per)
+        return int(count), float(period)
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit: {text!r} (expected e.g. '120/minute')")
+
+
+def _shared_worker(path):
+    """Self-test worker (module level so Windows' spawn can pickle it)"""
+    shared = RateLimiter(rate=100, period=3600, store=SharedMemoryStore(path, slots=1024))
+    return sum(shared.hit('shared-client').allowed for _ in range(50))
+
+
+if __name__ == "__main__":
+    # Burst, steady-state refill and cross-process sharing
+    import tempfile
+    from multiprocessing import Pool
+
+    print("Testing Rate Limiter...")
+    print("="*60)
+
+    now = [1000.0]
+    limiter = RateLimiter(rate=10, period=1.0, burst=5, clock=lambda: now[0])
+    burst = [limiter.hit('client').allowed for _ in range(7)]
+    print(f"✓ Burst of 5 then reject: {burst}")
+    rejected = limiter.hit('client')
+    print(f"✓ Retry-After: {rejected.retry_after:.2f}s, headers {rejected.headers()}")
+    now[0] += 0.1
+    print(f"✓ After one interval: {limiter.hit('client').allowed}")
+    print(f"✓ Other key unaffected: {limiter.hit('other').allowed}")
+
+    start = time.perf_counter()
+    fast = RateLimiter(rate=1_000_000, period=1.0)
+    for i in range(100000):
+        fast.hit(f'ip-{i % 1000}')
+    print(f"✓ {(time.perf_counter() - start) * 10:.2f}µs per hit (memory store)")
+
+    path = os.path.join(tempfile.mkdtemp(), 'ratelimit.shm')
+
+    with Pool(4) as pool:
+        allowed = sum(pool.map(_shared_worker, [path] * 4))
+    print(f"✓ Shared memory: {allowed} of 200 allowed across 4 processes (limit 100)")
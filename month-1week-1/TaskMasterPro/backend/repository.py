@@ -0,0 +1,532 @@
+"""
+Task Repository Module
+Pluggable storage backends behind TaskManager
+"""
+
+import bisect
+import json
+import sqlite3
+import threading
+
+from file_handler import FileHandler
+from task_registry import task_from_dict, tasks_from_dicts
+from task_stats import group_counts
+from task_query import encode_cursor
+from task_serializer import serializer
+from tracing import traced
+
+
+class JsonTaskRepository:
+    """
+    Keeps every task in memory and persists through FileHandler.
+
+    This is the original storage model: the whole list is loaded at
+    startup and filters are plain Python scans. Tasks are held in an
+    insertion-ordered ID -> Task dict, so lookups and deletes by ID are
+    O(1); the ordered list is rebuilt lazily only when someone asks
+    for it after a change.
+
+    Each task also gets an in-memory sequence number. Sorted views
+    keyed on (sort value, sequence) are cached per sort order, so a
+    page request bisects to its cursor and only walks one page.
+
+    Flask serves requests from several threads: every mutation, and
+    every walk over the dict (views, scans, save snapshots), happens
+    under _lock. Views and lists are replaced rather than modified, so
+    a reader can keep using the one it got after releasing the lock.
+    """
+
+    def __init__(self, filename="tasks.json", journaled=False):
+        self.file_handler = FileHandler(filename, journaled=journaled)
+        self._lock = threading.RLock()
+        self._by_id = {}
+        self._list = []
+        self._seqs = {}
+        self._next_seq = 0
+        self._views = {}
+
+    @traced(category='storage')
+    def load(self):
+        """Load tasks from file and reconstruct proper Task objects"""
+        task_dicts = self.file_handler.load_tasks()
+        with self._lock:
+            self._by_id = {}
+            self._seqs = {}
+            self._next_seq = 0
+            for task in tasks_from_dicts(task_dicts):
+                self._by_id[task.id] = task
+                self._assign_seq(task)
+            self._changed()
+
+            # Older files have no IDs: save once so the generated ones stick
+            if any(not data.get('id') for data in task_dicts):
+                self.save()
+
+    def all(self):
+        with self._lock:
+            if self._list is None:
+                self._list = list(self._by_id.values())
+            return self._list
+
+    def get(self, task_id):
+        return self._by_id.get(task_id)
+
+    @traced(category='storage')
+    def add(self, task):
+        with self._lock:
+            self._by_id[task.id] = task
+            self._assign_seq(task)
+            self._changed()
+            return self.file_handler.task_added(self._by_id.values(), task)
+
+    @traced(category='storage')
+    def update(self, task):
+        with self._lock:
+            self._by_id[task.id] = task
+            self._views.clear()
+            return self.file_handler.task_updated(self._by_id.values(), task)
+
+    @traced(category='storage')
+    def delete(self, task_id):
+        with self._lock:
+            task = self._by_id.pop(task_id, None)
+            if task is None:
+                return False
+            del self._seqs[task_id]
+            self._changed()
+            return self.file_handler.task_deleted(self._by_id.values(), task)
+
+    @traced(category='storage')
+    def add_many(self, tasks):
+        with self._lock:
+            for task in tasks:
+                self._by_id[task.id] = task
+                self._assign_seq(task)
+            self._changed()
+            return self.file_handler.tasks_changed(self._by_id.values(), added=tasks)
+
+    @traced(category='storage')
+    def update_many(self, tasks):
+        with self._lock:
+            self._views.clear()
+            return self.file_handler.tasks_changed(self._by_id.values(), updated=tasks)
+
+    @traced(category='storage')
+    def delete_many(self, task_ids):
+        with self._lock:
+            deleted = []
+            for task_id in task_ids:
+                task = self._by_id.pop(task_id, None)
+                if task is not None:
+                    del self._seqs[task_id]
+                    deleted.append(task)
+            self._changed()
+            self.file_handler.tasks_changed(self._by_id.values(), deleted=deleted)
+            return deleted
+
+    def iter_json(self):
+        """Yield every task as a JSON string, in insertion order"""
+        for task in self.all():
+            yield serializer.dump(task)
+
+    @traced(category='storage')
+    def page(self, query):
+        """
+        Return (tasks, next_cursor) for one page of a TaskQuery.
+
+        Work is proportional to the page (plus any rows the filters
+        skip), not to the number of stored tasks.
+        """
+        with self._lock:
+            keys, tasks = self._view(query)
+
+        if query.after is None:
+            i = len(keys) - 1 if query.descending else 0
+        elif query.descending:
+            i = bisect.bisect_left(keys, tuple(query.after)) - 1
+        else:
+            i = bisect.bisect_right(keys, tuple(query.after))
+        step = -1 if query.descending else 1
+
+        page, last_key = [], None
+        while 0 <= i < len(keys):
+            task = tasks[i]
+            if query.matches(task):
+                if len(page) == query.limit:
+                    return page, encode_cursor(query.sort, *last_key)
+                page.append(task)
+                last_key = keys[i]
+            i += step
+        return page, None
+
+    def _view(self, query):
+        """Cached (keys, tasks) lists sorted by (sort value, sequence); call under _lock"""
+        view = self._views.get(query.sort)
+        if view is None:
+            rows = sorted(
+                ((query.sort_value(t), self._seqs[t.id]), t) for t in self._by_id.values()
+            ) if query.sort != 'created' else [
+                ((None, self._seqs[t.id]), t) for t in self._by_id.values()
+            ]
+            view = ([key for key, _ in rows], [t for _, t in rows])
+            self._views[query.sort] = view
+        return view
+
+    def _assign_seq(self, task):
+        if task.id not in self._seqs:
+            self._seqs[task.id] = self._next_seq
+            self._next_seq += 1
+
+    def _changed(self):
+        self._list = None
+        self._views.clear()
+
+    def find(self, priority=None, category=None, completed=None):
+        return [t for t in self.all() if _matches(t, priority, category, completed)]
+
+    def count(self, priority=None, category=None, completed=None):
+        return sum(1 for t in self.all() if _matches(t, priority, category, completed))
+
+    def group_counts(self):
+        return group_counts(self.all())
+
+    @traced(category='storage')
+    def save(self):
+        with self._lock:
+            return self.file_handler.save_tasks(self._by_id.values())
+
+    def close(self):
+        self.file_handler.close()
+
+
+def _matches(task, priority, category, completed):
+    """Check one in-memory task against optional filters"""
+    if priority is not None and task.priority != priority:
+        return False
+    if category is not None and getattr(task, 'category', None) != category:
+        return False
+    if completed is not None and task.completed != completed:
+        return False
+    return True
+
+
+class SqliteTaskRepository:
+    """
+    Stores tasks in a local SQLite file.
+
+    Filterable fields live in indexed columns so queries and counts
+    run inside SQLite; only matching rows are turned into Task
+    objects. The full task dictionary is kept in the `data` column
+    so subclass-specific fields survive a round trip.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            seq          INTEGER PRIMARY KEY AUTOINCREMENT,
+            id           TEXT,
+            type         TEXT NOT NULL,
+            title        TEXT NOT NULL,
+            priority     TEXT,
+            category     TEXT,
+            completed    INTEGER NOT NULL DEFAULT 0,
+            created_at   REAL,
+            completed_at REAL,
+            data         TEXT NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_id ON tasks(id);
+        CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+        CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks(category);
+        CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks(completed);
+        CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at);
+    """
+
+    def __init__(self, filename="tasks.db"):
+        self.filename = filename
+        self._lock = threading.Lock()
+        # Flask serves requests from several threads; access is serialized by _lock
+        self._conn = sqlite3.connect(filename, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._migrate()
+        self._conn.executescript(self.SCHEMA)
+
+    def _migrate(self):
+        """
+        Rebuild tables written by older versions.
+
+        Older files lack the id column and declare the timestamps as
+        TEXT, whose column affinity would turn epoch numbers back into
+        strings. Rows are copied into the current schema in seq order.
+        """
+        columns = {row[1]: row[2] for row in self._conn.execute('PRAGMA table_info(tasks)')}
+        if not columns or ('id' in columns and columns['created_at'] == 'REAL'):
+            return
+        with self._conn:
+            self._conn.execute('ALTER TABLE tasks RENAME TO tasks_legacy')
+            for (name,) in self._conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' "
+                    "AND tbl_name = 'tasks_legacy' AND sql IS NOT NULL").fetchall():
+                self._conn.execute(f'DROP INDEX {name}')
+        self._conn.executescript(self.SCHEMA)
+        with self._conn:
+            rows = self._conn.execute('SELECT seq, data FROM tasks_legacy ORDER BY seq')
+            self._conn.executemany(
+                'INSERT INTO tasks (seq, id, type, title, priority, category, completed, '
+                'created_at, completed_at, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                ((seq,) + self._columns(task_from_dict(json.loads(data)))
+                 for seq, data in rows.fetchall())
+            )
+            self._conn.execute('DROP TABLE tasks_legacy')
+
+    @traced(category='storage')
+    def load(self):
+        """Nothing to preload: rows are read on demand"""
+
+    def all(self):
+        return self.find()
+
+    def get(self, task_id):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM tasks WHERE id = ?', (task_id,)
+            ).fetchone()
+        return task_from_dict(json.loads(row[0])) if row else None
+
+    INSERT_SQL = (
+        'INSERT INTO tasks (id, type, title, priority, category, completed, '
+        'created_at, completed_at, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+    )
+    UPDATE_SQL = (
+        'UPDATE tasks SET type = ?, title = ?, priority = ?, category = ?, '
+        'completed = ?, created_at = ?, completed_at = ?, data = ? '
+        'WHERE id = ?'
+    )
+
+    @traced(category='storage')
+    def add(self, task):
+        with self._lock, self._conn:
+            self._conn.execute(self.INSERT_SQL, self._columns(task))
+        return True
+
+    @traced(category='storage')
+    def update(self, task):
+        columns = self._columns(task)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(self.UPDATE_SQL, columns[1:] + columns[:1])
+        return cursor.rowcount > 0
+
+    @traced(category='storage')
+    def add_many(self, tasks):
+        """Insert a batch of tasks in one transaction"""
+        rows = [self._columns(task) for task in tasks]
+        with self._lock, self._conn:
+            self._conn.executemany(self.INSERT_SQL, rows)
+        return True
+
+    @traced(category='storage')
+    def update_many(self, tasks):
+        rows = [columns[1:] + columns[:1] for columns in map(self._columns, tasks)]
+        with self._lock, self._conn:
+            self._conn.executemany(self.UPDATE_SQL, rows)
+        return True
+
+    @traced(category='storage')
+    def delete_many(self, task_ids):
+        """Delete a batch of tasks in one transaction; returns the deleted tasks"""
+        deleted = []
+        with self._lock, self._conn:
+            for task_id in task_ids:
+                row = self._conn.execute(
+                    'SELECT data FROM tasks WHERE id = ?', (task_id,)
+                ).fetchone()
+                if row:
+                    self._conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+                    deleted.append(task_from_dict(json.loads(row[0])))
+        return deleted
+
+    def iter_json(self, chunk_size=1000):
+        """
+        Yield every task as a JSON string, in insertion order.
+
+        Rows are fetched in keyset chunks so the lock is never held
+        while the caller streams, and stored JSON is passed through
+        without decoding.
+        """
+        last_seq = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT seq, data FROM tasks WHERE seq > ? ORDER BY seq LIMIT ?',
+                    (last_seq, chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            for seq, data in rows:
+                yield data
+            last_seq = rows[-1][0]
+
+    @traced(category='storage')
+    def delete(self, task_id):
+        with self._lock, self._conn:
+            cursor = self._conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+        return cursor.rowcount > 0
+
+    def find(self, priority=None, category=None, completed=None):
+        where, params = self._where(priority, category, completed)
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT data FROM tasks{where} ORDER BY seq', params
+            ).fetchall()
+        return tasks_from_dicts([json.loads(data) for (data,) in rows])
+
+    def count(self, priority=None, category=None, completed=None):
+        where, params = self._where(priority, category, completed)
+        with self._lock:
+            return self._conn.execute(
+                f'SELECT COUNT(*) FROM tasks{where}', params
+            ).fetchone()[0]
+
+    # SQL expressions matching TaskQuery.sort_value
+    SORT_EXPRESSIONS = {
+        'created': 'seq',
+        'created_at': 'created_at',
+        'title': 'title',
+        'priority': "CASE lower(priority) WHEN 'high' THEN 0 "
+                    "WHEN 'medium' THEN 1 WHEN 'low' THEN 2 ELSE 3 END",
+    }
+
+    @traced(category='storage')
+    def page(self, query):
+        """
+        Return (tasks, next_cursor) for one page of a TaskQuery.
+
+        Uses keyset pagination: the cursor becomes a WHERE condition on
+        (sort value, seq), so SQLite never skips over earlier rows.
+        """
+        where, params = self._where(query.priority, query.category, query.completed)
+        clauses = [where[len(' WHERE '):]] if where else []
+
+        if query.created_after is not None:
+            clauses.append('created_at >= ?')
+            params.append(query.created_after)
+        if query.created_before is not None:
+            clauses.append('created_at < ?')
+            params.append(query.created_before)
+
+        expr = self.SORT_EXPRESSIONS[query.sort]
+        op = '<' if query.descending else '>'
+        if query.after is not None:
+            value, seq = query.after
+            if query.sort == 'created':
+                clauses.append(f'seq {op} ?')
+                params.append(seq)
+            else:
+                clauses.append(f'({expr} {op} ? OR ({expr} = ? AND seq {op} ?))')
+                params.extend([value, value, seq])
+
+        direction = 'DESC' if query.descending else 'ASC'
+        sql = (
+            f'SELECT seq, data FROM tasks'
+            + (' WHERE ' + ' AND '.join(clauses) if clauses else '')
+            + f' ORDER BY {expr} {direction}, seq {direction} LIMIT ?'
+        )
+        params.append(query.limit + 1)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        tasks = tasks_from_dicts([json.loads(data) for _, data in rows[:query.limit]])
+        next_cursor = None
+        if len(rows) > query.limit:
+            last = tasks[-1]
+            next_cursor = encode_cursor(query.sort, query.sort_value(last), rows[query.limit - 1][0])
+        return tasks, next_cursor
+
+    def group_counts(self):
+        """(priority, category, completed, count) rows, computed by SQLite"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT priority, category, completed, COUNT(*) FROM tasks '
+                'GROUP BY priority, category, completed'
+            ).fetchall()
+        return [(p, c, bool(done), n) for p, c, done, n in rows]
+
+    @traced(category='storage')
+    def save(self):
+        """Every change is committed as it happens"""
+        return True
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _columns(task):
+        return (
+            task.id,
+            task.__class__.__name__,
+            task.title,
+            task.priority,
+            getattr(task, 'category', None),
+            int(task.completed),
+            task.created_ts,
+            task.completed_ts,
+            serializer.dump(task)
+        )
+
+    @staticmethod
+    def _where(priority, category, completed):
+        """Build a WHERE clause from optional filters"""
+        clauses, params = [], []
+        if priority is not None:
+            clauses.append('priority = ?')
+            params.append(priority)
+        if category is not None:
+            clauses.append('category = ?')
+            params.append(category)
+        if completed is not None:
+            clauses.append('completed = ?')
+            params.append(int(completed))
+        where = (' WHERE ' + ' AND '.join(clauses)) if clauses else ''
+        return where, params
+
+
+REPOSITORIES = {
+    'json': JsonTaskRepository,
+    'sqlite': SqliteTaskRepository,
+}
+
+
+def create_repository(backend='json', filename=None, **options):
+    """
+    Build a storage backend by name.
+
+    Args:
+        backend: 'json' (FileHandler) or 'sqlite'
+        filename: data file; defaults to tasks.json / tasks.db
+    """
+    if backend not in REPOSITORIES:
+        raise ValueError(f"Unknown task backend: {backend}")
+
+    if filename is None:
+        filename = 'tasks.db' if backend == 'sqlite' else 'tasks.json'
+    return REPOSITORIES[backend](filename, **options)
+
+
+if __name__ == "__main__":
+    # Test the SQLite backend
+    import os
+    import tempfile
+    from task_types import WorkTask, PersonalTask
+
+    path = os.path.join(tempfile.mkdtemp(), 'test_tasks.db')
+    repo = create_repository('sqlite', path)
+
+    print("Testing SQLite Repository...")
+    print("="*60)
+
+    repo.add(WorkTask("Write report", priority="high", project="Q4"))
+    repo.add(PersonalTask("Gym", priority="low", location="Gym"))
+    print(f"✓ High priority: {[str(t) for t in repo.find(priority='high')]}")
+    print(f"✓ Personal count: {repo.count(category='Personal')}")
+    repo.close()
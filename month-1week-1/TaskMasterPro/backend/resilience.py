@@ -0,0 +1,426 @@
+"""
+Resilience Module
+Deadline-bounded retries with jittered backoff, and circuit breakers
+"""
+
+import asyncio
+import functools
+import inspect
+import random
+import threading
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f'Circuit "{name}" is open; retry in {retry_after:.1f}s')
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Fast-fail guard for one dependency.
+
+    CLOSED: calls go through; `failure_threshold` consecutive failures
+    open the circuit.
+    OPEN: calls fail immediately with CircuitOpenError for
+    `reset_timeout` seconds, so a dead upstream costs nothing.
+    HALF_OPEN: up to `half_open_max` probe calls are let through; a
+    success closes the circuit, a failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, half_open_max=1,
+                 clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self.state = self.CLOSED
+        self.failures = 0               # consecutive, while closed
+        self.opened_at = None
+        self._probes = 0
+
+        self.calls = 0
+        self.successes = 0
+        self.total_failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow(self):
+        """True if a call may go ahead now (counts as a probe when half-open)"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if self._clock() - self.opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probes = 0
+            if self.state == self.HALF_OPEN:
+                if self._probes >= self.half_open_max:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            self.calls += 1
+            return True
+
+    def check(self):
+        """allow(), but raise CircuitOpenError when the call must not happen"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def record_success(self):
+        with self._lock:
+            self.successes += 1
+            self.failures = 0
+            if self.state != self.CLOSED:
+                self.state = self.CLOSED
+                self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.total_failures += 1
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = self._clock()
+
+    def cancel(self):
+        """
+        A call allow() let through was abandoned (e.g. its task was
+        cancelled): free its half-open probe slot without recording a
+        success or a failure, since it says nothing about the dependency.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def retry_after(self):
+        """Seconds until an open circuit lets a probe through (0 otherwise)"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self.opened_at))
+
+    def call(self, func, *args, **kwargs):
+        """Run func through the breaker (exceptions count as failures)"""
+        self.check()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self):
+        with self._lock:
+            state = self.state
+            opened_at = self.opened_at
+            stats = {
+                'state': state,
+                'consecutive_failures': self.failures,
+                'calls': self.calls,
+                'successes': self.successes,
+                'failures': self.total_failures,
+                'rejected': self.rejected,
+                'times_opened': self.times_opened
+            }
+        if state == self.OPEN:
+            stats['retry_after'] = round(max(0.0, self.reset_timeout - (self._clock() - opened_at)), 2)
+        return stats
+
+
+class RetryStats:
+    """Counters for one retried function"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.successes = 0
+        self.failures = 0
+        self.deadline_exceeded = 0
+        self.short_circuited = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'retries': self.retries,
+                'successes': self.successes,
+                'failures': self.failures,
+                'deadline_exceeded': self.deadline_exceeded,
+                'short_circuited': self.short_circuited
+            }
+
+
+# Everything created through get_breaker() / retry(), for stats()
+breakers = {}
+retry_stats = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name, **options):
+    """Shared CircuitBreaker by name (options apply when it is created)"""
+    with _registry_lock:
+        breaker = breakers.get(name)
+        if breaker is None:
+            breaker = breakers[name] = CircuitBreaker(name, **options)
+        return breaker
+
+
+def stats():
+    """{'breakers': {...}, 'retries': {...}} for monitoring"""
+    with _registry_lock:
+        current_breakers = list(breakers.items())
+        current_retries = list(retry_stats.items())
+    return {
+        'breakers': {name: breaker.stats() for name, breaker in current_breakers},
+        'retries': {name: counters.to_dict() for name, counters in current_retries}
+    }
+
+
+def backoff_delay(attempt, base_delay, max_delay, multiplier=2):
+    """
+    Full-jitter backoff: uniform in [0, min(max_delay, base * multiplier**attempt)].
+
+    Randomising the whole interval spreads retries from many clients
+    out instead of having them hit the upstream in synchronized waves.
+    """
+    return random.uniform(0, min(max_delay, base_delay * (multiplier ** attempt)))
+
+
+class _Attempts:
+    """
+    Retry bookkeeping shared by the sync and async wrappers.
+
+    next_delay() returns how long to wait before the next attempt, or
+    None when the attempts or the deadline budget are used up.
+    """
+
+    def __init__(self, max_attempts, base_delay, max_delay, multiplier, deadline, counters):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.deadline = None if deadline is None else time.monotonic() + deadline
+        self.counters = counters
+        self.attempt = 0
+
+    def next_delay(self):
+        self.attempt += 1
+        if self.attempt >= self.max_attempts:
+            return None
+        delay = backoff_delay(self.attempt - 1, self.base_delay, self.max_delay, self.multiplier)
+        if self.deadline is not None and time.monotonic() + delay >= self.deadline:
+            self.counters.add(deadline_exceeded=1)
+            return None  # waiting would blow the budget: give up now
+        self.counters.add(retries=1)
+        return delay
+
+
+def retry(max_attempts=3, base_delay=0.1, max_delay=2.0, multiplier=2, deadline=5.0,
+          retry_on=(Exception,), retry_if=None, breaker=None, name=None):
+    """
+    Decorator: retry a function with full-jitter backoff.
+
+    Args:
+        max_attempts: total attempts, the first one included
+        base_delay, max_delay, multiplier: backoff range (see backoff_delay)
+        deadline: seconds the whole call (attempts and waits) may take;
+            a retry that could not start in time is not attempted
+        retry_on: exception types worth retrying; others raise at once
+        retry_if: optional predicate on a result that should be retried
+            (e.g. lambda r: r is None); the last such result is returned
+        breaker: CircuitBreaker (or name for get_breaker) guarding the
+            calls; while it is open, calls raise CircuitOpenError
+            without touching the function
+        name: key in stats() (defaults to the function name)
+
+    Coroutine functions get an async wrapper that awaits asyncio.sleep,
+    so waiting for a retry never blocks the event loop.
+    """
+    if isinstance(breaker, str):
+        breaker = get_breaker(breaker)
+
+    def decorator(func):
+        key = name or func.__name__
+        with _registry_lock:
+            counters = retry_stats.setdefault(key, RetryStats())
+
+        def start():
+            counters.add(calls=1)
+            return _Attempts(max_attempts, base_delay, max_delay, multiplier, deadline, counters)
+
+        def guard():
+            if breaker is not None and not breaker.allow():
+                counters.add(short_circuited=1)
+                raise CircuitOpenError(breaker.name, breaker.retry_after())
+
+        def release():
+            """A non-retryable error still counts against the breaker"""
+            if breaker is not None:
+                breaker.record_failure()
+
+        def abandon():
+            """A cancelled attempt frees its breaker slot but is not a failure"""
+            if breaker is not None:
+                breaker.cancel()
+
+        def settle(error, result):
+            """Record one attempt; True if it is final"""
+            failed = error is not None or (retry_if is not None and retry_if(result))
+            if breaker is not None:
+                if failed:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if not failed:
+                counters.add(successes=1)
+            return not failed
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                attempts = start()
+                while True:
+                    guard()
+                    error = result = None
+                    try:
+                        result = await func(*args, **kwargs)
+                    except asyncio.CancelledError:
+                        abandon()
+                        raise
+                    except retry_on as e:
+                        error = e
+                    except BaseException:
+                        release()
+                        raise
+                    if settle(error, result):
+                        return result
+                    delay = attempts.next_delay()
+                    if delay is None:
+                        counters.add(failures=1)
+                        if error is not None:
+                            raise error
+                        return result
+                    await asyncio.sleep(delay)
+
+            async_wrapper.retry_stats = counters
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            attempts = start()
+            while True:
+                guard()
+                error = result = None
+                try:
+                    result = func(*args, **kwargs)
+                except retry_on as e:
+                    error = e
+                except BaseException:
+                    release()
+                    raise
+                if settle(error, result):
+                    return result
+                delay = attempts.next_delay()
+                if delay is None:
+                    counters.add(failures=1)
+                    if error is not None:
+                        raise error
+                    return result
+                time.sleep(delay)
+
+        wrapper.retry_stats = counters
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    # Retry, deadline and breaker behaviour with a flaky function
+    print("Testing Resilience...")
+    print("="*60)
+
+    calls = []
+
+    @retry(max_attempts=5, base_delay=0.01, max_delay=0.05, deadline=1.0)
+    def flaky():
+        calls.append(time.monotonic())
+        if len(calls) < 3:
+            raise ConnectionError("upstream reset")
+        return "ok"
+
+    print(f"✓ Flaky: {flaky()} after {len(calls)} attempts")
+
+    @retry(max_attempts=10, base_delay=0.2, max_delay=1.0, deadline=0.3)
+    def always_down():
+        raise TimeoutError("upstream timeout")
+
+    start = time.monotonic()
+    try:
+        always_down()
+    except TimeoutError:
+        print(f"✓ Deadline: gave up after {time.monotonic() - start:.2f}s (budget 0.3s)")
+
+    breaker = get_breaker('demo', failure_threshold=3, reset_timeout=0.2)
+
+    @retry(max_attempts=1, breaker=breaker)
+    def guarded():
+        raise ConnectionError("down")
+
+    for _ in range(5):
+        try:
+            guarded()
+        except (ConnectionError, CircuitOpenError) as e:
+            last = e
+    print(f"✓ Breaker: {type(last).__name__}, state={breaker.stats()['state']}")
+    time.sleep(0.25)
+    print(f"✓ Half-open probe allowed: {breaker.allow()}, second: {breaker.allow()}")
+    breaker.record_success()
+    print(f"✓ Closed again: {breaker.stats()}")
+
+    @retry(max_attempts=3, base_delay=0.01, retry_if=lambda r: r is None)
+    async def async_lookup(results=iter([None, None, 42])):
+        return next(results)
+
+    print(f"✓ Async: {asyncio.run(async_lookup())}")
+
+    probe_breaker = get_breaker('cancel-demo', failure_threshold=1, reset_timeout=0.1)
+    probe_breaker.record_failure()
+    time.sleep(0.15)
+
+    @retry(max_attempts=1, breaker=probe_breaker)
+    async def slow_probe():
+        await asyncio.sleep(1)
+
+    async def cancel_probe():
+        task = asyncio.create_task(slow_probe())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_probe())
+    print(f"✓ Cancelled probe: state={probe_breaker.stats()['state']}, "
+          f"failures={probe_breaker.stats()['failures']}, next probe allowed: {probe_breaker.allow()}")
+    print(f"✓ Stats: {stats()['retries']}")
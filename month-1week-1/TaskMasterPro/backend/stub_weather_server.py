@@ -0,0 +1,86 @@
+"""
+Stub Weather Server
+Local stand-in for wttr.in so WeatherService can be tested offline
+
+Run: python stub_weather_server.py [port]
+Then: WEATHER_BASE_URL=http://127.0.0.1:<port> python backend/api.py
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+
+class StubWeatherHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET /<city>?format=j1 with a wttr.in shaped document.
+
+    Behaviour is controlled through the server object:
+    - server.delay          seconds to sleep before answering
+    - server.failing        set of lower-case cities that get HTTP 500
+    - server.requests       list of cities requested (for assertions)
+    """
+
+    def do_GET(self):
+        city = unquote(urlparse(self.path).path.strip('/'))
+        self.server.requests.append(city)
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        if city.lower() in self.server.failing:
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        temp_c = sum(map(ord, city.lower())) % 35
+        body = json.dumps({
+            'current_condition': [{
+                'temp_C': str(temp_c),
+                'temp_F': str(round(temp_c * 9 / 5 + 32)),
+                'weatherDesc': [{'value': 'Sunny' if temp_c % 2 else 'Light rain'}],
+                'humidity': str(40 + temp_c)
+            }]
+        }).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep test output quiet
+
+
+class StubWeatherServer(ThreadingHTTPServer):
+    request_queue_size = 128    # batch tests open dozens of connections at once
+    daemon_threads = True
+
+
+def start_stub_server(port=0, delay=0.0, failing=()):
+    """
+    Start the stub in a background thread.
+
+    Returns:
+        (server, base_url) - call server.shutdown() when done
+    """
+    server = StubWeatherServer(('127.0.0.1', port), StubWeatherHandler)
+    server.delay = delay
+    server.failing = {city.lower() for city in failing}
+    server.requests = []
+    threading.Thread(target=server.serve_forever, name='stub-weather', daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8099
+    server, url = start_stub_server(port)
+    print(f"Stub weather server on {url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
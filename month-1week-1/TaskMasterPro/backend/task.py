@@ -5,13 +5,60 @@ Day 14 Capstone: Demonstrates OOP Fundamentals
 
 from asyncio import Task
 from datetime import datetime
+import time
+import uuid
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def to_epoch(value):
+    """Convert a saved timestamp (epoch number or date string) to epoch seconds"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return datetime.fromisoformat(value).timestamp()
+
+
+def normalize_priority(value):
+    """Priorities are stored lower-case ('High' -> 'high'); other values pass through"""
+    if isinstance(value, str):
+        return value.strip().lower()
+    return value
+
+
+def format_epoch(value):
+    """Render epoch seconds for display"""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value).strftime(TIME_FORMAT)
+
 
 class Task: 
     """
     Base Task class with core functionality.
     Other task types will inherit from this
+
+    MEMORY:
+    - __slots__ instead of a per-object __dict__ (subclasses add
+      their own slots)
+    - Timestamps are stored as epoch floats; created_at/completed_at
+      render them as text only when read
     """
 
+    __slots__ = ('id', 'title', 'description', 'priority', 'completed',
+                 'created_ts', 'completed_ts', 'category')
+
+    # (json key, attribute, kind) in to_dict order, used by task_serializer
+    SERIAL_FIELDS = (
+        ('id', 'id', 'str'),
+        ('title', 'title', 'str'),
+        ('description', 'description', 'str'),
+        ('priority', 'priority', 'str'),
+        ('completed', 'completed', 'bool'),
+        ('created_at', 'created_ts', 'number'),
+        ('completed_at', 'completed_ts', 'number'),
+        ('category', 'category', 'optional'),
+    )
+
     def __init__(self, title, description="", priority='medium'):
         """
         Initialize a task.
@@ -22,22 +69,41 @@ class Task:
         - Default parameters
         """
 
+        self.id = uuid.uuid4().hex  # stable identity, survives reordering
         self.title = title
         self.description = description
-        self.priority = priority # low, medium, high
+        self.priority = normalize_priority(priority) # low, medium, high
         self.completed = False
-        self.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.completed_at = None
+        self.created_ts = time.time()
+        self.completed_ts = None
+
+    @property
+    def created_at(self):
+        """Creation time as text (rendered on demand)"""
+        return format_epoch(self.created_ts)
+
+    @created_at.setter
+    def created_at(self, value):
+        self.created_ts = to_epoch(value)
+
+    @property
+    def completed_at(self):
+        """Completion time as text (rendered on demand)"""
+        return format_epoch(self.completed_ts)
+
+    @completed_at.setter
+    def completed_at(self, value):
+        self.completed_ts = to_epoch(value)
 
     def mark_complete(self):
         """ Mark task as complete"""
         self.completed = True
-        self.completed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.completed_ts = time.time()
 
     def mark_incomplete(self):
         """ Mark task as incomplete"""
         self.completed = False
-        self.completed_at = None
+        self.completed_ts = None
 
     def to_dict(self):
         """
@@ -50,12 +116,14 @@ class Task:
 
         return {
             'type': self.__class__.__name__,  # Gets class name (Task, Worktask, etc)
+            'id': self.id,
             'title': self.title,
             'description': self.description,
             'priority': self.priority,
             'completed': self.completed,
-            'created_at': self.created_at,
-            'completed_at': self.completed_at
+            'created_at': self.created_ts,      # epoch seconds
+            'completed_at': self.completed_ts,
+            'category': getattr(self, 'category', None)
         }
     
     def __str__(self):
@@ -3,13 +3,30 @@ Task Manager Module
 Day 14 Capstone: Demonstrates OOP management and polymorphism
 """
 
+import functools
+import threading
+
+from atomic_store import VersionConflict
 from decorators import AppDecorators
 from task import Task
 from task_types import WorkTask, PersonalTask, ShoppingTask
-from file_handler import FileHandler
+from repository import create_repository
+from task_stats import TaskStatistics
 from weather_service import WeatherService
 
 
+def _reload_on_conflict(method):
+    """On VersionConflict, reload from storage and re-raise"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except VersionConflict:
+            self.load_tasks()
+            raise
+    return wrapper
+
+
 class TaskManager:
     """
     Manages all tasks with CRUD operations.
@@ -18,143 +35,192 @@ class TaskManager:
     - Managing collections of objects
     - Polymorphism (working with different task types)
     - Integration of multiple modules
+
+    Storage is pluggable: backend='json' keeps the task list in memory
+    (FileHandler), backend='sqlite' pushes filters and counts to SQL.
+
+    Changes that read a task before updating it and the counters
+    (complete, delete) run under _lock, so two requests racing on the
+    same task can't both count the transition.
+
+    If another process wrote the task file since it was loaded, a
+    change raises VersionConflict (see FileHandler); the manager then
+    reloads tasks and counters from storage before re-raising, so a
+    retry works on the current data.
+
+    Pass weather_service to share one WeatherService (HTTP session,
+    refresh workers, cache) with the rest of the process.
     """
     
-    def __init__(self):
-        self.tasks = []
-        self.file_handler = FileHandler()
-        self.weather_service = WeatherService()
+    def __init__(self, filename=None, journaled=False, backend="json", weather_service=None):
+        options = {'journaled': journaled} if backend == 'json' else {}
+        self.repository = create_repository(backend, filename, **options)
+        self.stats = TaskStatistics()
+        self.weather_service = weather_service if weather_service is not None else WeatherService()
+        self._lock = threading.Lock()
         self.load_tasks()
+
+    @property
+    def tasks(self):
+        """All tasks, in insertion order"""
+        return self.repository.all()
     
     @AppDecorators.timer
     @AppDecorators.audit_log('CREATE_TASK')
+    @_reload_on_conflict
     def add_task(self, task):
         """Add a task to the manager"""
-        self.tasks.append(task)
-        self.save_tasks()
+        self.repository.add(task)
+        self.stats.on_add(task)
         return True
     
     def get_all_tasks(self):
         """Get all tasks"""
         return self.tasks
+
+    def get_tasks_page(self, query):
+        """
+        Get one page of tasks for a TaskQuery.
+
+        Returns:
+            (tasks, next_cursor) - next_cursor is None on the last page
+        """
+        return self.repository.page(query)
+
+    def get_task(self, task_id):
+        """Look up a single task by its ID"""
+        return self.repository.get(task_id)
     
     def get_incomplete_tasks(self):
         """Get only incomplete tasks"""
-        return [t for t in self.tasks if not t.completed]
+        return self.repository.find(completed=False)
     
     def get_completed_tasks(self):
         """Get only completed tasks"""
-        return [t for t in self.tasks if t.completed]
+        return self.repository.find(completed=True)
     
     def get_tasks_by_priority(self, priority):
         """Get tasks by priority level"""
-        return [t for t in self.tasks if t.priority == priority]
+        return self.repository.find(priority=priority)
     
     def get_tasks_by_category(self, category):
         """Get tasks by category (Work, Personal, Shopping)"""
-        return [t for t in self.tasks 
-                if hasattr(t, 'category') and t.category == category]
+        return self.repository.find(category=category)
     
     @AppDecorators.timer
     @AppDecorators.audit_log("COMPLETE_TASK")
-    def complete_task(self, index):
+    @_reload_on_conflict
+    def complete_task(self, task_id):
         """Mark a task as complete"""
-        if 0 <= index < len(self.tasks):
-            self.tasks[index].mark_complete()
-            self.save_tasks()
+        with self._lock:
+            task = self.repository.get(task_id)
+            if task is None:
+                return False
+            was_completed = task.completed
+            task.mark_complete()
+            self.repository.update(task)
+            if not was_completed:
+                self.stats.on_complete(task)
             return True
-        return False
     
     @AppDecorators.timer
     @AppDecorators.audit_log("DELETE_TASK")
-    def delete_task(self, index):
+    @_reload_on_conflict
+    def delete_task(self, task_id):
         """Delete a task"""
-        if 0 <= index < len(self.tasks):
-            self.tasks.pop(index)
-            self.save_tasks()
+        with self._lock:
+            task = self.repository.get(task_id)
+            if task is None:
+                return False
+            self.repository.delete(task_id)
+            self.stats.on_delete(task)
             return True
-        return False
     
+    @AppDecorators.timer
+    @AppDecorators.audit_log('BULK_CREATE_TASKS')
+    @_reload_on_conflict
+    def add_tasks(self, tasks):
+        """Add many tasks with a single storage commit"""
+        tasks = list(tasks)
+        if not tasks:
+            return 0
+        self.repository.add_many(tasks)
+        for task in tasks:
+            self.stats.on_add(task)
+        return len(tasks)
+
+    @AppDecorators.timer
+    @AppDecorators.audit_log('BULK_COMPLETE_TASKS')
+    @_reload_on_conflict
+    def complete_tasks(self, task_ids):
+        """
+        Mark many tasks complete with a single storage commit.
+
+        Returns:
+            List of IDs that were found
+        """
+        with self._lock:
+            found, changed = [], []
+            for task_id in task_ids:
+                task = self.repository.get(task_id)
+                if task is None:
+                    continue
+                found.append(task_id)
+                if not task.completed:
+                    task.mark_complete()
+                    changed.append(task)
+
+            self.repository.update_many(changed)
+            for task in changed:
+                self.stats.on_complete(task)
+            return found
+
+    @AppDecorators.timer
+    @AppDecorators.audit_log('BULK_DELETE_TASKS')
+    @_reload_on_conflict
+    def delete_tasks(self, task_ids):
+        """
+        Delete many tasks with a single storage commit.
+
+        Returns:
+            List of IDs that were deleted
+        """
+        with self._lock:
+            deleted = self.repository.delete_many(task_ids)
+            for task in deleted:
+                self.stats.on_delete(task)
+            return [task.id for task in deleted]
+
+    def export_tasks(self):
+        """Yield every task as a JSON string (for streaming exports)"""
+        return self.repository.iter_json()
+
+    @_reload_on_conflict
     def save_tasks(self):
         """Save all tasks to file"""
-        return self.file_handler.save_tasks(self.tasks)
+        return self.repository.save()
     
     def load_tasks(self):
-        """
-        Load tasks from file and reconstruct proper Task objects.
-        
-        DEMONSTRATES:
-        - Polymorphism in action
-        - Dynamic object creation based on data
-        """
-        task_dicts = self.file_handler.load_tasks()
-        
-        for task_data in task_dicts:
-            task_type = task_data.get('type', 'Task')
-            
-            # Recreate appropriate task type based on saved data
-            if task_type == 'WorkTask':
-                task = WorkTask(
-                    task_data['title'],
-                    task_data['description'],
-                    task_data['priority'],
-                    task_data.get('project', 'General')
-                )
-            elif task_type == 'PersonalTask':
-                task = PersonalTask(
-                    task_data['title'],
-                    task_data['description'],
-                    task_data['priority'],
-                    task_data.get('location', 'Home')
-                )
-            elif task_type == 'ShoppingTask':
-                task = ShoppingTask(
-                    task_data['title'],
-                    task_data['description'],
-                    task_data['priority']
-                )
-                task.items = task_data.get('items', [])
-            else:
-                task = Task(
-                    task_data['title'],
-                    task_data['description'],
-                    task_data['priority']
-                )
-            
-            # Restore completion status
-            if task_data['completed']:
-                task.completed = True
-                task.completed_at = task_data['completed_at']
-            
-            # Restore creation time
-            task.created_at = task_data['created_at']
-            
-            self.tasks.append(task)
+        """Load tasks from storage and rebuild the statistics counters"""
+        self.repository.load()
+        self.stats.rebuild(self.repository.group_counts())
     
     def get_weather_advice(self, city):
         """Get weather-based task advice"""
         return self.weather_service.get_weather_advice(city)
     
     def get_statistics(self):
-        """Get task statistics"""
-        total = len(self.tasks)
-        completed = len(self.get_completed_tasks())
-        incomplete = len(self.get_incomplete_tasks())
-        
-        high = len(self.get_tasks_by_priority('high'))
-        medium = len(self.get_tasks_by_priority('medium'))
-        low = len(self.get_tasks_by_priority('low'))
-        
-        return {
-            'total': total,
-            'completed': completed,
-            'incomplete': incomplete,
-            'completion_rate': (completed / total * 100) if total > 0 else 0,
-            'high_priority': high,
-            'medium_priority': medium,
-            'low_priority': low
-        }
+        """Get task statistics (answered from counters, no task scan)"""
+        return self.stats.snapshot()
+
+    def verify_statistics(self):
+        """
+        Check the counters against a full scan of storage.
 
+        Returns:
+            List of mismatch descriptions (empty when consistent)
+        """
+        return self.stats.verify(self.tasks)
 
 if __name__ == "__main__":
     # Test TaskManager
@@ -0,0 +1,211 @@
+"""
+Task Query Module
+Filtering, sorting, cursor pagination and field projection for task lists
+"""
+
+import base64
+import json
+
+from task import normalize_priority, to_epoch
+
+
+PRIORITY_RANK = {'high': 0, 'medium': 1, 'low': 2}
+
+# Fields a client may request with ?fields=
+FIELDS = (
+    'id', 'type', 'title', 'description', 'priority', 'category',
+    'completed', 'created_at', 'completed_at'
+)
+DEFAULT_FIELDS = ('id', 'title', 'description', 'priority', 'completed')
+
+# Sort keys a client may request with ?sort= (prefix with '-' for descending)
+SORT_KEYS = ('created', 'created_at', 'priority', 'title')
+
+# Type of each sort key's values, as stored in cursors
+SORT_VALUE_TYPES = {
+    'created': type(None),
+    'created_at': (int, float),
+    'priority': int,
+    'title': str,
+}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def priority_rank(priority):
+    """Order priorities high -> medium -> low, unknown values last"""
+    if isinstance(priority, str):
+        return PRIORITY_RANK.get(priority.lower(), 3)
+    return 3
+
+
+class TaskQuery:
+    """
+    One page request: filters, sort order, page size, cursor and fields.
+
+    Cursors are opaque strings holding the sort key, sort value and
+    sequence number of the last task on the previous page, so the next
+    page starts right after it (keyset pagination) instead of skipping
+    over an offset. A cursor is only accepted for the sort it was made
+    for: its value is compared against that sort's keys.
+    """
+
+    def __init__(self, priority=None, category=None, completed=None,
+                 created_after=None, created_before=None, sort='created',
+                 limit=DEFAULT_LIMIT, cursor=None, fields=None):
+        self.priority = priority
+        self.category = category
+        self.completed = completed
+        self.created_after = created_after
+        self.created_before = created_before
+        self.descending = sort.startswith('-')
+        self.sort = sort.lstrip('-')
+        self.limit = limit
+        self.after = None
+        self.fields = fields or DEFAULT_FIELDS
+
+        if self.sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {self.sort}")
+        if cursor:
+            cursor_sort, value, seq = decode_cursor(cursor)
+            if cursor_sort != self.sort or not _is_sort_value(self.sort, value):
+                raise ValueError(f"Cursor does not belong to sort={self.sort}")
+            self.after = (value, seq)
+        if not 1 <= self.limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+        unknown = [f for f in self.fields if f not in FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    @classmethod
+    def from_args(cls, args):
+        """
+        Build a query from request arguments (e.g. Flask request.args).
+
+        Raises:
+            ValueError: on malformed parameters
+        """
+        completed = args.get('completed')
+        if completed is not None:
+            if completed.lower() not in ('true', 'false', '1', '0'):
+                raise ValueError("completed must be true or false")
+            completed = completed.lower() in ('true', '1')
+
+        fields = args.get('fields')
+        if fields:
+            fields = tuple(f.strip() for f in fields.split(',') if f.strip())
+
+        try:
+            limit = int(args.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            raise ValueError("limit must be an integer")
+
+        return cls(
+            priority=normalize_priority(args.get('priority')),
+            category=args.get('category'),
+            completed=completed,
+            created_after=_normalize_time(args.get('created_after')),
+            created_before=_normalize_time(args.get('created_before')),
+            sort=args.get('sort', 'created'),
+            limit=limit,
+            cursor=args.get('cursor'),
+            fields=fields
+        )
+
+    @property
+    def has_filters(self):
+        return any(value is not None for value in (
+            self.priority, self.category, self.completed,
+            self.created_after, self.created_before
+        ))
+
+    def matches(self, task):
+        """Check one in-memory task against the filters"""
+        if self.priority is not None and task.priority != self.priority:
+            return False
+        if self.category is not None and getattr(task, 'category', None) != self.category:
+            return False
+        if self.completed is not None and task.completed != self.completed:
+            return False
+        if self.created_after is not None and task.created_ts < self.created_after:
+            return False
+        if self.created_before is not None and task.created_ts >= self.created_before:
+            return False
+        return True
+
+    def sort_value(self, task):
+        """The value this query sorts by (insertion order uses None)"""
+        if self.sort == 'priority':
+            return priority_rank(task.priority)
+        if self.sort == 'title':
+            return task.title
+        if self.sort == 'created_at':
+            return task.created_ts
+        return None
+
+    def project(self, task):
+        """Build the response dictionary with only the requested fields"""
+        row = {}
+        for field in self.fields:
+            if field == 'type':
+                row[field] = task.__class__.__name__
+            else:
+                row[field] = getattr(task, field, None)
+        return row
+
+
+def encode_cursor(sort, sort_value, seq):
+    raw = json.dumps([sort, sort_value, seq], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Return (sort, sort_value, seq) from an opaque cursor string"""
+    try:
+        sort, sort_value, seq = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return sort, sort_value, int(seq)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _is_sort_value(sort, value):
+    """True if `value` can be compared with the keys of `sort`"""
+    return not isinstance(value, bool) and isinstance(value, SORT_VALUE_TYPES[sort])
+
+
+def _normalize_time(value):
+    """
+    Parse a created-at bound to epoch seconds.
+
+    Accepts epoch numbers, 'YYYY-MM-DD', 'YYYY-MM-DD HH:MM:SS' or ISO
+    'T' separated timestamps.
+    """
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return to_epoch(value)
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}")
+
+
+if __name__ == "__main__":
+    # Test query parsing and projection
+    from task_types import WorkTask
+
+    query = TaskQuery.from_args({'priority': 'high', 'fields': 'id,title', 'limit': '10'})
+    task = WorkTask("Report", priority="high")
+
+    print("Testing Task Query...")
+    print("="*60)
+    print(f"✓ Matches: {query.matches(task)}")
+    print(f"✓ Projection: {query.project(task)}")
+    print(f"✓ Cursor round trip: {decode_cursor(encode_cursor('title', 'Report', 7))}")
+    try:
+        TaskQuery(sort='priority', cursor=encode_cursor('title', 'Report', 7))
+    except ValueError as e:
+        print(f"✓ Cursor from another sort rejected: {e}")
@@ -0,0 +1,112 @@
+"""
+Task Serializer Module
+Precompiled task -> JSON encoders that skip the intermediate dict
+"""
+
+import json
+from json.encoder import encode_basestring_ascii
+
+
+class TaskSerializer:
+    """
+    Turns tasks straight into JSON text.
+
+    For each task class the serializer generates (once) a small Python
+    function from the class's SERIAL_FIELDS, e.g. for Task:
+
+        def dump(t):
+            return ('{"type":"Task","id":' + _str(t.id) + ',"title":' + ...)
+
+    so encoding a task is one function call that concatenates
+    pre-quoted keys with encoded attribute values. No to_dict() dict
+    is built and json.dumps never walks a generic object graph. The
+    output is equivalent to json.dumps(task.to_dict()).
+    """
+
+    def __init__(self):
+        self._encoders = {}
+
+    def dump(self, task):
+        """Encode one task as a JSON object string"""
+        encoder = self._encoders.get(task.__class__)
+        if encoder is None:
+            encoder = self._encoders[task.__class__] = self._compile(task.__class__)
+        return encoder(task)
+
+    def dumps(self, tasks):
+        """Encode a list of tasks as a JSON array string"""
+        encoders = self._encoders
+        compile_encoder = self._compile
+        parts = []
+        for task in tasks:
+            cls = task.__class__
+            encoder = encoders.get(cls)
+            if encoder is None:
+                encoder = encoders[cls] = compile_encoder(cls)
+            parts.append(encoder(task))
+        return '[' + ','.join(parts) + ']'
+
+    @staticmethod
+    def _compile(cls):
+        """Generate the encoder function for one task class"""
+        pieces = [repr('{"type":' + json.dumps(cls.__name__))]
+        for key, attr, kind in cls.SERIAL_FIELDS:
+            prefix = repr(',' + json.dumps(key) + ':')
+            if kind == 'str':
+                value = f'_str(t.{attr})'
+            elif kind == 'bool':
+                value = f"('true' if t.{attr} else 'false')"
+            elif kind == 'number':
+                value = f'_num(t.{attr})'
+            elif kind == 'optional':
+                value = f'_opt(getattr(t, {attr!r}, None))'
+            else:
+                value = f'_any(t.{attr})'
+            pieces.append(prefix)
+            pieces.append(value)
+        pieces.append("'}'")
+
+        source = 'def dump(t):\n    return (' + '\n            + '.join(pieces) + ')\n'
+        namespace = {'_str': _str, '_num': _num, '_opt': _opt, '_any': json.dumps}
+        exec(compile(source, f'<task_serializer:{cls.__name__}>', 'exec'), namespace)
+        return namespace['dump']
+
+
+def _str(value):
+    if value.__class__ is str:
+        return encode_basestring_ascii(value)
+    return json.dumps(value)
+
+
+def _opt(value):
+    if value is None:
+        return 'null'
+    return _str(value)
+
+
+def _num(value):
+    if value is None:
+        return 'null'
+    return repr(value)
+
+
+# Shared instance: encoders are compiled once per class per process
+serializer = TaskSerializer()
+
+
+if __name__ == "__main__":
+    # Check the serializer against to_dict
+    from task import Task
+    from task_types import WorkTask, PersonalTask, ShoppingTask
+
+    shopping = ShoppingTask("Groceries", priority="low")
+    shopping.add_item("milk")
+    tasks = [Task("Plain"), WorkTask("Report", project="Q4"),
+             PersonalTask("Gym", location="Gym"), shopping]
+    tasks[1].mark_complete()
+
+    print("Testing Task Serializer...")
+    print("="*60)
+    for task in tasks:
+        same = json.loads(serializer.dump(task)) == task.to_dict()
+        print(f"✓ {task.__class__.__name__}: matches to_dict = {same}")
@@ -0,0 +1,137 @@
+"""
+Task Statistics Module
+Counters kept up to date on every change instead of rescanning tasks
+"""
+
+import threading
+from collections import Counter
+
+
+class TaskStatistics:
+    """
+    Incrementally maintained task counters.
+
+    TaskManager calls on_add / on_complete / on_delete as tasks change,
+    so every read is O(number of priorities + categories) no matter
+    how many tasks exist. rebuild() recomputes everything from storage
+    at load time, and verify() checks the counters against a full scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = 0
+        self.completed = 0
+        self.by_priority = Counter()
+        self.by_category = Counter()
+
+    def on_add(self, task):
+        with self._lock:
+            self._apply(task.priority, _category(task), task.completed, 1)
+
+    def on_complete(self, task):
+        """Record an incomplete -> complete transition"""
+        with self._lock:
+            self.completed += 1
+
+    def on_delete(self, task):
+        with self._lock:
+            self._apply(task.priority, _category(task), task.completed, -1)
+
+    def rebuild(self, groups):
+        """
+        Reset counters from grouped storage counts.
+
+        Args:
+            groups: iterable of (priority, category, completed, count)
+        """
+        with self._lock:
+            self.total = 0
+            self.completed = 0
+            self.by_priority = Counter()
+            self.by_category = Counter()
+            for priority, category, completed, count in groups:
+                self._apply(priority, category, completed, count)
+
+    def _apply(self, priority, category, completed, count):
+        self.total += count
+        if completed:
+            self.completed += count
+        self.by_priority[priority] += count
+        self.by_category[category] += count
+        # Drop empty buckets so breakdowns only list what exists
+        if not self.by_priority[priority]:
+            del self.by_priority[priority]
+        if not self.by_category[category]:
+            del self.by_category[category]
+
+    def snapshot(self):
+        """Current counters as a statistics dictionary"""
+        with self._lock:
+            total = self.total
+            completed = self.completed
+            by_priority = dict(self.by_priority)
+            by_category = {k: v for k, v in self.by_category.items() if k is not None}
+
+        return {
+            'total': total,
+            'completed': completed,
+            'incomplete': total - completed,
+            'completion_rate': (completed / total * 100) if total > 0 else 0,
+            'high_priority': by_priority.get('high', 0),
+            'medium_priority': by_priority.get('medium', 0),
+            'low_priority': by_priority.get('low', 0),
+            'by_priority': by_priority,
+            'by_category': by_category
+        }
+
+    def verify(self, tasks):
+        """
+        Compare the counters against a full scan of `tasks`.
+
+        Returns:
+            List of mismatch descriptions (empty when consistent)
+        """
+        expected = TaskStatistics()
+        expected.rebuild(group_counts(tasks))
+
+        with self._lock:
+            checks = [
+                ('total', self.total, expected.total),
+                ('completed', self.completed, expected.completed),
+                ('by_priority', dict(self.by_priority), dict(expected.by_priority)),
+                ('by_category', dict(self.by_category), dict(expected.by_category)),
+            ]
+        return [
+            f"{name}: counters say {actual}, scan says {wanted}"
+            for name, actual, wanted in checks if actual != wanted
+        ]
+
+
+def _category(task):
+    return getattr(task, 'category', None)
+
+
+def group_counts(tasks):
+    """Group tasks into (priority, category, completed, count) rows"""
+    groups = Counter(
+        (task.priority, _category(task), bool(task.completed)) for task in tasks
+    )
+    return [(p, c, done, n) for (p, c, done), n in groups.items()]
+
+
+if __name__ == "__main__":
+    # Test counters against a scan
+    from task_types import WorkTask, PersonalTask
+
+    tasks = [WorkTask("Report", priority="high"), PersonalTask("Gym", priority="low")]
+    stats = TaskStatistics()
+    for task in tasks:
+        stats.on_add(task)
+
+    tasks[0].mark_complete()
+    stats.on_complete(tasks[0])
+
+    print("Testing Task Statistics...")
+    print("="*60)
+    print(stats.snapshot())
+    print(f"✓ Consistent: {not stats.verify(tasks)}")
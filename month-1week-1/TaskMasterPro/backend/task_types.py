@@ -14,6 +14,9 @@ class WorkTask(Task):
     - Adds work-specific features
     """
 
+    __slots__ = ('project',)
+    SERIAL_FIELDS = Task.SERIAL_FIELDS + (('project', 'project', 'str'),)
+
     def __init__(self, title, description='', priority='medium', project='General'):
         """
         Initialize work task.
@@ -27,6 +30,11 @@ class WorkTask(Task):
         self.project = project
         self.category = 'Work'
 
+    def to_dict(self):
+        data = super().to_dict()
+        data['project'] = self.project
+        return data
+
     def __str__(self):
         """Override string representation"""
         base = super().__str__()
@@ -35,6 +43,9 @@ class WorkTask(Task):
 class PersonalTask(Task):
     """Personal/Life task with location"""
 
+    __slots__ = ('location',)
+    SERIAL_FIELDS = Task.SERIAL_FIELDS + (('location', 'location', 'str'),)
+
     def __init__(self, title, description='', priority='medium', location='home'):
         super().__init__(title, description, priority)
         self.location = location
@@ -53,6 +64,9 @@ class PersonalTask(Task):
 class ShoppingTask(Task):
     """Shopping task with item list"""
 
+    __slots__ = ('items',)
+    SERIAL_FIELDS = Task.SERIAL_FIELDS + (('items', 'items', 'json'),)
+
     def __init__(self, title, description='', priority='medium'):
         super().__init__(title, description, priority)
         self.items = []
@@ -0,0 +1,112 @@
+"""
+Task Serializer Tests
+Every task type survives serializer.dump -> JSON -> task_from_dict unchanged
+
+Run: python -m unittest test_task_serializer
+"""
+
+import json
+import unittest
+
+from task import Task
+from task_registry import registry, task_from_dict, tasks_from_dicts
+from task_serializer import serializer
+from task_stats import TaskStatistics
+from task_types import WorkTask, PersonalTask, ShoppingTask
+
+
+def sample_tasks():
+    """One task of every registered type, with every field set"""
+    generic = Task("Plain", "no category", priority="low")
+    generic.category = 'Errands'
+
+    work = WorkTask("Report", "quarterly numbers", priority="high", project="Q4")
+    work.mark_complete()
+
+    personal = PersonalTask("Gym", priority="medium", location="Gym")
+
+    shopping = ShoppingTask("Groceries", "weekly", priority="low")
+    shopping.add_item("milk")
+    shopping.add_item("bread")
+    shopping.mark_complete()
+
+    return [generic, work, personal, shopping]
+
+
+class TaskRoundTripTest(unittest.TestCase):
+
+    def round_trip(self, task):
+        return task_from_dict(json.loads(serializer.dump(task)))
+
+    def test_every_registered_type_is_covered(self):
+        covered = {task.__class__.__name__ for task in sample_tasks()}
+        self.assertEqual(covered, set(registry.types))
+
+    def test_dump_matches_to_dict(self):
+        for task in sample_tasks():
+            with self.subTest(type=task.__class__.__name__):
+                self.assertEqual(json.loads(serializer.dump(task)), task.to_dict())
+
+    def test_round_trip_keeps_class_and_fields(self):
+        for task in sample_tasks():
+            with self.subTest(type=task.__class__.__name__):
+                restored = self.round_trip(task)
+                self.assertIs(restored.__class__, task.__class__)
+                self.assertEqual(restored.to_dict(), task.to_dict())
+                for key, attr, kind in task.SERIAL_FIELDS:
+                    self.assertEqual(getattr(restored, attr, None), getattr(task, attr, None), attr)
+
+    def test_type_specific_fields(self):
+        generic, work, personal, shopping = [self.round_trip(t) for t in sample_tasks()]
+        self.assertEqual(generic.category, 'Errands')
+        self.assertEqual(work.project, 'Q4')
+        self.assertEqual(work.category, 'Work')
+        self.assertEqual(personal.location, 'Gym')
+        self.assertEqual(shopping.items, ['milk', 'bread'])
+
+    def test_timestamps(self):
+        for task in sample_tasks():
+            with self.subTest(type=task.__class__.__name__):
+                restored = self.round_trip(task)
+                self.assertEqual(restored.created_ts, task.created_ts)
+                self.assertEqual(restored.created_at, task.created_at)
+                self.assertEqual(restored.completed, task.completed)
+                self.assertEqual(restored.completed_ts, task.completed_ts)
+                if task.completed:
+                    self.assertIsNotNone(restored.completed_at)
+                else:
+                    self.assertIsNone(restored.completed_at)
+
+    def test_text_timestamps_load_as_epoch(self):
+        restored = task_from_dict({'type': 'WorkTask', 'title': 'Old', 'project': 'Legacy',
+                                   'completed': True,
+                                   'created_at': '2024-01-02 03:04:05',
+                                   'completed_at': '2024-01-03 04:05:06'})
+        self.assertEqual(restored.created_at, '2024-01-02 03:04:05')
+        self.assertEqual(restored.completed_at, '2024-01-03 04:05:06')
+        self.assertIsInstance(restored.created_ts, float)
+
+    def test_batch_dumps_and_loads_in_order(self):
+        tasks = sample_tasks() * 3
+        restored = tasks_from_dicts(json.loads(serializer.dumps(tasks)))
+        self.assertEqual([t.to_dict() for t in restored], [t.to_dict() for t in tasks])
+
+
+class PriorityCaseTest(unittest.TestCase):
+
+    def test_payload_default_is_counted_as_medium(self):
+        task = registry.from_payload({'title': 'New', 'category': 'Work'})
+        self.assertEqual(task.priority, 'medium')
+
+        stats = TaskStatistics()
+        stats.on_add(task)
+        self.assertEqual(stats.snapshot()['medium_priority'], 1)
+
+    def test_mixed_case_is_normalised_everywhere(self):
+        self.assertEqual(Task("a", priority="High").priority, 'high')
+        self.assertEqual(registry.from_payload({'title': 'b', 'priority': 'LOW'}).priority, 'low')
+        self.assertEqual(task_from_dict({'title': 'c', 'priority': 'Medium'}).priority, 'medium')
+
+
+if __name__ == "__main__":
+    unittest.main()
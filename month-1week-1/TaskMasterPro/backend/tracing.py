@@ -0,0 +1,263 @@
+"""
+Tracing Module
+Request-scoped nested spans exported as Chrome trace-event JSON
+"""
+
+import atexit
+import contextvars
+import functools
+import os
+import random
+import threading
+import uuid
+from collections import deque
+from time import perf_counter_ns
+
+from atomic_store import atomic_write_json
+
+
+def _env_rate():
+    try:
+        return min(1.0, max(0.0, float(os.environ.get('TRACE_SAMPLE_RATE', '0'))))
+    except ValueError:
+        return 0.0
+
+
+class _State:
+    sample_rate = _env_rate()   # fraction of requests traced (0 = only forced ones)
+    max_events = 10000          # per trace; the rest are counted as dropped
+
+
+# Finished traces, newest last
+recent = deque(maxlen=int(os.environ.get('TRACE_BUFFER', '200')))
+
+# The trace the current request/task belongs to (None: not traced)
+_active = contextvars.ContextVar('active_trace', default=None)
+
+
+def configure(sample_rate=None, buffer_size=None, max_events=None):
+    global recent
+    if sample_rate is not None:
+        _State.sample_rate = min(1.0, max(0.0, sample_rate))
+    if buffer_size is not None:
+        recent = deque(recent, maxlen=buffer_size)
+    if max_events is not None:
+        _State.max_events = max_events
+
+
+class Trace:
+    """
+    Spans recorded for one request.
+
+    Spans are stored as tuples and only turned into trace events on
+    export, so recording one costs a clock read and an append.
+    """
+
+    __slots__ = ('trace_id', 'name', 'spans', 'dropped', 'root', '_token')
+
+    def __init__(self, name):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.spans = []             # (name, category, start_ns, end_ns, thread id, args)
+        self.dropped = 0
+        self.root = None
+        self._token = None
+
+    def add(self, name, category, start_ns, end_ns, args=None):
+        if len(self.spans) < _State.max_events:
+            self.spans.append((name, category, start_ns, end_ns, threading.get_ident(), args))
+        else:
+            self.dropped += 1
+
+    @property
+    def duration_ms(self):
+        if self.root is None or self.root.end is None:
+            return None
+        return (self.root.end - self.root.start) / 1e6
+
+    def events(self, pid):
+        events = []
+        for name, category, start_ns, end_ns, tid, args in self.spans:
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': start_ns / 1000,
+                'dur': (end_ns - start_ns) / 1000,
+                'pid': pid,
+                'tid': tid,
+                'args': dict(args or {}, trace_id=self.trace_id)
+            }
+            events.append(event)
+        if self.dropped:
+            events[-1]['args']['dropped_spans'] = self.dropped
+        return events
+
+
+class span:
+    """
+    Context manager timing a block as a span of the active trace.
+
+        with span('serialize', 'json', tasks=len(tasks)):
+            ...
+
+    Outside a traced request it does nothing beyond one ContextVar read.
+    """
+
+    __slots__ = ('name', 'category', 'args', 'trace', 'start', 'end')
+
+    def __init__(self, name, category='function', **args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.trace = None
+        self.start = None
+        self.end = None
+
+    def __enter__(self):
+        self.trace = _active.get()
+        if self.trace is not None:
+            self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.trace is not None:
+            self.end = perf_counter_ns()
+            if exc_type is not None:
+                self.args['error'] = exc_type.__name__
+            self.trace.add(self.name, self.category, self.start, self.end, self.args)
+        return False
+
+
+def traced(func=None, name=None, category='function'):
+    """
+    Decorator: record each call as a span when a trace is active.
+
+    Nesting comes from timing: a span recorded inside another one on
+    the same thread is drawn beneath it in the trace viewer.
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _active.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            start = perf_counter_ns()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                trace.add(label, category, start, perf_counter_ns(), {'error': type(e).__name__})
+                raise
+            trace.add(label, category, start, perf_counter_ns())
+            return result
+
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def start_trace(name, force=False, **args):
+    """
+    Begin a trace for the current context if it is sampled.
+
+    Returns the Trace (pass it to finish_trace) or None when this
+    request is not traced.
+    """
+    if not force and (_State.sample_rate <= 0.0 or random.random() >= _State.sample_rate):
+        return None
+    trace = Trace(name)
+    trace._token = _active.set(trace)
+    trace.root = span(name, 'request', **args)
+    trace.root.__enter__()
+    return trace
+
+
+def finish_trace(trace, **args):
+    """End a trace started by start_trace and keep it for export"""
+    trace.root.args.update(args)
+    trace.root.__exit__(None, None, None)
+    try:
+        _active.reset(trace._token)
+    except ValueError:
+        _active.set(None)  # finished from a different context
+    recent.append(trace)
+
+
+def current_trace():
+    return _active.get()
+
+
+def chrome_trace(traces=None):
+    """
+    Trace-event JSON for chrome://tracing, Perfetto or speedscope.
+
+    Each span is a complete ('X') event; the viewers stack them by
+    time per thread, giving a flamegraph of every request.
+    """
+    pid = os.getpid()
+    events = []
+    for trace in list(recent) if traces is None else traces:
+        events.extend(trace.events(pid))
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def export(path):
+    """Write the buffered traces to a Chrome trace file; returns the trace count"""
+    traces = list(recent)
+    if traces:
+        atomic_write_json(path, chrome_trace(traces), indent=None)
+    return len(traces)
+
+
+def export_at_exit(path):
+    """Write whatever was traced to `path` when the process exits"""
+    def write():
+        try:
+            export(path)
+        except Exception as e:
+            print(f"Trace export error: {e}")
+    atexit.register(write)
+
+
+if __name__ == "__main__":
+    # A fake request through nested layers
+    import json
+    import tempfile
+    import time
+
+    @traced(category='storage')
+    def save(rows):
+        with span('serialize', 'json', rows=rows):
+            time.sleep(0.002)
+        time.sleep(0.001)
+
+    @traced
+    def add_task():
+        time.sleep(0.001)
+        save(10)
+
+    print("Testing Tracing...")
+    print("="*60)
+
+    add_task()
+    print(f"✓ Untraced call recorded nothing: {len(recent)} traces")
+
+    trace = start_trace('POST /api/tasks', force=True)
+    add_task()
+    finish_trace(trace, status=201)
+    print(f"✓ Traced request: {[s[0] for s in trace.spans]} in {trace.duration_ms:.2f}ms")
+
+    untraced = traced(lambda: None)
+    start = perf_counter_ns()
+    for _ in range(100000):
+        untraced()
+    print(f"✓ Untraced wrapper overhead: {(perf_counter_ns() - start) / 100000:.0f}ns per call")
+
+    path = os.path.join(tempfile.mkdtemp(), 'trace.json')
+    export(path)
+    with open(path) as f:
+        print(f"✓ Exported {len(json.load(f)['traceEvents'])} events to {path}")
@@ -3,9 +3,32 @@ Weather Service Module
 Day 14 Capstone: Demonstrates API integration
 """
 
+import asyncio
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
 from decorators import AppDecorators
+from lru_cache import TTLCache
+from http_client import get_client
+from resilience import get_breaker
 import requests
 
+# Cities fetched in the background at startup (override with WEATHER_PREWARM)
+POPULAR_CITIES = ('New York', 'London', 'Tokyo', 'Paris', 'Los Angeles')
+
+
+class _Reading:
+    """A cached fetch result: weather dict, or None for a failure"""
+
+    __slots__ = ('weather', 'fetched_at')
+
+    def __init__(self, weather, fetched_at):
+        self.weather = weather
+        self.fetched_at = fetched_at
+
 
 class WeatherService:
     """
@@ -15,14 +38,50 @@ class WeatherService:
     - HTTP requests
     - JSON parsing
     - Error handling
+
+    CACHING (stale-while-revalidate):
+    - A reading is fresh for `fresh_seconds`. After that it is still
+      returned immediately, and a background worker refreshes it.
+    - Readings are kept for `stale_seconds` in total; only a city
+      never seen (or long gone) makes a caller wait for a fetch, and
+      concurrent cold callers share that one fetch.
+    - Failures are cached for `negative_seconds`, so a broken city or
+      an outage does not cost every request a timeout.
+    - prewarm() loads popular cities in the background, and the
+      refresher keeps the most requested cities fresh. Popularity only
+      counts requests that returned weather, once per city per call,
+      and is bounded: past `popular_size` cities the counts are halved
+      and only the top half is kept, so unknown or one-off city names
+      cannot grow it and old favourites fade out.
+
+    A circuit breaker ('weather') sits in front of the upstream: after
+    repeated timeouts or 5xx responses, fetches fail fast until a probe
+    succeeds.
     """
     
-    def __init__(self):
-        self.base_url = "https://wttr.in"
-    
-    @AppDecorators.cache_with_ttl(ttl_minutes=30)
-    @AppDecorators.retry_on_failure(max_attempts=3, delay=1)
-    @AppDecorators.timer
+    def __init__(self, base_url=None, timeout=3.0, fresh_seconds=30 * 60,
+                 stale_seconds=6 * 60 * 60, negative_seconds=60, max_cities=512,
+                 refresh_workers=2, popular_size=256, client=None):
+        self.base_url = base_url or os.environ.get('WEATHER_BASE_URL', 'https://wttr.in')
+        self.timeout = timeout
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.negative_seconds = negative_seconds
+        self.popular_size = popular_size
+        self.client = client or get_client()   # shared keep-alive pool
+        self.breaker = get_breaker('weather', failure_threshold=5, reset_timeout=30.0)
+
+        self._cache = TTLCache(maxsize=max_cities, ttl=stale_seconds)
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers,
+                                            thread_name_prefix='weather-refresh')
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._popularity = Counter()
+        self.stale_served = 0
+        self.refreshes = 0
+        owner = type(self)
+        AppDecorators.caches[f'{owner.__module__}.{owner.__qualname__}.get_weather'] = self._cache
+
     def get_weather(self, city):
         """
         Get current weather for a city.
@@ -30,9 +89,147 @@ class WeatherService:
         Returns:
             dict with weather info or None if failed
         """
+        weather = self._get(city)
+        if weather is not None:
+            self._count(city)
+        return weather
+
+    def _get(self, city):
+        key = city.strip().lower()
+        reading = self._cache.get(key)
+        if reading is None:
+            reading = self._cache.get_or_load(key, lambda: self._load(city),
+                                              ttl=self._ttl_for)
+        elif time.monotonic() - reading.fetched_at > self._max_age(reading):
+            # Expired but still usable: answer now, refresh behind the scenes
+            self.stale_served += 1
+            self._schedule_refresh(key, city)
+        return reading.weather
+
+    async def get_weather_many_async(self, cities):
+        """
+        Weather for many cities at once.
+
+        Cached cities are answered from memory (stale ones refresh in
+        the background as usual); the cold ones are fetched
+        concurrently, so the batch waits about one round trip.
+
+        Returns:
+            {city: weather dict or None}
+        """
+        cities = list(dict.fromkeys(city for city in cities if city.strip()))
+        cold = [city for city in cities if self._cache.get(city.strip().lower()) is None]
+        if cold:
+            await self.client.get_many(cold, fetch=self._get)
+        results = {city: self._get(city) for city in cities}
+        for city, weather in results.items():
+            if weather is not None:
+                self._count(city)
+        return results
+
+    def get_weather_many(self, cities):
+        """Blocking wrapper around get_weather_many_async"""
+        return asyncio.run(self.get_weather_many_async(cities))
+
+    def prewarm(self, cities=None):
+        """Fetch cities in the background so first requests hit the cache"""
+        if cities is None:
+            configured = os.environ.get('WEATHER_PREWARM')
+            cities = configured.split(',') if configured else POPULAR_CITIES
+        for city in cities:
+            if city.strip():
+                self._schedule_refresh(city.strip().lower(), city.strip())
+
+    def refresh_popular(self, limit=10):
+        """Refresh the most requested cities whose readings are getting old"""
+        with self._lock:
+            popular = [key for key, _ in self._popularity.most_common(limit)]
+        for key in popular:
+            reading = self._cache.get(key)
+            if reading is None or time.monotonic() - reading.fetched_at > self.fresh_seconds * 0.8:
+                self._schedule_refresh(key, key)
+
+    def start_refresher(self, interval=60.0, limit=10):
+        """Run refresh_popular() every `interval` seconds in a daemon thread"""
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.refresh_popular(limit)
+        threading.Thread(target=loop, name='weather-refresher', daemon=True).start()
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats.update({
+            'stale_served': self.stale_served,
+            'refreshes': self.refreshes,
+            'refreshing': len(self._refreshing)
+        })
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, city):
+        """One request for a city that resolved, in the bounded popularity table"""
+        with self._lock:
+            self._popularity[city.strip().lower()] += 1
+            if len(self._popularity) > self.popular_size:
+                # Decay: halve the counts and keep the top half
+                self._popularity = Counter({
+                    key: (count + 1) // 2
+                    for key, count in self._popularity.most_common(self.popular_size // 2)
+                })
+
+    def _max_age(self, reading):
+        return self.fresh_seconds if reading.weather is not None else self.negative_seconds
+
+    def _ttl_for(self, reading):
+        return self.stale_seconds if reading.weather is not None else self.negative_seconds
+
+    def _load(self, city):
+        return _Reading(self.fetch_weather(city), time.monotonic())
+
+    def _schedule_refresh(self, key, city):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        try:
+            self._executor.submit(self._refresh, key, city)
+        except RuntimeError:
+            with self._lock:
+                self._refreshing.discard(key)  # executor shut down
+
+    def _refresh(self, key, city):
+        try:
+            reading = self._load(city)
+            if reading.weather is None:
+                previous = self._cache.get(key)
+                if previous is not None and previous.weather is not None:
+                    return  # keep serving the last good reading
+            self._cache.set(key, reading, self._ttl_for(reading))
+            self.refreshes += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    @AppDecorators.timer
+    def fetch_weather(self, city):
+        """
+        One request to the weather API (no caching, no retries).
+
+        Returns:
+            dict with weather info or None if failed (or the circuit is open)
+        """
+        if not self.breaker.allow():
+            return None
         try:
             url = f"{self.base_url}/{city}?format=j1"
-            response = requests.get(url, timeout=5)
+            response = self.client.get(url, timeout=self.timeout)
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()  # upstream is answering
             
             if response.status_code == 200:
                 data = response.json()
@@ -47,6 +244,10 @@ class WeatherService:
             else:
                 return None
                 
+        except requests.RequestException as e:
+            self.breaker.record_failure()
+            print(f"Weather fetch error: {e}")
+            return None
         except Exception as e:
             print(f"Weather fetch error: {e}")
             return None
@@ -92,22 +293,47 @@ class WeatherService:
 
 
 if __name__ == "__main__":
-    # Test weather service
-    service = WeatherService()
+    # Test against the local stub server (no network needed)
+    from stub_weather_server import start_stub_server
+
+    server, url = start_stub_server(delay=0.2, failing=['Atlantis'])
+    service = WeatherService(base_url=url, fresh_seconds=0.5, negative_seconds=0.5,
+                             popular_size=16)
     
     print("Testing Weather Service...")
     print("="*60)
     
     city = "New York"
+    start = time.perf_counter()
     weather = service.get_weather(city)
-    
-    if weather:
-        print(f"\nWeather in {city}:")
-        print(f"  Temperature: {weather['temp_f']}°F ({weather['temp_c']}°C)")
-        print(f"  Conditions: {weather['condition']}")
-        print(f"  Humidity: {weather['humidity']}%")
-        
-        print(f"\nTask Advice:")
-        print(service.get_weather_advice(city))
-    else:
-        print("Failed to fetch weather")
\ No newline at end of file
+    print(f"✓ Cold fetch: {weather} in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    service.get_weather(city)
+    print(f"✓ Cached: {time.perf_counter() - start:.4f}s")
+
+    time.sleep(0.6)
+    start = time.perf_counter()
+    service.get_weather(city)
+    print(f"✓ Stale served in {time.perf_counter() - start:.4f}s while refreshing")
+
+    service.get_weather("Atlantis")
+    start = time.perf_counter()
+    service.get_weather("Atlantis")
+    print(f"✓ Failure cached: {time.perf_counter() - start:.4f}s")
+
+    start = time.perf_counter()
+    batch = service.get_weather_many([f"City {i}" for i in range(50)])
+    print(f"✓ Batch of {len(batch)} cold cities in {time.perf_counter() - start:.2f}s")
+    print(f"✓ Popularity bounded: {len(service._popularity)} cities kept, "
+          f"Atlantis counted: {'atlantis' in service._popularity}, "
+          f"top {service._popularity.most_common(1)}")
+
+    service.prewarm(["Tokyo"])
+    time.sleep(0.4)
+    print(f"✓ Prewarmed Tokyo: {service.get_weather('Tokyo')}")
+    print(f"\nTask Advice:\n{service.get_weather_advice(city)}")
+    print(f"\nStats: {service.stats()}")
+    print(f"Breaker: {service.breaker.stats()}")
+    print(f"Upstream requests: {server.requests}")
+    server.shutdown()
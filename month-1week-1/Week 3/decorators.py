@@ -6,6 +6,8 @@ import time
 from datetime import datetime
 from functools import wraps 
 
+import timing
+
 def log_transaction(func):
     """
     Decorator that logs all transactions to console and file.
@@ -45,19 +47,20 @@ def timer(func):
     """
     Decorator that measures execution time.
     Usage: @timer above any method to track performance
+
+    Samples are recorded (see timing.py); read them with timing_report().
+    With TIMING_PRINT=on each timed call also prints its duration.
+    INSTRUMENTATION=off returns the method unwrapped.
     """
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
+    return timing.timed(func, lambda name, ns: f'Timer: {name} took {ns / 1e6:.2f}ms')
 
-        duration = (end_time - start_time) * 1000 # convert to milliseconds
-        print(f'Timer: {func.__name__} took {duration:.2f}ms')
-
-        return result  
-    
-    return wrapper
+def timing_report():
+    """Average and max milliseconds per timed function"""
+    return {
+        name: {'calls': stats['calls'], 'timed': stats['timed'],
+               'avg_ms': stats['avg'], 'max_ms': stats['max']}
+        for name, stats in timing.report(unit=1e6).items()
+    }
 
 def validate_amount(func):
     """
@@ -83,10 +86,13 @@ def validate_amount(func):
     return wrapper 
 
 if __name__ == "__main__":
+    timing.configure(print_samples=True)
+
     @timer
     def test_function():
         time.sleep(0.01)
         return "Done"
     
     result = test_function()
-    print(f"Result: {result}")
\ No newline at end of file
+    print(f"Result: {result}")
+    print(f"Timings: {timing_report()}")
\ No newline at end of file
@@ -5,22 +5,27 @@ Reusable decorators for production applications
 
 import time
 import functools
+import random
 from datetime import datetime
 
+import timing
+
 class Functiontoolkit:
     """Collection of useful function decorators"""
 
     @staticmethod
     def timer(func):
-        """Measure execution time"""
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            start = time.time()
-            result = func(*args, **kwargs)
-            end = time.time()
-            print(f'⏱ Function "{func.__name__}" executed in {end - start:.4f} seconds')
-            return result
-        return wrapper
+        """Measure execution time (sampled and recorded, printed with TIMING_PRINT=on; see timing.py)"""
+        return timing.timed(func, lambda name, ns: f'⏱ Function "{name}" executed in {ns / 1e9:.4f} seconds')
+
+    @staticmethod
+    def timing_report():
+        """Average and max seconds per timed function"""
+        return {
+            name: {'calls': stats['calls'], 'timed': stats['timed'],
+                   'avg_seconds': stats['avg'], 'max_seconds': stats['max']}
+            for name, stats in timing.report(unit=1e9, digits=6).items()
+        }
     
     @staticmethod
     def logger(func):
@@ -35,20 +40,35 @@ class Functiontoolkit:
         return wrapper
     
     @staticmethod
-    def retry(max_attempts=3, delay=1):
-        """Retry a function on failure"""
+    def retry(max_attempts=3, delay=1, max_delay=30, deadline=30):
+        """
+        Retry a function on failure.
+
+        Waits use full-jitter exponential backoff: a random time between
+        0 and min(max_delay, delay * 2**n), so many callers retrying at
+        once don't all hit the service together. `deadline` caps the
+        total seconds spent (30 by default, None for no cap); a retry
+        that couldn't start in time isn't attempted. No wait happens
+        after the last attempt.
+        """
         def decorator(func):
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
+                give_up_at = None if deadline is None else time.monotonic() + deadline
                 attempts = 0
-                while attempts < max_attempts:
+                while True:
                     try:
                         return func(*args, **kwargs)
                     except Exception as e:
                         attempts += 1
                         print(f'⚠️ Attempt {attempts} failed: {e}')
-                        time.sleep(delay)
-                raise Exception(f'Function "{func.__name__}" failed after {max_attempts} attempts')
+                        if attempts >= max_attempts:
+                            break
+                        wait = random.uniform(0, min(max_delay, delay * 2 ** (attempts - 1)))
+                        if give_up_at is not None and time.monotonic() + wait >= give_up_at:
+                            break
+                        time.sleep(wait)
+                raise Exception(f'Function "{func.__name__}" failed after {attempts} attempts')
             return wrapper
         return decorator
     
@@ -93,6 +113,7 @@ if __name__ == '__main__':
     print('PROFESSIONAL FUNCTION TOOLKIT - Day 15')
     print('='*60)
     print()
+    timing.configure(print_samples=True)
 
     # Example 1: timed function
     @Functiontoolkit.timer
@@ -104,6 +125,7 @@ if __name__ == '__main__':
     print('Example 1: timer decorator')
     result = slow_calculation(1000000)
     print(f'Result: {result}')
+    print(f'Timings: {Functiontoolkit.timing_report()}')
     print()
 
 # Example 2: Logged function
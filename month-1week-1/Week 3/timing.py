@@ -0,0 +1,92 @@
+"""
+Sampled timing shared by the @timer decorators
+(decorators.timer and Functiontoolkit.timer)
+
+Built on TaskMasterPro's instrumentation.py, so both projects use one
+implementation: the INSTRUMENTATION and INSTRUMENTATION_SAMPLE_RATE
+switches, the runtime kill switch (configure) and the per-function
+counters, which are updated under a lock.
+"""
+
+import importlib.util
+import os
+import sys
+
+def _load_instrumentation():
+    """TaskMasterPro/backend/instrumentation.py, imported once under its own name"""
+    module = sys.modules.get('instrumentation')
+    if module is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            '..', 'TaskMasterPro', 'backend', 'instrumentation.py')
+        spec = importlib.util.spec_from_file_location('instrumentation', path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['instrumentation'] = module
+        spec.loader.exec_module(module)
+    return module
+
+instrumentation = _load_instrumentation()
+
+class _Output:
+    # TIMING_PRINT=on prints a line per timed call, as in the Day 19
+    # exercises; off (the default) only records
+    enabled = os.environ.get('TIMING_PRINT', 'off').lower() in ('on', '1', 'true')
+
+def configure(enabled=None, sample_rate=None, print_samples=None):
+    """
+    Change timing at runtime.
+
+    enabled=False makes every timed function a plain call again,
+    sample_rate (0..1) times only that fraction of calls, and
+    print_samples turns the per-call lines on or off.
+    """
+    instrumentation.configure(enabled=enabled, sample_rate=sample_rate)
+    if print_samples is not None:
+        _Output.enabled = print_samples
+
+def timed(func, message=None):
+    """
+    Record how long a sample of calls to func takes.
+
+    Samples are aggregated per function, read them with report().
+    message(name, elapsed_ns) is the line printed for a timed call when
+    printing is on; it is never called otherwise. Returns func itself
+    when INSTRUMENTATION=off.
+    """
+    name = func.__name__
+
+    def on_sample(site, elapsed_ns):
+        if _Output.enabled and message is not None:
+            print(message(name, elapsed_ns))
+
+    return instrumentation.instrument(func, on_sample=on_sample)
+
+def report(unit=1e6, digits=3):
+    """
+    {function: calls, timed, avg, max} with durations divided by unit
+    (1e6 for milliseconds, 1e9 for seconds)
+    """
+    scale = 1e6 / unit      # instrumentation reports milliseconds
+    return {
+        name: {
+            'calls': stats['calls'],
+            'timed': stats['sampled'],
+            'avg': round(stats['avg_ms'] * scale, digits) if stats['sampled'] else None,
+            'max': round(stats['max_ms'] * scale, digits) if stats['sampled'] else 0
+        }
+        for name, stats in instrumentation.report().items()
+    }
+
+if __name__ == "__main__":
+    import time
+
+    @timed
+    def test_function():
+        time.sleep(0.01)
+        return "Done"
+
+    for _ in range(5):
+        test_function()
+    configure(enabled=False)
+    test_function()
+    configure(enabled=True)
+    print(f"Timings (ms, the call made while disabled is not counted): {report()}")
@@ -6,6 +6,9 @@ Day 13: Learning to fetch data from the internet
 import requests
 import json
 
+# A Session reuses connections between requests (faster than requests.get)
+session = requests.Session()
+
 def test_simple_api():
     """Make your first API request"""
 
@@ -21,7 +24,7 @@ def test_simple_api():
     print('Waiting for response...\n')
 
     # The Magic Line - Make HTTP request 
-    response = requests.get(url)
+    response = session.get(url, timeout=5)
 
     # Check if successful
     if response.status_code == 200:
@@ -54,7 +57,7 @@ def test_random_user():
     }
 
     print('\nfetching random user data...')
-    response = requests.get(url, params=params)
+    response = session.get(url, params=params, timeout=5)
 
     if response.status_code == 200:
         data = response.json()
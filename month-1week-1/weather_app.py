@@ -6,6 +6,9 @@ Day 13: Practical API usage
 import requests
 from datetime import datetime
 
+# One session for the whole program: connections are kept alive and reused
+session = requests.Session()
+
 def get_weather(city):
     """
     Get current weather for a city
@@ -22,7 +25,7 @@ def get_weather(city):
     print('Connecting to weather service...')
 
     try: 
-        response = requests.get(url, timeout=5)
+        response = session.get(url, timeout=(3.05, 5))
 
         if response.status_code == 200:
             data = response.json()